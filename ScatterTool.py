@@ -1,9 +1,21 @@
-import pymxs
-import random
-rt = pymxs.runtime
-
-from pymxs import runtime as rt
+import logging
+import math
 import random
+import numpy as np
+from scatter_runtime import rt
+import scatter_bridge
+import scatter_engine
+import scatter_footprint
+import scatter_layout
+import scatter_log
+import scatter_params
+import scatter_runtime
+import scatter_sampling
+import scatter_spatial
+
+log = scatter_log.get_logger("tool")
+painter_log = scatter_log.get_logger("painter")
+color_log = scatter_log.get_logger("color")
 
 #manage source objects list
 
@@ -16,7 +28,7 @@ class ElementsManager:
         """add an object to the list if it's not already there."""
         if obj and obj not in self.elements:
             self.elements.append(obj)
-            print(f"[Added] {obj.name}")
+            log.debug("Added %s", obj.name)
 
     def add_many(self, objs):
         """add multiple objects to the list."""
@@ -30,25 +42,25 @@ class ElementsManager:
             if picked:
                 self.add(picked)
         except Exception as e:
-            print(f"[Error picking] {e}")
+            log.error("Picking failed: %s", e)
 
     def remove(self, obj):
         """Remove an object from the list."""
         if obj in self.elements:
             self.elements.remove(obj)
-            print(f"[Removed] {obj.name}")
+            log.debug("Removed %s", obj.name)
 
     def replace(self, old_obj, new_obj):
         """Replace an object in the list with another."""
         if old_obj in self.elements and new_obj:
             idx = self.elements.index(old_obj)
             self.elements[idx] = new_obj
-            print(f"[Replaced] {old_obj.name} → {new_obj.name}")
+            log.debug("Replaced %s → %s", old_obj.name, new_obj.name)
 
     def clear(self):
         """Clear the entire list."""
         self.elements.clear()
-        print("[Cleared] All elements in the UI list was removed.")
+        log.debug("All elements in the UI list were removed.")
 
     def get_random(self):
         """returns a random element from the list."""
@@ -63,10 +75,18 @@ class ElementsManager:
 
 #manage individual instance transform
 class ScatterInstance:
-    def __init__(self, node,normal=None):
+    def __init__(self, node,normal=None,position=None,source_index=None,seed=None):
         self.node = node
         self.normal = normal
-        self.update_from_node()
+        self.source_index = source_index #index in the group's sources, None when unknown
+        self.seed = seed #seed of the batch that placed it, None when unknown
+        if position is None:
+            self.update_from_node()
+        else:
+            # placement already known, skip reading the node back through the bridge
+            self.position = position
+            self.rotation = None
+            self.scale = None
 
     def update_from_node(self):
         self.position = self.node.position
@@ -87,9 +107,14 @@ class ScatterGroup:
         self.surface=surface
         self.painter=painter
         self.instances = []
+        #authoritative positions and radii of the instances, painter collisions only read this
+        self.collision_index = scatter_spatial.SpatialHashGrid()
+        self._store_loaded = True #False until a group loaded from the scene reads its instances
+        self._layout_dirty = False #store changed since the layout on the controller was written
         self.controller=None #dummy for future use
         self.layer=None #layer for the groups
-        self.params = {
+        self.params = scatter_params.coerce({}) #stored parameters, see scatter_params
+        self.params.update({
             "count": None,
             "distance": None,
             "brush_size":None,
@@ -102,36 +127,59 @@ class ScatterGroup:
             "scale_rangeZ": (1.0, 1.0),
             "rot_x_range": (0, 0),
             "rot_y_range": (0, 0),
-            "rot_z_range": (0, 0)
-        }
+            "rot_z_range": (0, 0),
+            "pool_size": 0, #cleared instances kept hidden for reuse, 0 disables the pool
+            "thin_pool_size": 10000 #pool cap while thinning, which hides and never deletes
+        })
         self._setup_group_in_scene()
         self.manager = None #source objects manager
-        print(f"DEBUG: Created group '{self.name}' with controller '{self.controller.name}'")#DEBUG
+        log.debug("Created group '%s' with controller '%s'", self.name, self.controller.name)
     
+    def adopt_values(self, adopt):
+        """pass every node the group keeps through adopt, see scatter_runtime.hold."""
+        self.controller = adopt(self.controller)
+        self.layer = adopt(self.layer)
+        self.spline = adopt(self.spline)
+        self.surface = adopt(self.surface)
+        self.target = adopt(self.target)
+        for inst in self.instances:
+            inst.node = adopt(inst.node)
+        if self.manager is not None:
+            self.manager.elements = [adopt(obj) for obj in self.manager.elements]
+
     def _setup_group_in_scene(self,target_obj=None):
         self.target = target_obj  
         try:
             self.controller = rt.lastDummy
         except AttributeError:
             self.controller = None
-            print("WARNING: No controller found in the scene.")
+            log.warning("No controller found in the scene.")
         
         saved_pos = self.controller.position
         #Group info in controller's user properties
         rt.setUserProp(self.controller, "ScatterGroup", self.name) #tag for identify the group from the controller
+        scatter_bridge.register_controller(self.controller) #loading the groups only reads the registry
 
         # Layer
         try:
             self.layer = rt.lastDummyLayer
         except AttributeError:
             self.layer = None
-            print("WARNING: No layer found in the scene.")
+            log.warning("No layer found in the scene.")
             # self.layer.isFrozen = True
 
         if self.controller and rt.isValidNode(self.controller):
             self.controller.position = saved_pos
         
 
+    def save_params(self):
+        """write the stored parameters to the controller, one user prop for all of them."""
+        if not rt.isValidNode(self.controller):
+            return
+        if self.manager is not None:
+            self.params["elements"] = [o.name for o in self.manager.get_all() if rt.isValidNode(o)]
+        scatter_params.write(self.controller, self.params)
+
     def set_spline(self, spline):
         self.spline = spline
 
@@ -144,31 +192,56 @@ class ScatterGroup:
     #clear instances
     def clear_instances(self, delete_nodes=False):
         if not hasattr(self, "controller") or not rt.isValidNode(self.controller):
-            print("DEBUG: Invalid controller.")
+            log.debug("Invalid controller.")
             return
 
         children = list(self.controller.children)
 
         if not children:
-            print("DEBUG: No instances under controller.")
+            log.debug("No instances under controller.")
             self.instances = []
+            self.collision_index.clear()
+            self._store_loaded = True
+            self._layout_dirty = True
             return
 
         if delete_nodes:
-            for child in children:
-                if rt.isValidNode(child):
-                    print(f"DEBUG: Deleting node {child.name}")
-                    rt.delete(child)
+            pool_size = self.params.get("pool_size", 0)
+            if pool_size > 0:
+                # park hidden under the controller for the next scatter to reuse
+                pooled = scatter_bridge.park_instances(self.controller, pool_size)
+                log.debug("%d instances parked in the pool of '%s'", pooled, self.name)
+            else:
+                deleted = 0
+                for child in children:
+                    if rt.isValidNode(child):
+                        rt.delete(child)
+                        deleted += 1
+                log.debug("Deleted %d instances of '%s'", deleted, self.name)
 
         # clear cached instances list
         self.instances = []
+        self.collision_index.clear()
+        self._store_loaded = True
+        self._layout_dirty = True
 
-        remaining = [c.name for c in self.controller.children if rt.isValidNode(c)]
-        print(f"DEBUG: Remaining children under '{self.name}' = {remaining}")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%d children remain under '%s'", len(self.controller.children), self.name)
+
+    def purge_pool(self):
+        """delete every instance parked in this group's pool."""
+        if not rt.isValidNode(self.controller):
+            return
+        purged = scatter_bridge.purge_pool(self.controller)
+        log.debug("Purged %d pooled instances of '%s'", purged, self.name)
+
+    def _live_children(self):
+        """children of the controller, without the ones parked in the pool."""
+        return scatter_bridge.live_children(self.controller)
 
     #show instance as box
     def set_display_as_box(self,enable=True):
-        children = self.controller.children
+        children = self._live_children()
         if not children:
             return
 
@@ -178,31 +251,31 @@ class ScatterGroup:
             elif hasattr(child, "displayAsBox"):
                 child.displayAsBox = enable
 
-        print(f"DEBUG: Display mode changed to {'BOX' if enable else 'MESH'} for all children of '{self.name}'")
+        log.debug("Display mode changed to %s for all children of '%s'", 'BOX' if enable else 'MESH', self.name)
 
 
     def set_frozen_elements(self, freeze=True):
-        children = self.controller.children
+        children = self._live_children()
         if not children:
-            print(f"DEBUG: No children found for '{self.name}'.")
+            log.debug("No children found for '%s'.", self.name)
             return
 
         for child in children:
             if hasattr(child, "isFrozen"):
                 child.isFrozen = freeze
 
-        print(f"DEBUG: Freeze status changed to {freeze} for all children of '{self.name}'")
+        log.debug("Freeze status changed to %s for all children of '%s'", freeze, self.name)
 
     def set_viewport_display(self, percentage=100):
-            children = self.controller.children
+            children = self._live_children()
             if not children:
-                print(f"DEBUG: No children found for '{self.name}'.")
+                log.debug("No children found for '%s'.", self.name)
                 return
             #save in params
             self.params["viewport_percentage"] = percentage
 
             #save controller user prop
-            rt.setUserProp(self.controller, "ScatterViewportPercentage", str(percentage))
+            self.save_params()
 
             child_count = len(children)
             if child_count == 0:
@@ -219,273 +292,464 @@ class ScatterGroup:
                     rt.hide(child)
 
                 
-            print(f"DEBUG: Set viewport display to {percentage}% for all children of '{self.name}'")
+            log.debug("Set viewport display to %s%% for all children of '%s'", percentage, self.name)
 
     def shuffle_instances(self):
         children = self.controller.children
         if not children:
-            print(f"DEBUG: No children found for '{self.name}'.")
+            log.debug("No children found for '%s'.", self.name)
             return
 
         child_count = len(children)
         if child_count == 0:
             return
 
-        children= [c for c in self.controller.children if rt.isValidNode(c)]
-        if not children:
-            print(f"DEBUG: No valid children found for '{self.name}'.")
+        # the store keeps normals, positions and seeds, only sources and radii change
+        self._ensure_instance_store()
+        if not self.instances:
+            log.debug("No valid children found for '%s'.", self.name)
             return
         sources = [s for s in self.manager.get_all() if rt.isValidNode(s)]
         if not sources:
-            print(f"DEBUG: No hay objetos fuente válidos para mezclar en '{self.name}'.")
+            log.debug("No hay objetos fuente válidos para mezclar en '%s'.", self.name)
             return
 
-        for child in children:
-            src= random.choice(sources)
+        bases = [s.baseObject for s in sources]
+        for inst in self.instances:
+            k = random.randrange(len(sources))
             try:
-                child.baseObject = src.baseObject
+                inst.node.baseObject = bases[k]
+                inst.source_index = k
             except Exception as e:
-                print(f"ERROR: Failed to assign new source to '{child.name}'. {e}")
+                log.error("Failed to assign new source to '%s'. %s", inst.node.name, e)
 
-        print(f"DEBUG: Shuffled positions of all children of '{self.name}'")
+        self._refresh_radii()
+        log.debug("Shuffled positions of all children of '%s'", self.name)
     
 
-    def apply_random_scale_and_rotation(self,inst): 
-        # Apply scale
-        if self.params.get("proportional_scale", True):
-            s = random.uniform(*self.params["scale_rangeX"])
-            inst.scale = rt.point3(s, s, s)
-        else:
-            sx = random.uniform(*self.params["scale_rangeX"])
-            sy = random.uniform(*self.params["scale_rangeY"])
-            sz = random.uniform(*self.params["scale_rangeZ"])
-            inst.scale = rt.point3(sx, sy, sz)
-
-        # Apply rotation
-        rx = random.uniform(*self.params["rot_x_range"])
-        ry = random.uniform(*self.params["rot_y_range"])
-        rz = random.uniform(*self.params["rot_z_range"])
-        
-        rt.rotate(inst, rt.eulerAngles(rx, ry, rz))
-    
     def scatter_spline(self,source_obj):
-        print("the instances list before scattering on spline:", self.instances)
-        self.clear_instances(delete_nodes=True)
-        print("DEBUG: cleared existing instances before scattering on spline.")
-        print("the instances list after clearing:", self.instances)
         if not rt.isValidNode(self.spline):
-            print("ERROR: invalid spline target.")
+            log.error("invalid spline target.")
             return 
 
         shape = self.spline
         spline_index = 1
-        curve_length = rt.execute(f"curveLength ${shape.name}")
+        # cached until the spline changes, rebuilds skip the dense sampling
+        table = scatter_sampling.get_spline_table(shape, spline_index)
 
-        if curve_length == 0:
-            print("ERROR: Spline length is 0.")
+        if table.length == 0:
+            log.error("Spline length is 0.")
             return
 
-        is_closed = rt.isClosed(shape, spline_index)
         count = self.params["count"]
         distance = self.params["distance"]
 
-
         if count is not None:
-            instance_count = count
+            positions, tangents = table.at_count(count)
         else:
             if distance is None or distance <= 0:
                 return
-            instance_count = int(curve_length // distance) + 1
+            positions, tangents = table.at_spacing(distance)
+        instance_count = len(positions)
 
-        param_range = instance_count if is_closed else instance_count - 1
+        sources = self._get_sources(source_obj)
+        if not sources:
+            log.error("No source object available.")
+            return
 
-        for i in range(instance_count):
-            param = i / float(param_range)
-            pos = rt.pathInterp(shape, spline_index, param)
-            tangent = rt.normalize(rt.pathTangent(shape, spline_index, param))
+        seed = self._batch_seed()
+        batch = scatter_engine.place_along_spline(positions, tangents, self.params, len(sources),
+                                                  scatter_engine.make_rng(seed))
 
-            #add a random source object from the list
-            
-            if hasattr(self,'manager') and self.manager.get_all():
-                source_obj = self.manager.get_random()
-            if not source_obj:
-                print("ERROR: No source object available.")
-                return
+        # inputs are valid, existing nodes stay in the scene and the commit reuses them
+        self.clear_instances(delete_nodes=False)
+        self._commit_batch(batch, sources, rebuild=True, seed=seed)
 
-            # Add jitter
-            jitter = rt.point3(
-                random.uniform(*(self.params["pos_jitterX"])),
-                random.uniform(*(self.params["pos_jitterY"])),
-                random.uniform(*(self.params["pos_jitterZ"])),
-            )
-            final_pos = pos + jitter
-
-            # Build local coordinate system
-            x_axis = tangent
-            z_axis = rt.point3(0, 0, 1)
-            y_axis = rt.normalize(rt.cross(z_axis, x_axis))
-            z_axis = rt.normalize(rt.cross(x_axis, y_axis))
-            base_tm = rt.matrix3(x_axis, y_axis, z_axis, final_pos) 
-
-            #store controller transform for future use
-            ctrl_pos = self.controller.position
-            ctrl_rot = self.controller.rotation
-            # Create instance and assign transform
-            inst = rt.instance(source_obj)
-            inst.transform = base_tm
-            inst.parent = self.controller
-            self.layer.addNode(inst)
-
-            self.apply_random_scale_and_rotation(inst)
-            self.instances.append(ScatterInstance(inst))
-
-            # assign back controller transform
-            self.controller.position = ctrl_pos
-            self.controller.rotation = ctrl_rot
-
-        print(f"✅ {instance_count} instances of '{source_obj.name}' were created along the spline.")
-        print("the instances list after scattering on spline:", self.instances)
+        log.info("%d instances of '%s' were created along the spline.", instance_count, source_obj.name)
+
+    def _get_sources(self, source_obj=None):
+        """returns the source objects to pick from, falling back to source_obj."""
+        # one call per scatter to forget footprints of sources edited since the last one
+        scatter_footprint.footprints.sync()
+        if getattr(self, "manager", None) and self.manager.get_all():
+            return [s for s in self.manager.get_all() if rt.isValidNode(s)]
+        return [source_obj] if source_obj else []
+
+    def _batch_seed(self):
+        """seed of the next placement: params["seed"] when set, a fresh one otherwise."""
+        seed = self.params.get("seed")
+        return scatter_engine.new_seed() if seed is None else seed
+
+    def _ensure_instance_store(self):
+        """read positions and radii of the instances already in the scene, once.
+
+        Groups loaded from the scene start with an empty store; afterwards it is
+        kept current by every add and remove and the scene is not read again.
+        """
+        if self._store_loaded:
+            return
+        self._store_loaded = True
+        self.instances = []
+        self.collision_index.clear()
+        if not rt.isValidNode(self.controller):
+            return
+        nodes = self._live_children()
+        if not nodes:
+            return
+        # two calls for the whole group: transforms and unscaled sizes
+        transforms = scatter_bridge.get_transforms(nodes)
+        extents = scatter_bridge.local_extents(nodes)
+        scales = np.linalg.norm(transforms[:, :3, :3], axis=2).max(axis=1)
+        for node, tm, extent, scale in zip(nodes, transforms, extents, scales):
+            instance = ScatterInstance(node, position=tuple(tm[3, :3].tolist()))
+            self.instances.append(instance)
+            self.collision_index.insert(tm[3, :3], extent * scale, instance)
+        # the next scene save writes them as a layout, later loads skip this read
+        self._layout_dirty = True
+        painter_log.debug("Read %d instances of '%s' into the store", len(nodes), self.name)
+
+    def _refresh_radii(self):
+        """read the collision radius of every stored instance again, e.g. after its source changed.
+
+        Two calls for the whole group; the instances and their order are kept.
+        """
+        index = self.collision_index
+        slots = [i for i, alive in enumerate(index.alive) if alive]
+        instances = [index.items[i] for i in slots]
+        if not instances:
+            return
+        transforms = scatter_bridge.get_transforms([inst.node for inst in instances])
+        extents = scatter_bridge.local_extents([inst.node for inst in instances])
+        scales = np.linalg.norm(transforms[:, :3, :3], axis=2).max(axis=1)
+        positions = [index.positions[i] for i in slots]
+        index.clear()
+        for inst, position, extent, scale in zip(instances, positions, extents, scales):
+            index.insert(position, extent * scale, inst)
+        self._layout_dirty = True
+
+    def _restore_layout(self):
+        """fill the instance store from the layout saved on the controller, in one read.
+
+        Returns False when there is no usable layout, e.g. children were added
+        or deleted outside the tool since it was saved; the store is then read
+        from the scene when first needed.
+        """
+        text, nodes, handles = scatter_bridge.read_layout(self.controller)
+        rows = scatter_layout.unpack(text) if text else None
+        if nodes and (rows is None or set(rows["handle"].tolist()) != set(handles)):
+            return False
+        self.instances = []
+        self.collision_index.clear()
+        if nodes:
+            by_handle = dict(zip(handles, nodes))
+            positions = rows["transform"][:, 3].tolist()
+            for row, position in zip(rows.tolist(), positions):
+                handle, _, normal, radius, source, seed = row
+                instance = ScatterInstance(by_handle[handle], position=tuple(position),
+                                           normal=None if math.isnan(normal[0]) else tuple(normal),
+                                           source_index=None if source < 0 else source,
+                                           seed=None if seed < 0 else seed)
+                self.instances.append(instance)
+                self.collision_index.insert(position, radius, instance)
+        self._store_loaded = True
+        return True
+
+    def save_layout(self):
+        """write the instance store to the controller if it changed since the last write.
+
+        Two calls: handles and transforms of the instances, then the write.
+        """
+        # a store never loaded was never changed either, the layout on the controller stays
+        if not self._layout_dirty or not self._store_loaded or not rt.isValidNode(self.controller):
+            return
+        self._layout_dirty = False
+        index = self.collision_index
+        slots = [i for i, alive in enumerate(index.alive) if alive]
+        if not slots:
+            scatter_bridge.write_layout(self.controller, "")
+            return
+        instances = [index.items[i] for i in slots]
+        handles, transforms = scatter_bridge.layout_rows([inst.node for inst in instances])
+        # nodes deleted outside the tool come back with handle 0 and are left out
+        keep = [i for i, h in enumerate(handles.tolist()) if h]
+        instances = [instances[i] for i in keep]
+        text = scatter_layout.pack(handles[keep], transforms[keep],
+                                   [inst.normal for inst in instances],
+                                   [index.radii[slots[i]] for i in keep],
+                                   [inst.source_index for inst in instances],
+                                   [inst.seed for inst in instances])
+        scatter_bridge.write_layout(self.controller, text)
+        log.debug("Saved the layout of %d instances of '%s'", len(instances), self.name)
+
+    def _commit_batch(self, batch, sources, rebuild=False, seed=None):
+        """create one instance per row of a PlacementBatch.
+
+        With rebuild=True the controller's current children are reused for
+        the new layout instead of adding to them. seed is the one the batch
+        was drawn with, kept on each instance.
+        """
+        # collision radius of each instance: source extent times its largest scale
+        extents = [self.footprint(src).extent for src in sources]
+        scales = np.linalg.norm(batch.transforms[:, :3, :3], axis=2).max(axis=1)
+
+        # every node is created, parented and layered by a single MaxScript call
+        pool_size = self.params.get("pool_size", 0)
+        if rebuild:
+            nodes = scatter_bridge.sync_instances(sources, batch.source_indices, batch.transforms,
+                                                  self.controller, self.layer, pool_size)
+        else:
+            nodes = scatter_bridge.commit_instances(sources, batch.source_indices, batch.transforms,
+                                                    self.controller, self.layer, pool_size)
+
+        for i, inst in enumerate(nodes):
+            normal = tuple(batch.normals[i].tolist()) if batch.normals is not None else None
+            tm = batch.transforms[i]
+            source_index = int(batch.source_indices[i])
+            instance = ScatterInstance(inst, normal=normal, position=tuple(tm[3, :3].tolist()),
+                                       source_index=source_index, seed=seed)
+            self.instances.append(instance)
+            self.collision_index.insert(tm[3, :3], extents[source_index] * scales[i], instance)
+        self._layout_dirty = True
+        return nodes
 
     def scatter_surface(self, source_obj):
-        self.clear_instances(delete_nodes=True)
 
         if not (rt.isValidNode(source_obj) and rt.isValidNode(self.surface)):
-            print("ERROR: Select a source object and Editable Poly surface.")
+            log.error("Select a source object and a geometry surface.")
             return
 
-        if not rt.classof(self.surface) == rt.Editable_Poly:
-            try:
-                self.surface = rt.convertToPoly(self.surface)
-                print(f"DEBUG: Converted: {self.surface.name} to Editable Poly.")
-            except Exception as e:
-                print(f"ERROR: Failed to convert surface to Editable Poly. {e}")
-                return
-
         count = self.params.get("count")
-        if count is None:
-            print("DEBUG: 'count' parameter is not defined. Scatter aborted.")
+        distance = self.params.get("distance")
+        if count is None and not distance:
+            log.debug("'count' parameter is not defined. Scatter aborted.")
             return
 
-        # bounding box
-        bb_min, bb_max = rt.nodeGetBoundingBox(self.surface, rt.matrix3(1))
+        sources = self._get_sources(source_obj)
+        if not sources:
+            log.error("No source object available.")
+            return
 
-        created = 0
-        attempts = 0
-        max_attempts = count * 10
+        # triangle snapshot of the surface, cached until the node changes
+        snapshot = scatter_sampling.get_mesh_snapshot(self.surface)
+        if snapshot.area <= 0:
+            log.error("Surface has no area.")
+            return
 
-        placed_points = []
+        seed = self._batch_seed()
+        rng = scatter_engine.make_rng(seed)
 
+        if count is None:
+            self._scatter_surface_poisson(snapshot, sources, distance, rng, seed)
+            return
         collision = self.params.get("check_collisions", False)
         min_distance_factor =  self.params.get("collision_radius_factor", 0.1) if collision else 0.0
-        
-
-        while created < count and attempts < max_attempts:
-            attempts += 1
-
-            # random X,Y in bounding box
-            rand_x = random.uniform(bb_min.x, bb_max.x)
-            rand_y = random.uniform(bb_min.y, bb_max.y)
-
-            # raycast from above
-            ray_origin = rt.point3(rand_x, rand_y, bb_max.z + 1000)
-            ray_dir = rt.point3(0, 0, -1)
-
-            hit = rt.intersectRay(self.surface, rt.ray(ray_origin, ray_dir))
-
-            if not hit:
-                continue
-
-            candidate = hit.pos
-            face_normal = rt.point3(0,0,1)
-
-            # collision check
-            if collision and self.check_collisions(candidate, placed_points, source_obj, min_distance_factor):
-                continue
-
-            # random source
-            random_source = self.manager.get_random() if hasattr(self, 'manager') and self.manager.get_all() else source_obj
-
-            try:
-                inst = rt.instance(random_source)
-                inst.position = candidate
-                inst.parent = self.controller
-                self.layer.addNode(inst)
 
-                self.apply_random_scale_and_rotation(inst)
-
-                self.instances.append(ScatterInstance(inst, normal=face_normal))
-
-                created += 1
-                placed_points.append((candidate, random_source))
-
-            except Exception as e:
-                print(f"ERROR creating instance: {e}")
+        if not collision:
+            # area weighted sampling always yields the exact count
+            positions, normals, _ = snapshot.sample(count, rng)
+            source_indices = rng.integers(0, len(sources), size=len(positions))
+        else:
+            # same attempt budget as before, drawn in one batch
+            candidates, candidate_normals, _ = snapshot.sample(count * 10, rng)
+            candidate_sources = rng.integers(0, len(sources), size=len(candidates))
+            extents = [self.footprint(src).extent for src in sources]
+            source_footprint = self.footprint(source_obj)
+            pending = scatter_spatial.SpatialHashGrid()
+            keep = []
+            for i, candidate in enumerate(candidates):
+                if len(keep) >= count:
+                    break
+                if self.check_collisions(candidate, source_footprint, min_distance_factor, index=pending):
+                    continue
+                keep.append(i)
+                pending.insert(candidate, extents[candidate_sources[i]])
+            positions = candidates[keep]
+            normals = candidate_normals[keep]
+            source_indices = candidate_sources[keep]
+
+        batch = scatter_engine.place_at_points(positions, self.params, len(sources), rng,
+                                               normals=normals, source_indices=source_indices)
+        # store dropped only once the inputs are valid, see scatter_spline
+        self.clear_instances(delete_nodes=False)
+        try:
+            self._commit_batch(batch, sources, rebuild=True, seed=seed)
+        except Exception as e:
+            log.error("Failed to create instances: %s", e)
 
+        created = len(batch)
         if created < count:
-            print(f"Surface is too small to create {count}, only {created} were created.")
+            log.warning("Surface is too small to create %d, only %d were created.", count, created)
         else:
-            print(f"{created} instances of '{source_obj.name}' were created along the surface.")
+            log.info("%d instances of '%s' were created along the surface.", created, source_obj.name)
+
+    def _scatter_surface_poisson(self, snapshot, sources, spacing, rng, seed=None):
+        """fill the surface with blue noise points at least spacing apart."""
+        source_radii = None
+        if self.params.get("poisson_per_source", False):
+            # larger sources keep more free space around them
+            source_radii = [self.footprint(src).xy_radius for src in sources]
+        positions, normals, source_indices, complete = scatter_sampling.poisson_disk(
+            snapshot, spacing, rng, source_radii=source_radii)
+
+        batch = scatter_engine.place_at_points(positions, self.params, len(sources), rng,
+                                               normals=normals, source_indices=source_indices)
+        # store dropped only once the inputs are valid, see scatter_spline
+        self.clear_instances(delete_nodes=False)
+        try:
+            self._commit_batch(batch, sources, rebuild=True, seed=seed)
+        except Exception as e:
+            log.error("Failed to create instances: %s", e)
+        if complete:
+            log.info("%d instances were created on the surface with a spacing of %s.", len(batch), spacing)
+        else:
+            log.warning("%d instances were created on the surface with a spacing of %s, "
+                        "it is not filled completely.", len(batch), spacing)
 
     def scatter_painter (self,world_pos):
-        source_obj = self.manager.get_random() if self.manager and self.manager.get_all() else None
-        if not source_obj:
-            print("ERROR: No hay objetos fuente para scatter_painter")
-            return
-
-        candidate = rt.point3(*world_pos)
+        return self.scatter_painter_batch([world_pos])
+
+    def scatter_painter_batch(self, points, normal=None, min_spacing=0.0, limit=None, project=None):
+        """place the candidates of one brush dab in a single commit.
+
+        project(point) -> (position, normal) or None moves a candidate onto the
+        surface (see scatter_painter.projector); candidates it misses are
+        dropped. It is only called until limit candidates are kept.
+        Candidates closer than min_spacing to a placed instance or to each
+        other are dropped, and with collisions enabled also the ones inside
+        another instance's footprint. At most limit candidates are kept.
+        Returns the number of instances created.
+        """
+        sources = self._get_sources()
+        if not sources:
+            painter_log.error("No hay objetos fuente para scatter_painter")
+            return 0
+        # a copy, projected candidates are moved in place
+        points = np.array(points, dtype=float).reshape(-1, 3)
+        if not len(points):
+            return 0
+        self._ensure_instance_store()
 
         # --- Chequeo de colisiones ---
         collision = self.params.get("check_collisions", False)
         min_distance_factor = self.params.get("collision_radius_factor", 0.1) if collision else 0.0
-        print("DEBUG ▶ Checking collisions at:", candidate)
-        print("DEBUG ▶ Existing instances:", [(inst.node.position, inst.node) for inst in self.instances])
-        print("DEBUG ▶ Collision enabled?", collision)
-        if collision and self.check_collisions(candidate, [(inst.node.position, inst.node) for inst in self.instances], source_obj, min_distance_factor):
-            print("object too close to each other, instance not created.")
-            return
-
-        # --- Crear instancia ---
-        inst = rt.instance(source_obj)
-        inst.position = candidate
-        inst.parent = self.controller
-        self.layer.addNode(inst)
-
-        # --- Random scale/rotation ---
-        self.apply_random_scale_and_rotation(inst)
-
-        # --- Guardar instancia para futuras colisiones ---
-        self.instances.append(ScatterInstance(inst))
-
-        print(f"✅ Instancia de '{source_obj.name}' creada en {world_pos}")
-
-    def check_collisions(self, candidate, placed_points, obj, min_distance_factor=1.0):
-        # Return True if candidate collides (too close) with any placed point.
-        bb_min, bb_max = rt.nodeGetBoundingBox(obj, rt.matrix3(1))
-        size = bb_max - bb_min
-        separation = max(size.x, size.y, size.z) * min_distance_factor
-
-        for entry in placed_points:
-            # placed_points is expected to contain tuples (pt, placed_obj); fall back if only points are present.
-            if isinstance(entry, tuple) and len(entry) == 2:
-                pt, placed_obj = entry
-            else:
-                pt = entry
-                placed_obj = None
-
-            # calculate distance between candidate and existing point
-            dist = rt.length(candidate - pt)
-
-            # get placed object's bbox-based separation if available
-            if placed_obj and rt.isValidNode(placed_obj):
-                bb_min2, bb_max2 = rt.nodeGetBoundingBox(placed_obj, rt.matrix3(1))
-                size2 = bb_max2 - bb_min2
-                separation2 = max(size2.x, size2.y, size2.z)
+        # a fresh seed per dab, stored with its instances
+        seed = scatter_engine.new_seed()
+        rng = scatter_engine.make_rng(seed)
+        source_indices = rng.integers(0, len(sources), size=len(points))
+        extents = [self.footprint(src).extent for src in sources]
+        painter_log.debug("Checking %d candidates against %d instances, collisions: %s",
+                          len(points), len(self.collision_index), collision)
+
+        # cells about as large as the widest test, so a query touches only the cells around it
+        pending = scatter_spatial.SpatialHashGrid(max(min_spacing, max(extents) if collision else 0.0, 1.0))
+        keep = []
+        hit_normals = []
+        for i, p in enumerate(points):
+            if limit is not None and len(keep) >= limit:
+                break
+            if project is not None:
+                hit = project(p)
+                if hit is None:
+                    continue
+                p = points[i] = hit[0]
+            extent = extents[source_indices[i]]
+            separation = max(min_spacing, extent * min_distance_factor)
+            if collision:
+                blocked = self.collision_index.collides(p, separation) or pending.collides(p, separation)
             else:
-                separation2 = 0.0
+                blocked = bool(self.collision_index.query(p, separation) or pending.query(p, separation))
+            if blocked:
+                continue
+            keep.append(i)
+            if project is not None:
+                hit_normals.append(hit[1])
+            pending.insert(p, extent if collision else 0.0)
+        if not keep:
+            painter_log.debug("objects too close to each other, no instance created.")
+            return 0
+
+        # --- Crear instancias con escala/rotacion aleatoria ---
+        # las instancias quedan registradas para futuras colisiones
+        normals = None
+        if project is not None:
+            normals = np.asarray(hit_normals, dtype=float)
+        elif normal is not None:
+            normals = np.broadcast_to(np.asarray(normal, dtype=float), (len(keep), 3))
+        batch = scatter_engine.place_at_points(points[keep], self.params, len(sources), rng,
+                                               normals=normals, source_indices=source_indices[keep])
+        self._commit_batch(batch, sources, seed=seed)
+
+        painter_log.debug("%d instances painted in '%s'", len(batch), self.name)
+        return len(batch)
+
+    def instances_near(self, center, radius):
+        """ScatterInstances within radius of center, found through the spatial index."""
+        self._ensure_instance_store()
+        index = self.collision_index
+        return [index.items[i] for i in index.query(center, radius)]
+
+    def erase_at(self, center, radius):
+        """remove every instance within radius of center; returns how many.
+
+        Removed nodes go to the pool up to pool_size and are deleted past it.
+        """
+        self._ensure_instance_store()
+        slots = self.collision_index.query(center, radius)
+        return self._remove_slots(slots, self.params.get("pool_size", 0))
+
+    def thin_at(self, center, radius, density, rng=None):
+        """hide instances within radius of center until density per square unit is left.
+
+        Thinned nodes always go to the pool, even with pool_size 0, so a
+        later scatter or stroke reuses them. Thinning stops once the pool
+        holds thin_pool_size nodes (or pool_size if larger); deleting is
+        left to erase_at and purge_pool. Returns how many were hidden.
+        """
+        self._ensure_instance_store()
+        slots = self.collision_index.query(center, radius)
+        keep = int(round(density * math.pi * radius ** 2))
+        if len(slots) <= keep or not rt.isValidNode(self.controller):
+            return 0
+        cap = max(self.params.get("pool_size", 0), self.params.get("thin_pool_size", 0))
+        room = cap - scatter_bridge.pool_count(self.controller)
+        if room <= 0:
+            painter_log.warning("The pool of '%s' is full, purge it to thin further.", self.name)
+            return 0
+        rng = rng if rng is not None else scatter_engine.make_rng()
+        drop = rng.choice(len(slots), min(len(slots) - keep, room), replace=False)
+        return self._remove_slots([slots[i] for i in drop], cap)
+
+    def _remove_slots(self, slots, pool_cap):
+        # one bridge call for the whole dab, then drop them from the index and the instance list
+        if not slots or not rt.isValidNode(self.controller):
+            return 0
+        index = self.collision_index
+        removed = [index.items[i] for i in slots]
+        scatter_bridge.park_nodes([inst.node for inst in removed], self.controller, pool_cap)
+        for i in slots:
+            index.remove(i)
+        if index.removed > index.count:
+            # mostly dead slots slow every query down, repack them
+            index.compact()
+        gone = {id(inst) for inst in removed}
+        self.instances = [inst for inst in self.instances if id(inst) not in gone]
+        self._layout_dirty = True
+        painter_log.debug("%d instances removed from '%s'", len(removed), self.name)
+        return len(removed)
+
+    def footprint(self, obj):
+        """cached Footprint (bbox, extent, xy radius) of a source object."""
+        return scatter_footprint.footprints.get(obj)
+
+    def check_collisions(self, candidate, footprint, min_distance_factor=1.0, index=None):
+        # Return True if candidate collides (too close) with any placed point.
+        # Placed points keep their own separation as radius in the spatial index,
+        # so only the neighbouring grid cells are tested.
+        if index is None:
+            index = self.collision_index
+        separation = footprint.extent * min_distance_factor
+        return index.collides(candidate, separation)
 
-            if dist < max(separation, separation2):
-                return True
-        return False
     def normal_direction(self, slider_value):
 
         """Update orientation of instances based on slider value."""
@@ -496,141 +760,145 @@ class ScatterGroup:
         self.params["direction_value"] = slider_value
 
         # update controller user prop for uUI feedback
-        if self.controller and rt.isValidNode(self.controller):
-            rt.setUserProp(self.controller, "ScatterDirection", str(slider_value))
-
-        # slider normalized
-        s = max(-1.0, min(1.0, slider_value / 100.0))
-
-        Z_UP = rt.point3(0,0,1)
-        NEG_Z_UP = rt.point3(0,0,-1)
+        self.save_params()
 
+        # groups loaded from the scene fill their store first
+        self._ensure_instance_store()
         if not hasattr(self, "instances") or not self.instances:
-            print("DEBUG: No instances to update orientation.")
+            log.debug("No instances to update orientation.")
             return
 
-        for idx, inst_data in enumerate(self.instances):
-
-            inst = inst_data.node if hasattr(inst_data,"node") else inst_data.get("node")
-            face_normal = inst_data.normal if hasattr(inst_data,"normal") else inst_data.get("normal")
-
-            if not rt.isValidNode(inst):
-                print(f"DEBUG: Instance {idx} is not valid.")
-                continue
-
-            # if stored normal is not valid, recompute from surface
-            if face_normal == rt.point3(0,0,1) and hasattr(self,"surface") and rt.isValidNode(self.surface):
-                ray_origin = inst.position + rt.point3(0,0,100)
-                ray_dir = rt.point3(0,0,-1)
-                hit = rt.intersectRay(self.surface, rt.ray(ray_origin, ray_dir))
-                if hit:
-                    face_normal = rt.normalize(hit.dir * -1)
-
-            n = rt.normalize(face_normal) if face_normal else Z_UP
-            # Ensure normal is facing upwards for consistent blending
-            if rt.dot(n, Z_UP) < 0:
-                n = -n
-            # Blend between normal and world up based on slider
-            alpha = abs(s)
-            target = Z_UP
-
-            z_axis = rt.normalize((n * (1 - alpha)) + (target * alpha))
+        nodes = [inst.node for inst in self.instances]
+        # instances without a stored normal (spline, painter) blend from world up
+        normals = np.array([inst.normal if inst.normal is not None else (0.0, 0.0, 0.0)
+                            for inst in self.instances], dtype=float)
 
-            if s < 0:
-                z_axis = -z_axis    
-
-
-            # preserve current transform
-            tm = inst.transform
-            pos = inst.position
-
-            # build orthogonal axes
-            up_ref = rt.point3(0,1,0)
-            if abs(rt.dot(z_axis, up_ref)) > 0.99:
-                up_ref = rt.point3(1,0,0)
-
-            x_axis = rt.normalize(rt.cross(z_axis, up_ref))
-            y_axis = rt.normalize(rt.cross(x_axis, z_axis))
-
-            # update transform rows (preserves scale better than rebuilding)
-            tm.row1 = x_axis
-            tm.row2 = y_axis
-            tm.row3 = z_axis
-            tm.row4 = pos
-
-            inst.transform = tm
+        # one read and one write for the whole group, the math runs in the engine
+        transforms = scatter_bridge.get_transforms(nodes)
+        scatter_bridge.set_transforms(nodes, scatter_engine.orient_transforms(transforms, normals, slider_value))
+        self._layout_dirty = True
 
 #manage multiple scatter groups
 
 class ScatterTool:
+
     def __init__(self):
         self.groups = []
+        self._by_handle = {} #controller handle -> group
         self._load_existing_groups()
+        # layouts changed since the last save are written with the scene
+        scatter_bridge.on_scene_save(self.save_layouts)
+        # a profiler switched on later sees the nodes the groups already hold
+        scatter_runtime.hold(self)
+
+    def adopt_values(self, adopt):
+        for group in self.groups:
+            group.adopt_values(adopt)
 
     def _load_existing_groups(self):
-        """Load existing scatter groups from the scene."""
-        self.groups = [] 
-        for obj in rt.objects:
-            if rt.isValidNode(obj): # Check if it's a valid node
-                group_name = rt.getUserProp(obj, "ScatterGroup") 
-                if group_name:# Check if user property exists
-                    # Check if group already loaded
-                    g = ScatterGroup.__new__(ScatterGroup) # Create instance without calling __init__
-                    g.name = group_name
-                    g.target = None
-                    g.controller = obj
-                    g.layer = rt.LayerManager.getLayerFromName(group_name)
-                    g.surface = None
-                    g.spline = None
-                    g.painter = None
-                    g.instances = []
-                    g.manager = ElementsManager()
-                    direction_val = rt.getUserProp(obj, "ScatterDirection")
-                    g.params = {
-                    "count": None,
-                    "distance": None,
-
-                    "pos_jitter": rt.point3(0,0,0),
-
-                    "scale_rangeX": (1.0,1.0),
-                    "scale_rangeY": (1.0,1.0),
-                    "scale_rangeZ": (1.0,1.0),
-
-                    "rot_x_range": (0,0),
-                    "rot_y_range": (0,0),
-                    "rot_z_range": (0,0),
-
-                    "direction_value": int(direction_val) if direction_val else 0,
-
-                    "proportional_scale": rt.getUserProp(obj,"ScatterProportionalScale")=="True",
-                    "random": rt.getUserProp(obj,"ScatterRandom")=="True",
-                    "viewport_percentage": int(rt.getUserProp(obj,"ScatterViewportDisplay") or 100)
-                    }
-                    elements = rt.getUserProp(obj, "ScatterElements")
-                    if elements:
-                        for name in elements.split(","):
-                            node = rt.getNodeByName(name)
-                            if rt.isValidNode(node):
-                                g.manager.add(node)
-
-                    # --- load target if exists ---
-                    target_name = rt.getUserProp(obj, "ScatterTarget")
-                    if target_name:
-                        target_node = rt.getNodeByName(target_name)
-                        if rt.isValidNode(target_node):
-                            g.target = target_node
-                            #assign target to spline or surface
-                            if rt.superClassOf(target_node) == rt.Shape:
-                                g.spline = target_node
-                            elif rt.isKindOf(target_node, rt.GeometryClass):
-                                g.surface = target_node
-                    self.groups.append(g)
-
-                    print(f"DEBUG: Loaded existing group '{group_name}' from controller '{obj.name}'")
+        """Load the scatter groups of the scene's controller registry."""
+        controllers = scatter_bridge.registered_controllers()
+        if controllers is None:
+            # scene saved before the registry existed, one scan writes it
+            log.info("No scatter group registry in the scene, scanning it once.")
+            controllers = scatter_bridge.scan_controllers()
+        self._load_groups(controllers)
+
+    def save_layouts(self):
+        """write the layout of every group whose instances changed, run before the scene is saved."""
+        # an exception here would surface in the MaxScript save callback, log it instead
+        for group in self.groups:
+            try:
+                group.save_layout()
+            except Exception:
+                log.exception("Failed to save the layout of '%s'", group.name)
+
+    def rescan_groups(self):
+        """repair: rebuild the registry from a full scene scan and reload every group."""
+        controllers = scatter_bridge.scan_controllers()
+        self._load_groups(controllers)
+        log.info("Rescanned the scene, %d scatter groups found.", len(self.groups))
+        return self.groups
+
+    def _load_groups(self, controllers):
+        # groups already in memory are kept with their instance store, only new controllers are read
+        known = self._by_handle
+        self.groups = []
+        self._by_handle = {}
+        for obj in controllers:
+            if rt.isValidNode(obj):
+                group = known.get(scatter_bridge.node_handle(obj))
+                if group is None:
+                    group_name = rt.getUserProp(obj, "ScatterGroup")
+                    if not group_name:
+                        continue
+                    group = self._load_group(obj, group_name)
+                self._add_group(group)
+
+    def _add_group(self, group):
+        self.groups.append(group)
+        self._by_handle[scatter_bridge.node_handle(group.controller)] = group
+
+    def add_group(self, group):
+        """track a group made outside create_group, e.g. the painter's free group, so its layout is saved."""
+        known = self._by_handle.get(scatter_bridge.node_handle(group.controller))
+        if known is group:
+            return
+        if known is not None:
+            # the new group took over the controller and its tag
+            self.remove_group(known)
+        self._add_group(group)
+
+    def remove_group(self, group):
+        """forget a group, e.g. once its controller was deleted."""
+        if group in self.groups:
+            self.groups.remove(group)
+        self._by_handle = {h: g for h, g in self._by_handle.items() if g is not group}
+
+    def _load_group(self, obj, group_name):
+        """rebuild a ScatterGroup from its controller's user properties."""
+        # Check if group already loaded
+        g = ScatterGroup.__new__(ScatterGroup) # Create instance without calling __init__
+        g.name = group_name
+        g.target = None
+        g.controller = obj
+        g.layer = rt.LayerManager.getLayerFromName(group_name)
+        g.surface = None
+        g.spline = None
+        g.painter = None
+        g.instances = []
+        g.collision_index = scatter_spatial.SpatialHashGrid()
+        g._store_loaded = False
+        g._layout_dirty = False
+        g.manager = ElementsManager()
+        # every stored parameter in one read, legacy controllers are migrated by it
+        g.params = scatter_params.read(obj)
+        for name in g.params["elements"]:
+            node = rt.getNodeByName(name)
+            if rt.isValidNode(node):
+                g.manager.add(node)
+
+        # --- load target if exists ---
+        target_name = g.params["target"]
+        if target_name:
+            target_node = rt.getNodeByName(target_name)
+            if rt.isValidNode(target_node):
+                g.target = target_node
+                #assign target to spline or surface
+                if rt.superClassOf(target_node) == rt.Shape:
+                    g.spline = target_node
+                elif rt.isKindOf(target_node, rt.GeometryClass):
+                    g.surface = target_node
+
+        # --- instance store from the saved layout, one read ---
+        if not g._restore_layout():
+            log.debug("No usable layout on '%s', its instances are read when needed", obj.name)
+        log.debug("Loaded existing group '%s' from controller '%s'", group_name, obj.name)
+        return g
 
     def create_group(self, source_obj, target_obj, mode=None):
         if not (rt.isValidNode(source_obj) and rt.isValidNode(target_obj)):
-            print("ERROR: Scatter group must be valid.")
+            log.error("Scatter group must be valid.")
             return None
         
         #create a new group with unique name
@@ -639,7 +907,7 @@ class ScatterTool:
         except AttributeError:
             # fallback si no existe lastDummy
             group_name = f"Scatter_{len(self.groups)+1:03d}"
-            print("WARNING: lastDummy not found, using default group name.")
+            log.warning("lastDummy not found, using default group name.")
         new_group = ScatterGroup(group_name)
 
         new_group._setup_group_in_scene(target_obj)
@@ -654,40 +922,62 @@ class ScatterTool:
             new_group.set_surface(target_obj)
             new_group.scatter_surface(source_obj)
         
-        self.groups.append(new_group)
-        print(f"✅ Created new group '{group_name}' with mode '{mode}'")
+        self._add_group(new_group)
+        log.info("Created new group '%s' with mode '%s'", group_name, mode)
         return new_group
     
     def get_group_by_selection(self):
         
         sel =list(rt.selection)
         if not sel:
-            print("ERROR: No objects selected in the scene.")
+            log.error("No objects selected in the scene.")
             return None
 
         obj = sel[0]
         return self.get_group_by_controller(obj)
     
     def get_group_by_controller(self, obj):
-        for g in self.groups:
-            if rt.isValidNode(g.controller):
-                if g.controller == obj or obj.parent == g.controller:
-                    print(f"DEBUG: Found group '{g.name}' by {obj.name}")
-                    return g
-            #rt.messagebox(f"The selection is not a valid controller.", title="Scatter Tool Warning")
-            
-            print(f"DEBUG-get_group_by_controller: Group not in memory for '{obj.name}', reloading groups...")
-            self._load_existing_groups()
-
-            #try again after reloading
-            for g in self.groups:
-                if rt.isValidNode(g.controller):
-                    if g.controller == obj or obj.parent == g.controller:
-                        print(f"DEBUG: Found group '{g.name}' after reload")
-                        return g
-            #rt.messagebox(f"'{obj.name}' is not a valid scatter controller.", title="Scatter Tool Warning")
-            print(f"DEBUG-get_group_by_controller: No group found for '{obj.name}'")
+        """group of a controller or of one of its instances, by handle."""
+        if not rt.isValidNode(obj):
+            return None
+        group = self._lookup(obj)
+        if group is None:
+            group = self._load_on_miss(obj)
+        if group is None:
+            log.debug("No group found for '%s'", obj.name)
+        return group
+
+    def _lookup(self, obj):
+        # the object itself is the controller, or its parent is for an instance
+        group = self._by_handle.get(scatter_bridge.node_handle(obj))
+        if group is None:
+            parent = obj.parent
+            if parent is not None:
+                group = self._by_handle.get(scatter_bridge.node_handle(parent))
+        if group is not None and not rt.isValidNode(group.controller):
+            self.remove_group(group)
             return None
+        return group
+
+    def _load_on_miss(self, obj):
+        """load the group of a tagged controller missing from the registry, registering it."""
+        # only a tagged controller, or a child of one, can be a group the registry missed
+        controller = None
+        group_name = rt.getUserProp(obj, "ScatterGroup")
+        if group_name:
+            controller = obj
+        else:
+            parent = obj.parent
+            group_name = rt.getUserProp(parent, "ScatterGroup") if parent is not None else None
+            if group_name:
+                controller = parent
+        if controller is None:
+            return None
+        log.debug("Group '%s' missing from the registry, registering '%s'", group_name, controller.name)
+        scatter_bridge.register_controller(controller)
+        group = self._load_group(controller, group_name)
+        self._add_group(group)
+        return group
 
     def apply_color_variation(self,hue_var, sat_var, val_var,submat_id,group=None,num_variations=5):
 
@@ -695,12 +985,12 @@ class ScatterTool:
             group = self.current_group
 
         if not group or not rt.isValidNode(group.controller):
-            print("❌ No valid group or controller found.")
+            color_log.error("No valid group or controller found.")
             return
 
-        children =group.controller.children
+        children =group._live_children()
         if not children:
-            print(f"DEBUG: No children found for '{self.name}'.")
+            color_log.debug("No children found for '%s'.", self.name)
             return
         
         #agrupate children by material
@@ -712,7 +1002,7 @@ class ScatterTool:
             material_groups.setdefault(mat, []).append(child)
 
         if not material_groups:
-            print("❌ No children with assigned materials found.")
+            color_log.error("No children with assigned materials found.")
             return
         
         #max range for variation
@@ -730,7 +1020,7 @@ class ScatterTool:
             #get material if multimaterial
             if rt.classOf(base_material) == rt.Multimaterial:
                 if submat_id <1 or submat_id>base_material.numsubs:
-                    print("❌ invalid submaterial ID.")
+                    color_log.error("invalid submaterial ID.")
                     continue
                 sub_material=base_material.materialList[submat_id-1]
             else:
@@ -738,16 +1028,16 @@ class ScatterTool:
 
             #validate if exists a group previous variations to clean
             if not hasattr(self, "current_group") or self.current_group is None:
-                print("❌ No current group set for cleaning previous variations.")
+                color_log.error("No current group set for cleaning previous variations.")
             else:
-                self.cleanup_previous_variations(base_material,submat_id)
+                self.cleanup_previous_variations(base_material,submat_id,group)
         
             #save original map
             original_map = None
             slot_name, prev_map = self.get_color_map_slot(sub_material)
 
             if slot_name is None:
-                print(f"❌ No color map slot found in material '{sub_material.name}'. Skipping variation.")
+                color_log.error("No color map slot found in material '%s'. Skipping variation.", sub_material.name)
                 continue
 
             original_map=prev_map
@@ -770,11 +1060,11 @@ class ScatterTool:
                 #create a new color correction map
                 if rt.classOf(rt.renderers.current) == rt.Arnold:
                     cc = rt.ai_color_correct()
-                    print(f"original map for Arnold color correction: {original_map.name if original_map else 'None'}")
+                    color_log.debug("original map for Arnold color correction: %s", original_map.name if original_map else 'None')
                     cc.input_shader = original_map
                     cc.input_connected= original_map
                     cc.input = original_map
-                    print(f"DEBUG: original map assigned to Arnold color correction: {original_map.name if original_map else 'None'}")
+                    color_log.debug("original map assigned to Arnold color correction: %s", original_map.name if original_map else 'None')
                 else:
                     cc=rt.ColorCorrection()
                     if original_map:
@@ -837,14 +1127,16 @@ class ScatterTool:
                 rt.setUserProp(child, "SCATTER_SOURCE_MATERIAL", base_material)
                 rt.setUserProp(child, "SCATTER_SUB_ID", submat_id)
         
-        print(f"✅ Applied color variation to submaterial ID {submat_id} on group '{group.name}'")
+        color_log.info("Applied color variation to submaterial ID %s on group '%s'", submat_id, group.name)
 
-    def cleanup_previous_variations(self,base_material,submat_id):
-        group = self.current_group
+    def cleanup_previous_variations(self,base_material,submat_id,group=None):
+        if group is None:
+            group = self.current_group
         if not group or not rt.isValidNode(group.controller):
             return
 
-        children = group.controller.children
+        # pooled nodes are hidden leftovers, their materials are not the group's to clean
+        children = group._live_children()
         to_delete = []
 
         for child in children:
@@ -853,7 +1145,7 @@ class ScatterTool:
                 if rt.getUserProp(child, "SCATTER_VARIATION") != True:
                     continue
             except:
-                print("ERROR:Child material missing SCATTER_VARIATION property.")
+                color_log.error("Child material missing SCATTER_VARIATION property.")
                 continue
 
             src = rt.getUserProp(child, "SCATTER_SOURCE_MATERIAL")
@@ -0,0 +1,269 @@
+"""Benchmarks for the scatter modes, run against the in-memory runtime.
+
+Every operation is run on a fresh group inside a RecordingRuntime, which
+reports wall time, peak Python memory and the number of runtime calls,
+including property reads and writes on the nodes the runtime returned. That
+count is the number that predicts speed inside 3ds Max, where each of them
+crosses the pymxs bridge.
+
+    python benchmarks/bench_scatter.py
+    python benchmarks/bench_scatter.py --sizes 1000 10000 --modes spline surface
+    python benchmarks/bench_scatter.py --out before.json
+    python benchmarks/bench_scatter.py --out after.json --compare before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scatter_fake
+import scatter_footprint
+import scatter_runtime
+import scatter_sampling
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+TERRAIN_SIZE = 10000.0
+TERRAIN_SEGMENTS = 100
+
+
+class Scene:
+    """Fake scene with a recording runtime installed and cold caches, rebuilt for every run."""
+
+    def __init__(self):
+        self.fake = scatter_fake.FakeRuntime()
+        self.rt = scatter_runtime.RecordingRuntime(self.fake)
+        scatter_runtime.install(self.rt)
+        # handles restart at 1 in every fake scene, entries cached for an earlier scene would match
+        scatter_sampling.clear_cache()
+        scatter_footprint.footprints.invalidate()
+        import ScatterTool
+        self.tool = ScatterTool
+        self.fake.add_mesh("Post", *scatter_fake.box_mesh(10, 10, 100))
+        self.fake.add_mesh("Rock", *scatter_fake.box_mesh(40, 30, 20))
+        self.fake.add_mesh("Bush", *scatter_fake.box_mesh(25, 25, 40))
+        # zigzag road, long enough for 100k instances at any spacing used here
+        xs = np.linspace(0, 100000, 41)
+        self.fake.add_spline("Road", [(x, (i % 2) * 2000.0, 0.0) for i, x in enumerate(xs)])
+        self.fake.add_mesh("Terrain", *scatter_fake.plane_mesh(
+            TERRAIN_SIZE, TERRAIN_SEGMENTS, lambda x, y: np.sin(x / 700.0) * np.cos(y / 900.0) * 150.0))
+        # nodes are held as the runtime returns them, so their property access is counted
+        self.sources = [self.rt.getNodeByName(name) for name in ("Post", "Rock", "Bush")]
+        self.spline = self.rt.getNodeByName("Road")
+        self.terrain = self.rt.getNodeByName("Terrain")
+
+    def group(self, name, **params):
+        self.fake.add_controller(name)
+        group = self.tool.ScatterGroup(name)
+        group.manager = self.tool.ElementsManager()
+        group.manager.add_many(self.sources)
+        group.params.update(params)
+        return group
+
+
+def op_spline(scene, n):
+    group = scene.group("Spline", count=n)
+    group.set_spline(scene.spline)
+    return lambda: group.scatter_spline(scene.sources[0])
+
+
+def op_spline_rebuild(scene, n):
+    group = scene.group("SplineRebuild", count=n)
+    group.set_spline(scene.spline)
+    group.scatter_spline(scene.sources[0])
+    group.params["rot_z_range"] = (0, 45)
+    return lambda: group.scatter_spline(scene.sources[0])
+
+
+def op_surface(scene, n):
+    group = scene.group("Surface", count=n)
+    group.set_surface(scene.terrain)
+    return lambda: group.scatter_surface(scene.sources[0])
+
+
+def op_surface_collisions(scene, n):
+    group = scene.group("SurfaceCollisions", count=n, check_collisions=True, collision_radius_factor=0.1)
+    group.set_surface(scene.terrain)
+    return lambda: group.scatter_surface(scene.sources[0])
+
+
+def op_shuffle(scene, n):
+    group = scene.group("Shuffle", count=n)
+    group.set_surface(scene.terrain)
+    group.scatter_surface(scene.sources[0])
+    return group.shuffle_instances
+
+
+def op_poisson(scene, n):
+    # spacing that fits about n disks on the terrain
+    spacing = float(np.sqrt(0.6 * TERRAIN_SIZE ** 2 / n))
+    group = scene.group("Poisson", count=None, distance=spacing)
+    group.set_surface(scene.terrain)
+    return lambda: group.scatter_surface(scene.sources[0])
+
+
+def op_poisson_mixed(scene, n):
+    # per source spacing with a boulder over ten times wider than the post
+    spacing = float(np.sqrt(0.6 * TERRAIN_SIZE ** 2 / n))
+    scene.fake.add_mesh("Boulder", *scatter_fake.box_mesh(12 * spacing, 12 * spacing, 50))
+    boulder = scene.rt.getNodeByName("Boulder")
+    group = scene.group("PoissonMixed", count=None, distance=spacing, poisson_per_source=True)
+    group.manager.clear()
+    group.manager.add_many([scene.sources[0], boulder])
+    group.set_surface(scene.terrain)
+    return lambda: group.scatter_surface(scene.sources[0])
+
+
+def op_painter(scene, n):
+    group = scene.group("Painter", check_collisions=True, collision_radius_factor=0.1)
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-TERRAIN_SIZE / 2, TERRAIN_SIZE / 2, size=(n, 3))
+    points[:, 2] = 0.0
+
+    def run():
+        for p in points:
+            group.scatter_painter(tuple(p))
+    return run
+
+
+def op_brush_stroke(scene, n):
+    # one straight stroke whose density adds up to about n instances
+    import scatter_painter
+    group = scene.group("Brush", check_collisions=True, collision_radius_factor=0.1)
+    radius = 500.0
+    length = TERRAIN_SIZE * 0.8
+    density = n / (2.0 * radius * length + np.pi * radius ** 2)
+    dabs = np.linspace(-length / 2, length / 2, 400)
+
+    def run():
+        stroke = scatter_painter.BrushStroke(radius, density, rng=np.random.default_rng(0))
+        for x in dabs:
+            points, count = stroke.dab((x, 0.0, 0.0))
+            if count:
+                stroke.placed += group.scatter_painter_batch(points, (0.0, 0.0, 1.0), stroke.min_spacing, count)
+    return run
+
+
+def op_check_collisions(scene, n):
+    group = scene.group("Collisions")
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-TERRAIN_SIZE / 2, TERRAIN_SIZE / 2, size=(n, 3))
+    for p in points:
+        group.collision_index.insert(p, 10.0)
+    footprint = group.footprint(scene.sources[0])
+    queries = rng.uniform(-TERRAIN_SIZE / 2, TERRAIN_SIZE / 2, size=(n, 3))
+
+    def run():
+        for q in queries:
+            group.check_collisions(q, footprint, 1.0)
+    return run
+
+
+MODES = {
+    "spline": op_spline,
+    "spline_rebuild": op_spline_rebuild,
+    "surface": op_surface,
+    "surface_collisions": op_surface_collisions,
+    "shuffle": op_shuffle,
+    "poisson": op_poisson,
+    "poisson_mixed": op_poisson_mixed,
+    "painter": op_painter,
+    "brush_stroke": op_brush_stroke,
+    "check_collisions": op_check_collisions,
+}
+
+
+def measure(mode, n, memory=True):
+    """run one mode at one size; returns a result dict."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        scene = Scene()
+        run = MODES[mode](scene, n)
+        scene.rt.reset()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        counts = scene.rt.snapshot()
+        instances = len(scene.fake.objects)
+
+    peak = None
+    if memory:
+        # separate pass, tracemalloc slows the code it traces
+        with contextlib.redirect_stdout(io.StringIO()):
+            scene = Scene()
+            run = MODES[mode](scene, n)
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    scatter_runtime.restore()
+    return {
+        "mode": mode,
+        "size": n,
+        "seconds": elapsed,
+        "peak_bytes": peak,
+        "runtime_calls": counts["total"],
+        "calls_per_instance": counts["total"] / max(1, n),
+        "calls": counts["calls"],
+        "reads": counts["reads"],
+        "writes": counts["writes"],
+        "scene_nodes": instances,
+    }
+
+
+def compare(results, baseline_path):
+    """print the change of time and runtime calls against an older result file."""
+    with open(baseline_path) as f:
+        baseline = {(r["mode"], r["size"]): r for r in json.load(f)["results"]}
+    print(f"\ncompared to {baseline_path}")
+    for r in results:
+        old = baseline.get((r["mode"], r["size"]))
+        if not old:
+            continue
+        print(f"{r['mode']:>20} {r['size']:>7}  time x{r['seconds'] / max(old['seconds'], 1e-9):6.2f}"
+              f"  calls {old['runtime_calls']:>9} -> {r['runtime_calls']:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=list(MODES))
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare with")
+    parser.add_argument("--skip-memory", action="store_true", help="skip the peak memory pass")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'mode':>20} {'size':>7} {'seconds':>9} {'peak MB':>8} {'rt calls':>9} {'calls/inst':>10}")
+    for mode in args.modes:
+        for n in args.sizes:
+            r = measure(mode, n, memory=not args.skip_memory)
+            results.append(r)
+            peak = f"{r['peak_bytes'] / 2 ** 20:8.1f}" if r["peak_bytes"] is not None else f"{'-':>8}"
+            print(f"{mode:>20} {n:>7} {r['seconds']:9.3f} {peak} {r['runtime_calls']:>9} "
+                  f"{r['calls_per_instance']:10.3f}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=2)
+        print(f"\nresults written to {args.out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
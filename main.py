@@ -5,7 +5,12 @@ if BASE_DIR not in sys.path:
 import qtmax
 from ui_scattertool_UI import Ui_ScatterToolUI
 from scattertool import ScatterTool,ElementsManager,ScatterGroup
-from pymxs import runtime as rt
+from scatter_runtime import rt
+import scatter_bridge
+import scatter_log
+import scatter_painter
+import scatter_raycast
+import scatter_runtime
 try:
     from PySide2 import QtWidgets,QtCore
     from PySide2.QtCore import QStringListModel
@@ -14,12 +19,23 @@ except ImportError:
     from PySide6 import QtWidgets,QtCore
     from PySide6.QtCore import QStringListModel
     from PySide6.QtWidgets import QButtonGroup
-import random
-import math
 import builtins
 
+log = scatter_log.get_logger("ui")
+painter_log = scatter_log.get_logger("painter")
+
 
 class ScatterToolApp(QtWidgets.QMainWindow):
+    #painter dabs need this many pixels of cursor travel and ms since the last dab
+    PAINTER_SPACING_PX = 8
+    PAINTER_INTERVAL_MS = 15
+    #instances per square scene unit painted by the brush
+    DEFAULT_BRUSH_DENSITY = 0.001
+    #distance between brush dabs along a stroke, as a fraction of the brush radius
+    BRUSH_SPACING = scatter_painter.DEFAULT_SPACING
+    #a burst of selection events closer than this is handled once
+    SELECTION_DELAY_MS = 50
+
     def __init__(self):
         #create controller before UI to avoid null references
 
@@ -93,6 +109,14 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         super(ScatterToolApp, self).__init__(parent=qtmax.GetQMaxMainWindow())
         self.ui = Ui_ScatterToolUI()
         self.ui.setupUi(self)
+        self._add_brush_density_spinner()
+        self._add_brush_mode_combo()
+        self._add_rescan_button()
+        self._add_pool_controls()
+        self._add_poisson_per_source_check()
+        self._stroke = None #BrushStroke of the painter stroke in progress
+        self._painter_group = None #group painted into, held until invalidated
+        self.paint_targets = scatter_raycast.PaintTargets() #nodes the painter hits, empty means the group surface
         self.setWindowFlags(
             QtCore.Qt.Tool |
             QtCore.Qt.CustomizeWindowHint |
@@ -117,6 +141,7 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         self.scatter_tool = ScatterTool()
 
         self.current_group = None
+        self._selected_group = None #group resolved from the last handled selection
         
         self.block_selection_callback=False  # Flag to prevent recursive selection callback calls
 
@@ -147,8 +172,9 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         #default distance
         self.ui.spin_distance.setValue(50)
 
-        #default brush size
+        #default brush size and density
         self.ui.spin_brush.setValue(100)
+        self.ui.spin_brushDensity.setValue(self.DEFAULT_BRUSH_DENSITY)
 
         #default slider direction
         self.ui.horizontalSlider_direction.setValue(100)
@@ -164,6 +190,8 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         #elements manager to handle source objects.
         self.manager = ElementsManager()
         self.source_obj = None
+        # a profiler switched on later sees the nodes the window already holds
+        scatter_runtime.hold(self)
 
         #show elements in the list widget.
         self.elements = []  # Your elements list
@@ -191,6 +219,12 @@ class ScatterToolApp(QtWidgets.QMainWindow):
 
         self.setup_connections()
 
+        #selection events restart this timer, the selection is only read once they stop
+        self._selection_timer = QtCore.QTimer(self)
+        self._selection_timer.setSingleShot(True)
+        self._selection_timer.setInterval(self.SELECTION_DELAY_MS)
+        self._selection_timer.timeout.connect(self.on_selection_changed)
+
         #selection callback
         try:
             ms_script = 'python.Execute "scattertool_app_instance._selection_changed_static()"'
@@ -201,7 +235,7 @@ class ScatterToolApp(QtWidgets.QMainWindow):
                 id=self._sel_cb_name
                 )
         except Exception as e:
-            print(f"Error adding selection callback: {e}")
+            log.error("Error adding selection callback: %s", e)
         
         # Expose the application instance to builtins for access in the callback
         builtins.scattertool_app_instance = self
@@ -212,6 +246,107 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             pass 
     
     # --------------------------- UI & list handling ---------------------------
+    def _add_brush_density_spinner(self):
+        """brush density (instances per square unit) next to the brush size, not in the .ui file."""
+        self.ui.label_brushDensity = QtWidgets.QLabel("Density", self.ui.groupBox_dmethod)
+        self.ui.spin_brushDensity = QtWidgets.QDoubleSpinBox(self.ui.groupBox_dmethod)
+        self.ui.spin_brushDensity.setDecimals(5)
+        self.ui.spin_brushDensity.setRange(0.0, 10.0)
+        self.ui.spin_brushDensity.setSingleStep(0.0001)
+        self.ui.spin_brushDensity.setToolTip("Instances per square scene unit painted by the brush")
+        self.ui.horizontalLayout_6.addWidget(self.ui.label_brushDensity)
+        self.ui.horizontalLayout_6.addWidget(self.ui.spin_brushDensity)
+
+    def _add_brush_mode_combo(self):
+        """paint, erase or thin brush, next to the brush density, not in the .ui file."""
+        self.ui.label_brushMode = QtWidgets.QLabel("Brush", self.ui.groupBox_dmethod)
+        self.ui.combo_brushMode = QtWidgets.QComboBox(self.ui.groupBox_dmethod)
+        self.ui.combo_brushMode.addItems([m.capitalize() for m in scatter_painter.BRUSH_MODES])
+        self.ui.combo_brushMode.setToolTip(
+            "Paint adds instances, Erase removes the ones under the brush,\n"
+            "Thin removes them down to the brush density")
+        self.ui.horizontalLayout_6.addWidget(self.ui.label_brushMode)
+        self.ui.horizontalLayout_6.addWidget(self.ui.combo_brushMode)
+
+    def _add_rescan_button(self):
+        """repair action next to the group name: find every group by a full scene scan."""
+        self.ui.button_rescanGroups = QtWidgets.QToolButton(self.ui.widget_main)
+        self.ui.button_rescanGroups.setText("Rescan")
+        self.ui.button_rescanGroups.setToolTip(
+            "Scan the whole scene for scatter groups and rebuild the group registry")
+        self.ui.button_rescanGroups.clicked.connect(self.on_rescan_groups)
+        self.ui.horizontalLayout_3.addWidget(self.ui.button_rescanGroups)
+
+    def _add_pool_controls(self):
+        """cap of the group's hidden instance pool and a purge, next to Shuffle, not in the .ui file."""
+        parent = self.ui.widget_elementTransform
+        self.ui.label_poolSize = QtWidgets.QLabel("Pool", parent)
+        self.ui.spin_poolSize = QtWidgets.QSpinBox(parent)
+        self.ui.spin_poolSize.setRange(0, 100000)
+        self.ui.spin_poolSize.setToolTip(
+            "Removed instances kept hidden under the group for the next scatter to reuse,\n"
+            "0 deletes them")
+        self.ui.label_thinPoolSize = QtWidgets.QLabel("Thin", parent)
+        self.ui.spin_thinPoolSize = QtWidgets.QSpinBox(parent)
+        self.ui.spin_thinPoolSize.setRange(0, 1000000)
+        self.ui.spin_thinPoolSize.setValue(10000)
+        self.ui.spin_thinPoolSize.setToolTip(
+            "Instances the thin brush may keep hidden in the pool, it never deletes;\n"
+            "Purge empties the pool")
+        self.ui.button_purgePool = QtWidgets.QToolButton(parent)
+        self.ui.button_purgePool.setText("Purge")
+        self.ui.button_purgePool.setToolTip("Delete the hidden instances kept in the group's pool")
+        self.ui.spin_poolSize.valueChanged.connect(self.on_pool_size_changed)
+        self.ui.spin_thinPoolSize.valueChanged.connect(self.on_thin_pool_size_changed)
+        self.ui.button_purgePool.clicked.connect(self.on_purge_pool)
+        self.ui.horizontalLayout_06.addWidget(self.ui.label_poolSize)
+        self.ui.horizontalLayout_06.addWidget(self.ui.spin_poolSize)
+        self.ui.horizontalLayout_06.addWidget(self.ui.label_thinPoolSize)
+        self.ui.horizontalLayout_06.addWidget(self.ui.spin_thinPoolSize)
+        self.ui.horizontalLayout_06.addWidget(self.ui.button_purgePool)
+
+    def _add_poisson_per_source_check(self):
+        """surface spacing option next to the distance spinner, not in the .ui file."""
+        self.ui.checkBox_poissonPerSource = QtWidgets.QCheckBox("Per source", self.ui.groupBox_dmethod)
+        self.ui.checkBox_poissonPerSource.setToolTip(
+            "Surface distance: larger sources keep their own footprint free around them")
+        self.ui.checkBox_poissonPerSource.stateChanged.connect(self.on_poisson_per_source_changed)
+        self.ui.horizontalLayout_2.addWidget(self.ui.checkBox_poissonPerSource)
+
+    def on_poisson_per_source_changed(self):
+        if not self.current_group or not rt.isValidNode(self.current_group.controller):
+            return
+        self.current_group.params["poisson_per_source"] = self.ui.checkBox_poissonPerSource.isChecked()
+        self.current_group.save_params()
+
+    def on_pool_size_changed(self, value):
+        if not self.current_group or not rt.isValidNode(self.current_group.controller):
+            return
+        self.current_group.params["pool_size"] = value
+        self.current_group.save_params()
+
+    def on_thin_pool_size_changed(self, value):
+        if not self.current_group or not rt.isValidNode(self.current_group.controller):
+            return
+        self.current_group.params["thin_pool_size"] = value
+        self.current_group.save_params()
+
+    def on_purge_pool(self):
+        if not self.current_group:
+            log.warning("No current group to purge.")
+            return
+        self.current_group.purge_pool()
+
+    def on_rescan_groups(self):
+        self.scatter_tool.rescan_groups()
+        self.invalidate_painter_group()
+        # show the selected group again, its object may have been replaced
+        self._selected_group = None
+        self.on_selection_changed()
+
+    def brush_mode(self):
+        return scatter_painter.BRUSH_MODES[max(self.ui.combo_brushMode.currentIndex(), 0)]
+
     def refresh_listview(self):
         self.manager.elements = [obj for obj in self.manager.get_all() if rt.isValidNode(obj)]
         self.elements = [obj.name for obj in self.manager.get_all()]
@@ -229,6 +364,7 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         self.ui.Button_update.clicked.connect(self.on_update)
         self.ui.spinBox_viewDisp.valueChanged.connect(self.on_viewport_disp_changed)
         self.ui.pushButton_apply.clicked.connect(self.on_apply_color_variation)
+        self.ui.spin_brush.valueChanged.connect(scatter_bridge.set_brush_radius)
     
     # --------------------------- Mode buttons ---------------------------
 
@@ -236,6 +372,8 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         # reset buttons
         widgets_to_enable = [
             self.ui.spin_brush, self.ui.label_brushSize,
+            self.ui.spin_brushDensity, self.ui.label_brushDensity,
+            self.ui.combo_brushMode, self.ui.label_brushMode,
             self.ui.button_pickSpline, self.ui.button_pickSurface,
             self.ui.button_distance, self.ui.spin_distance,
             self.ui.button_elementCount, self.ui.spin_elementCount,
@@ -259,12 +397,19 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             self.ui.button_pickSpline.setEnabled(False)
             self.ui.button_activate_painter.setEnabled(False)
 
-            #disable distribution mode not applicable to surface
-            self.ui.button_distance.setEnabled(False)
-            self.ui.spin_distance.setEnabled(False)
+            #distance on a surface means poisson disk spacing
+            self.ui.button_distance.setEnabled(True)
+            self.ui.spin_distance.setEnabled(self.ui.button_distance.isChecked())
+            self.ui.checkBox_poissonPerSource.setEnabled(True)
+            self.ui.button_elementCount.setEnabled(True)
+            self.ui.spin_elementCount.setEnabled(self.ui.button_elementCount.isChecked())
 
             self.ui.label_brushSize.setEnabled(False)
             self.ui.spin_brush.setEnabled(False)
+            self.ui.label_brushDensity.setEnabled(False)
+            self.ui.spin_brushDensity.setEnabled(False)
+            self.ui.label_brushMode.setEnabled(False)
+            self.ui.combo_brushMode.setEnabled(False)
 
             #position jitter disable
             for w in (self.ui.spin_PxMin, self.ui.spin_PxMax,
@@ -282,18 +427,24 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             # enable distribution
             self.ui.button_distance.setEnabled(True)
             self.ui.spin_distance.setEnabled(self.ui.button_distance.isChecked())
+            self.ui.checkBox_poissonPerSource.setEnabled(False)
             self.ui.button_elementCount.setEnabled(True)
             self.ui.spin_elementCount.setEnabled(self.ui.button_elementCount.isChecked())
 
             self.ui.label_brushSize.setEnabled(False)
             self.ui.spin_brush.setEnabled(False)
+            self.ui.label_brushDensity.setEnabled(False)
+            self.ui.spin_brushDensity.setEnabled(False)
+            self.ui.label_brushMode.setEnabled(False)
+            self.ui.combo_brushMode.setEnabled(False)
 
         
         #painter mode
         elif self.ui.button_painter.isChecked():
             
             self.ui.button_pickSpline.setEnabled(False)
-            self.ui.button_pickSurface.setEnabled(False)
+            #in painter mode the surface button picks the paint targets
+            self.ui.button_pickSurface.setEnabled(True)
             self.ui.button_activate_painter.setEnabled(True)
 
 
@@ -301,21 +452,26 @@ class ScatterToolApp(QtWidgets.QMainWindow):
 
             self.ui.button_distance.setEnabled(False)
             self.ui.spin_distance.setEnabled(False)
+            self.ui.checkBox_poissonPerSource.setEnabled(False)
             self.ui.button_elementCount.setEnabled(False)
             self.ui.spin_elementCount.setEnabled(False)
             # enable brush
             self.ui.spin_brush.setEnabled(True)
             self.ui.label_brushSize.setEnabled(True)
+            self.ui.spin_brushDensity.setEnabled(True)
+            self.ui.label_brushDensity.setEnabled(True)
+            self.ui.combo_brushMode.setEnabled(True)
+            self.ui.label_brushMode.setEnabled(True)
 
             #execute painter click function
             self.ui.button_painter.toggled.connect(
-                lambda _: rt.execute("try(stopTool T) catch() if isValidNode $BrushPreview do delete $BrushPreview") 
+                lambda _: self.deactivate_painter_mode()
                 if not (self.ui.button_painter.isChecked() and self.ui.button_activate_painter.isChecked())
                 else self.activate_painter_mode()
             )
 
             self.ui.button_activate_painter.toggled.connect(
-                lambda _: rt.execute("try(stopTool T) catch()") 
+                lambda _: scatter_bridge.stop_painter()
                 if not (self.ui.button_painter.isChecked() and self.ui.button_activate_painter.isChecked())
                 else self.activate_painter_mode()
             )
@@ -323,23 +479,6 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         self.on_toggle_random(self.ui.checkBox_random.isChecked())
         
     # --------------------------- Scatter Painter ---------------------------
-    def draw_brush_preview(self, pos):
-        """Draw a circle helper at the given position to visualize the brush size."""
-        brush_radius = self.ui.spin_brush.value()
-        if brush_radius <= 0:
-            return
-
-        # MaxScript para crear un helper temporal tipo circle
-        ms = f'''
-        if isValidNode $BrushPreview do delete $BrushPreview
-        bp = circle name:"BrushPreview" radius:{brush_radius} pos:(point3 {pos[0]} {pos[1]} {pos[2]})
-        bp.wirecolor = yellow
-        bp.boxmode = false
-        
-        '''
-        rt.execute(ms)
-
-    
     def activate_painter_mode(self):
         """
         Activate Painter mode in 3ds Max.
@@ -347,103 +486,114 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         using the function scatter_place_at_point().
         """
 
-        # First, we try to stop any active tool T
-        try:
-            rt.execute("try(stopTool T) catch()")
-            print("✅  Painter mode previously stopped (if it was active).")
-        except RuntimeError as e:
-            print("⚠️ The tool could not be stopped previously:", e)
+        # First, we stop any painter tool still running
+        self.deactivate_painter_mode()
 
         # Expose the application instance to builtins for access in MaxScript
-        import builtins
         builtins.scattertool_app_instance = self
-        print("PY ▶ scattertool_app_instance assigned")
-
-        # MaxScript code for the painter tool
-        ms_tool = r'''
-        tool T
-        (
-            on mouseMove clickNo do
-            (
-                local r = mapScreenToWorldRay mouse.pos
-                local hits = intersectRayScene r
 
-                if hits != undefined and hits.count > 0 then
-                (
-                    local hitData = hits[1][2]
-                    local hitPos = if isProperty hitData #pos then hitData.pos else [0,0,0]
+        # the tool calls on_painter_event directly with numbers, throttled on the MaxScript side
+        try:
+            scatter_bridge.set_brush_radius(self.ui.spin_brush.value())
+            self.refresh_paint_targets()
+            scatter_bridge.start_painter(self.on_painter_event, self.PAINTER_SPACING_PX, self.PAINTER_INTERVAL_MS)
+            painter_log.info("Painter mode activated successfully.")
+        except RuntimeError as e:
+            painter_log.error("Error activating Painter mode: %s", e)
 
-                    -- Llamada a scatter_place_at_point solo si el botón izquierdo está presionado
-                    if mouse.buttonStates[1] then
-                    (
-                        local py_cmd = "scattertool_app_instance.scatter_place_at_point((" +
-                                        (hitPos.x as string) + "," +
-                                        (hitPos.y as string) + "," +
-                                        (hitPos.z as string) + "))"
-                        python.execute py_cmd
-                    )
+    def deactivate_painter_mode(self):
+        try:
+            scatter_bridge.stop_painter()
+        except RuntimeError as e:
+            painter_log.warning("The painter tool could not be stopped: %s", e)
 
-                    -- Draw brush preview siempre que haya un hit
-                    local py_preview_cmd = "scattertool_app_instance.draw_brush_preview((" +
-                                            (hitPos.x as string) + "," +
-                                            (hitPos.y as string) + "," +
-                                            (hitPos.z as string) + "))"
-                    python.execute py_preview_cmd
-                )
-                else
-                (
-                    print "Not on surface"
-                )
-            )
-        )
-        startTool T
-        '''
+    def on_painter_event(self, event, position, normal):
+        """receives the painter tool events: stroke begin, dab and stroke end.
 
-        # Execute the MaxScript to activate the painter tool
+        The brush cursor is moved by the tool itself, hovering sends no event.
+        """
+        # an exception here would abort the MaxScript tool, log it instead
         try:
-            rt.execute(ms_tool)
-            print("✅ Painter mode activated successfully.")
-        except RuntimeError as e:
-            print("❌ Error activating Painter mode:", e)
+            if event == scatter_bridge.PAINT_BEGIN:
+                self.begin_stroke()
+            elif event == scatter_bridge.PAINT_DAB:
+                self.scatter_place_at_point(position, normal)
+            elif event == scatter_bridge.PAINT_END:
+                self.end_stroke()
+        except Exception:
+            painter_log.exception("Painter event %s failed", event)
 
 
     # --------------------------- Scatter placement functions ---------------------------
-    def scatter_with_brush(self,group, world_pos):
+    def scatter_with_brush(self,group, world_pos, normal=None):
         radius = self.ui.spin_brush.value()
         if radius <= 0:
-            print("DEBUG ▶ Brush radius is zero or negative, skipping scatter.")
+            painter_log.debug("Brush radius is zero or negative, skipping scatter.")
             return
-        #---for future use
-        #density = self.ui.spin_density.value()
-        density = 0.02  # Placeholder density value
-
-        area= 3.1416 * (radius ** 2)
-        count= max(1, int(area * density))
-        count=min(count, 10)  #limit max count to avoid overpopulation
-        for _ in range(count):
-            angle = random.uniform(0, 2 * 3.1416)
-            r= random.uniform(0, radius)
-            final_pos = [
-            world_pos[0] + math.cos(angle) * r,
-            world_pos[1] + math.sin(angle) * r,
-            world_pos[2]
-        ]
+        # a dab outside a begin/end pair (called from script) gets its own stroke
+        stroke = self._stroke or self.begin_stroke()
 
-        group.scatter_painter(final_pos)
-
-        # Calculate random offset within brush radius
-        """offset= [
-            random.uniform(-radius, radius),  # X
-            random.uniform(-radius, radius),  # Y
-            0   # Z
-        ]
-        final_pos = [world_pos[i] + offset[i] for i in range(3)]
-        print(f"debug ▶ radius: {radius}, world_pos: {world_pos}, offset: {offset}, final_pos: {final_pos}")
-        group.scatter_painter(final_pos)"""
+        mode = self.brush_mode()
+        if mode == scatter_painter.ERASE:
+            stroke.removed += group.erase_at(world_pos, radius)
+            return
+        if mode == scatter_painter.THIN:
+            stroke.removed += group.thin_at(world_pos, radius, stroke.density, stroke.rng)
+            return
 
-    def scatter_place_at_point(self,world_pos):
-        
+        # only the area swept since the last dab is filled, at the brush density
+        brush_normal = normal if normal is not None else (0.0, 0.0, 1.0)
+        points, count = stroke.dab(world_pos, brush_normal)
+        if count:
+            # candidates are dropped onto the paint targets, without targets they stay on the brush plane
+            project = None
+            if self.paint_targets.bvh is not None:
+                project = scatter_painter.projector(self.paint_targets.raycast, brush_normal, radius)
+            stroke.placed += group.scatter_painter_batch(points, normal, stroke.min_spacing, count, project)
+
+    def begin_stroke(self):
+        # resolve the target group at stroke start, dabs reuse it
+        self.painter_group()
+        self.refresh_paint_targets()
+        self._stroke = scatter_painter.BrushStroke(
+            self.ui.spin_brush.value(), self.ui.spin_brushDensity.value(), self.BRUSH_SPACING * self.ui.spin_brush.value())
+        return self._stroke
+
+    def end_stroke(self):
+        if self._stroke is not None:
+            painter_log.debug("Stroke finished, %d instances placed, %d removed",
+                              self._stroke.placed, self._stroke.removed)
+        self._stroke = None
+
+    def scatter_place_at_point(self,world_pos, normal=None):
+        # the group is resolved once and held for the stroke, see painter_group()
+        self.scatter_with_brush(self.painter_group(), world_pos, normal)
+
+    def painter_group(self):
+        """group the painter paints into, resolved once and held until invalidate_painter_group()."""
+        if self._painter_group is None:
+            self._painter_group = self._resolve_painter_group()
+            # deleting its controller drops the held group, no per dab validity check needed
+            scatter_bridge.watch_painter_controller(self._painter_group.controller, self.invalidate_painter_group)
+        return self._painter_group
+
+    def invalidate_painter_group(self):
+        """forget the held painter group, the next stroke resolves it again."""
+        self._painter_group = None
+
+    def refresh_paint_targets(self):
+        """point the painter's ray cast at the paint targets, rebuilding their BVH if they changed.
+
+        Without picked targets the surface of the painted group is used. With no
+        target at all the tool falls back to hitting the whole scene.
+        """
+        surface = getattr(self._painter_group, "surface", None)
+        bvh = self.paint_targets.refresh(valid=rt.isValidNode, fallback=[surface] if surface is not None else [])
+        scatter_bridge.set_painter_raycast(self.paint_targets.raycast if bvh is not None else None)
+        if bvh is not None:
+            painter_log.debug("Painting on %d triangles", len(bvh))
 
+    def _resolve_painter_group(self):
         # Intenta obtener un grupo activo
         active_group = None
         if hasattr(self, "scatter_tool") and self.scatter_tool:
@@ -452,8 +602,10 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         # Si no hay grupo activo, crear uno temporal
         if not active_group:
             active_group = getattr(self, "_painter_free_group", None)
+            if active_group and not rt.isValidNode(active_group.controller):
+                active_group = None
             if not active_group:
-                print("DEBUG ▶ There is no active group, creating a temporary group 'PainterFree'")
+                painter_log.debug("There is no active group, creating a temporary group 'PainterFree'")
                 temp_group_name = "PainterFree"
                 active_group = ScatterGroup(temp_group_name)
                 active_group.manager = self.manager  # assign elements manager
@@ -478,9 +630,11 @@ class ScatterToolApp(QtWidgets.QMainWindow):
                         "proportional_scale": self.ui.checkBox_proportionalScale.isChecked(),
                         "random": self.ui.checkBox_random.isChecked()
                     }
+                # tracked by the tool like any group, so its layout is saved with the scene
+                self.scatter_tool.add_group(active_group)
                 self._painter_free_group = active_group
-        # call scatter_painter on the active group
-        self.scatter_with_brush(active_group, world_pos)
+        painter_log.debug("Painting into group '%s'", active_group.name)
+        return active_group
 
 
     # --------------------------- Selection callback ---------------------------
@@ -490,205 +644,115 @@ class ScatterToolApp(QtWidgets.QMainWindow):
 
             app = getattr(builtins, "scattertool_app_instance", None)
             if app:
-                app.on_selection_changed()
+                app.schedule_selection_changed()
         except Exception as e:
-            print(f"DEBUG: error en _selection_changed_static -> {e}")
-
-    def on_selection_changed(self):
+            log.debug("error en _selection_changed_static -> %s", e)
 
+    def schedule_selection_changed(self):
+        """coalesce selection events: on_selection_changed runs once they stop for SELECTION_DELAY_MS."""
         if getattr(self, "block_selection_callback", False):
-            print("DEBUG: Selection callback is currently blocked, skipping.")
+            log.debug("Selection callback is currently blocked, skipping.")
             return
+        self._selection_timer.start()
 
+    def on_selection_changed(self):
         """Automatically load group parameters if a group's dummy is selected."""
-        sel = list(rt.selection)
-        if not sel: 
+        if getattr(self, "block_selection_callback", False):
+            log.debug("Selection callback is currently blocked, skipping.")
             return
-        obj = sel[0]
-        group = self.scatter_tool.get_group_by_controller(obj)
 
+        sel = rt.selection
+        group = self.scatter_tool.get_group_by_controller(sel[0]) if sel.count > 0 else None
+        if group is self._selected_group:
+            # same group as the last selection (or still none), nothing to reload
+            return
+        self._selected_group = group
+        # a new selection may pick another group to paint into
+        self.invalidate_painter_group()
         if not group:
             return
 
+        # params are in memory, showing a group reads no user prop
+        self._load_group_ui(group)
+        self.show_group_name(group)
+
+    def _value_widgets(self):
+        """spin boxes, sliders and checkable buttons of the panel."""
+        return [w for w in vars(self.ui).values()
+                if isinstance(w, (QtWidgets.QAbstractSpinBox, QtWidgets.QAbstractSlider))
+                or (isinstance(w, QtWidgets.QAbstractButton) and w.isCheckable())]
+
+    def _load_group_ui(self, group):
+        """show a group from its params; widget edits never saved to them are dropped."""
         self.current_group = group
         
         if group.manager is None:
             group.manager = ElementsManager()
         self.manager = group.manager
-        self.refresh_listview()
 
         ctrl = group.controller
         if not ctrl or not rt.isValidNode(ctrl):
-            print("DEBUG: Group controller invalid.")
+            self.refresh_listview()
+            log.debug("Group controller invalid.")
             return
-        # --- Target object ---
-        target_name = rt.getUserProp(ctrl, "ScatterTarget")
-        if target_name:
-            node = rt.getNodeByName(target_name)
-            if node and rt.isValidNode(node):
-                self.pending_target = node
-                group.target = node
-            else:
-                self.pending_target = None
-                group.target = None
-        else:
-            self.pending_target = None
-            group.target = None
-        # --- Buttons / checkboxes ---
-        mode = rt.getUserProp(ctrl, "ScatterMode")
-        self.ui.button_spline.setChecked(mode == "spline")
-        self.ui.button_surface.setChecked(mode == "surface")
-        self.ui.button_painter.setChecked(mode == "painter")
-
-        # --- Checkboxes ---
-        val_random = rt.getUserProp(ctrl, "ScatterRandom")
-        random_enabled = val_random if isinstance(val_random, bool) else str(val_random).lower() == "true"
-        self.ui.checkBox_random.setChecked(random_enabled)
-
-        val_prop = rt.getUserProp(ctrl, "ScatterProportionalScale")
-        proportional = val_prop if isinstance(val_prop, bool) else str(val_prop).lower() == "true"
-        self.ui.checkBox_proportionalScale.setChecked(proportional)
-
-        val_box = rt.getUserProp(ctrl, "ScatterDisplayAsBox")
-        self.ui.button_box.setChecked(val_box if isinstance(val_box, bool) else str(val_box).lower() == "true")
-
-        val_coll_enabled = rt.getUserProp(ctrl, "ScatterCollisionEnabled")
-        coll=val_coll_enabled if isinstance(val_coll_enabled, bool) else str(val_coll_enabled).lower() == "true"
-        self.ui.checkBox_collision.setChecked(coll)
-
-
-        # --- Numeric parameters ---
-        # Count
-        count = rt.getUserProp(ctrl, "ScatterCount")
-        if count:
-            self.ui.spin_elementCount.setValue(int(count))
-        
-        # Distance
-        distance = rt.getUserProp(ctrl, "ScatterDistance")
-        if distance:
-            self.ui.spin_distance.setValue(float(distance))
-        
-        # Brush size
-        size_brush = rt.getUserProp(ctrl, "ScatterBrushSize")
-        if size_brush:
-            self.ui.spin_brush.setValue(float(size_brush))
-
-        #collision radius
-        coll_radius = rt.getUserProp(ctrl, "ScatterCollisionRadius")
-        if coll_radius:
-            self.ui.spinBox_colRadius.setValue(int(coll_radius) if coll_radius else 100)
-
-        #direction slider
-        direction_value = rt.getUserProp(ctrl, "direction_value")
-        if direction_value:
-            self.ui.horizontalSlider_direction.setValue(int(direction_value))
-            self.ui.spinBox_direction.setValue(int(direction_value))
-            
-        # Position jitter
-        pos_jitterX = rt.getUserProp(ctrl, "ScatterPosJitterX")
-        x_min, x_max = map(float, pos_jitterX.split(","))
-        self.ui.spin_PxMin.setValue(int(x_min))
-        self.ui.spin_PxMax.setValue(int(x_max))
-
-        pos_jitterY = rt.getUserProp(ctrl, "ScatterPosJitterY")
-        y_min, y_max = map(float, pos_jitterY.split(","))
-        self.ui.spin_PyMin.setValue(int(y_min))
-        self.ui.spin_PyMax.setValue(int(y_max))
-
-        pos_jitterZ = rt.getUserProp(ctrl, "ScatterPosJitterZ")
-        z_min, z_max = map(float, pos_jitterZ.split(","))
-        self.ui.spin_PzMin.setValue(int(z_min))
-        self.ui.spin_PzMax.setValue(int(z_max))
-                # Scale ranges
-        for axis, spin_min, spin_max, prop in [
-            ("X", self.ui.spin_SxMin, self.ui.spin_SxMax, "ScatterScaleX"),
-            ("Y", self.ui.spin_SyMin, self.ui.spin_SyMax, "ScatterScaleY"),
-            ("Z", self.ui.spin_SzMin, self.ui.spin_SzMax, "ScatterScaleZ"),
-        ]:
-            val = rt.getUserProp(ctrl, prop)
-            if val:
-                min_val, max_val = map(float, val.split(","))
-                spin_min.setValue(min_val*100)
-                spin_max.setValue(max_val*100)
-
-        # Rotation ranges
-        for axis, spin_min, spin_max, prop in [
-            ("X", self.ui.spin_RxMin, self.ui.spin_RxMax, "ScatterRotX"),
-            ("Y", self.ui.spin_RyMin, self.ui.spin_RyMax, "ScatterRotY"),
-            ("Z", self.ui.spin_RzMin, self.ui.spin_RzMax, "ScatterRotZ"),
-        ]:
-            val = rt.getUserProp(ctrl, prop)
-            if val:
-                min_val, max_val = map(float, val.split(","))
-                spin_min.setValue(min_val)
-                spin_max.setValue(max_val)
-
-        # --- Source object ---
-        elements_names = rt.getUserProp(ctrl, "ScatterElements")
-        if elements_names:
+        # stored parameters were read once, typed, when the group was loaded
+        p = group.params
+
+        # --- Source objects ---
+        if p.get("elements"):
             self.manager.clear()
-            for name in elements_names.split(","):
+            for name in p["elements"]:
                 obj_node = rt.getNodeByName(name)
                 if obj_node and rt.isValidNode(obj_node):
                     self.manager.add(obj_node)
-        
-        #read viewport display percentage and apply
-        vp_prop = rt.getUserProp(ctrl, "ScatterViewportDisplay")
-        try:
-            vp_value = int(vp_prop) if vp_prop else 100
-        except ValueError:
-            vp_value = 100
-        group.params["viewport_percentage"] = vp_value
+        self.refresh_listview()
 
-        #update spinbox without triggering signal
+        # the values are the group's own, don't let them write back to it
+        widgets = self._value_widgets()
+        for w in widgets:
+            w.blockSignals(True)
         try:
-            self.ui.spinBox_viewDisp.blockSignals(True)
-            self.ui.spinBox_viewDisp.setValue(vp_value)
+            mode = p.get("mode")
+            self.ui.button_spline.setChecked(mode == "spline")
+            self.ui.button_surface.setChecked(mode == "surface")
+            self.ui.button_painter.setChecked(mode == "painter")
+            # target, spinners and checkboxes
+            self.update_ui_from_group(group)
+            group.target = self.pending_target
+            self.ui.spinBox_viewDisp.setValue(p.get("viewport_percentage", 100))
         finally:
-            self.ui.spinBox_viewDisp.blockSignals(False)
-
-        # --- Update internal params dict ---
-        group.params.update({
-            "count": self.ui.spin_elementCount.value(),
-            "distance": self.ui.spin_distance.value(),
-            "brush_size": self.ui.spin_brush.value(),
-            "pos_jitterX": (self.ui.spin_PxMin.value(), self.ui.spin_PxMax.value()),
-            "pos_jitterY": (self.ui.spin_PyMin.value(), self.ui.spin_PyMax.value()),
-            "pos_jitterZ": (self.ui.spin_PzMin.value(), self.ui.spin_PzMax.value()),
-            "scale_rangeX": (self.ui.spin_SxMin.value()/100, self.ui.spin_SxMax.value()/100),
-            "scale_rangeY": (self.ui.spin_SyMin.value()/100, self.ui.spin_SyMax.value()/100),
-            "scale_rangeZ": (self.ui.spin_SzMin.value()/100, self.ui.spin_SzMax.value()/100),
-            "rot_x_range": (self.ui.spin_RxMin.value(), self.ui.spin_RxMax.value()),
-            "rot_y_range": (self.ui.spin_RyMin.value(), self.ui.spin_RyMax.value()),
-            "rot_z_range": (self.ui.spin_RzMin.value(), self.ui.spin_RzMax.value()),
-            "direction_value": self.ui.horizontalSlider_direction.value(),
-            "source_obj": self.manager.get_random(),
-            "proportional_scale": proportional,
-            "random": random_enabled
-        })
-
-        # --- Debug output ---
-        print(f"DEBUG: Loaded group '{group.name}' with params: {group.params}")
-
-        # --- Update spinboxes enabled/disabled according to random & proportional flags ---
-        self.on_toggle_random(random_enabled) 
-        if proportional and random_enabled:
+            for w in widgets:
+                w.blockSignals(False)
+
+        # runtime only, the tool falls back to it when the group has no elements
+        group.params["source_obj"] = self.manager.get_random()
+        log.debug("Loaded group '%s' with params: %s", group.name, group.params)
+
+        # --- Update spinboxes enabled/disabled according to mode, random & proportional flags ---
+        self.mode_buttons()
+        random_enabled = self.ui.checkBox_random.isChecked()
+        self.on_toggle_random(random_enabled)
+        if self.ui.checkBox_proportionalScale.isChecked() and random_enabled:
             self.ui.spin_SyMin.setEnabled(False)
             self.ui.spin_SyMax.setEnabled(False)
             self.ui.spin_SzMin.setEnabled(False)
-            self.ui.spin_SzMax.setEnabled(False)     
-        self.update_ui_from_group(group)
-        
-        #update group name
-        self.show_group_name()
+            self.ui.spin_SzMax.setEnabled(False)
+
+    def adopt_values(self, adopt):
+        """pass the nodes the window keeps through adopt, see scatter_runtime.hold."""
+        self.source_obj = adopt(self.source_obj)
+        self.pending_target = adopt(self.pending_target)
+        self.manager.elements = [adopt(obj) for obj in self.manager.elements]
+        self.paint_targets.nodes = [adopt(node) for node in self.paint_targets.nodes]
 
     # --------------------------- Cleanup callback ---------------------------
     def closeEvent(self, event):
+        self.deactivate_painter_mode()
         if hasattr(self, 'sel_callback') and self.sel_callback:
             try:
                 rt.callbacks.removeScripts(rt.Name('selectionSetChanged'))
             except Exception as e:
-                print(f"Error removing callback: {e}")
+                log.error("Error removing callback: %s", e)
 
         if hasattr(builtins, "scattertool_app_instance"):
             del builtins.scattertool_app_instance
@@ -704,12 +768,10 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             # apply to current group
             self.current_group.set_viewport_display(value)
             # save persistently in userProp
-            ctrl = self.current_group.controller
-            if ctrl and rt.isValidNode(ctrl):
-                rt.setUserProp(ctrl, "ScatterViewportDisplay", str(value))
-            print(f"DEBUG: Viewport display set to {value}% for group {self.current_group.name}")
+            self.current_group.save_params()
+            log.debug("Viewport display set to %s%% for group %s", value, self.current_group.name)
         except Exception as e:
-            print(f"ERROR: Failed to set viewport display -> {e}")
+            log.error("Failed to set viewport display -> %s", e)
     
     # --------------------------- Box / Mesh View ---------------------------# 
     def on_box_view(self,enable=True):
@@ -717,7 +779,7 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         # Find the group associated with the selected controller
         group = self.scatter_tool.get_group_by_selection()
         if not group:
-            print("No valid scatter group selected.")
+            log.warning("No valid scatter group selected.")
             return
         enable = self.ui.button_box.isChecked()  # get state from UI
 
@@ -727,11 +789,9 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             # Save state directly in the group's params
             group.params["display_as_box"] = enable
             # Save it persistently in the controller's UserProp
-            ctrl = group.controller
-            if ctrl and rt.isValidNode(ctrl):
-                rt.setUserProp(ctrl, "ScatterDisplayAsBox", str(enable))
+            group.save_params()
 
-            print(f"DEBUG:Display mode changed to {'BOX' if enable else 'MESH'}")
+            log.debug("Display mode changed to %s", 'BOX' if enable else 'MESH')
 
             # Block signals from BOTH buttons to prevent listener loops
             self.ui.button_box.blockSignals(True)
@@ -747,7 +807,7 @@ class ScatterToolApp(QtWidgets.QMainWindow):
 
         except Exception as e:
             self.ui.button_box.blockSignals(True)
-            print(f"ERROR: set_display_as_box failed: {e}")
+            log.error("set_display_as_box failed: %s", e)
             # revert UI to MESH safely
             self.ui.button_box.blockSignals(True)
             self.ui.button_mesh.blockSignals(True)
@@ -772,6 +832,9 @@ class ScatterToolApp(QtWidgets.QMainWindow):
 
     def on_pick_surface(self):
         selection = rt.selection
+        if self.ui.button_painter.isChecked():
+            self.on_pick_paint_targets()
+            return
         if selection.count > 0 and rt.isKindOf(selection[0], rt.GeometryClass):
             surface=selection[0]
             self.pending_target=surface
@@ -780,6 +843,17 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         else:
             self.ui.button_pickSurface.setText("ERROR:Select a valid Surface.")
 
+    def on_pick_paint_targets(self):
+        targets = [n for n in rt.selection if rt.isKindOf(n, rt.GeometryClass)]
+        self.paint_targets.set(targets)
+        if not targets:
+            self.ui.button_pickSurface.setText("Pick Surface")
+        elif len(targets) == 1:
+            self.ui.button_pickSurface.setText(f"Paint on: {targets[0].name}")
+        else:
+            self.ui.button_pickSurface.setText(f"Paint on: {len(targets)} objects")
+        self.refresh_paint_targets()
+
     #---------------------------distribution mode selection ---------------------------
     def on_distribution_mode_changed(self):
         if self.ui.button_distance.isChecked():
@@ -808,24 +882,31 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             self.ui.spin_elementCount.setEnabled(False)
 
     #show current group name in the window title
-    def show_group_name(self):
+    def show_group_name(self, group=None):
+        if group is not None:
+            # already resolved by the caller
+            self._show_group_label(group)
+            return
         sel = rt.selection
-        print(f"DEBUG: Current selection = {[obj.name for obj in sel]}") 
+        log.debug("Current selection: %d objects", len(sel))
         if not sel or len(sel) == 0:
             self.ui.scattergroupname.setText("")
             self.ui.colorbox.setStyleSheet(
                 "QFrame {background-color: rgb(45, 45, 45); border: 1px solid; border-radius: 4px;}"
             )
-            print("DEBUG: No selection")
+            log.debug("No selection")
             return
 
         obj = sel[0]
-        print(f"DEBUG: Selected object = {obj.name}")  # debug objeto seleccionado
+        log.debug("Selected object = %s", obj.name)
         group = self.scatter_tool.get_group_by_controller(obj)  # <-- usa la función del ScatterTool
         if group:
-            print(f"DEBUG: Found group = {group.name}")  # debug grupo encontrado
+            log.debug("Found group = %s", group.name)
         else:
-            print("DEBUG: No group found for selected object")  # debug no se encontró grupo
+            log.debug("No group found for selected object")
+        self._show_group_label(group)
+
+    def _show_group_label(self, group):
         if group and rt.isValidNode(group.controller):
             self.ui.scattergroupname.setText(group.name)
             color = group.controller.wirecolor
@@ -849,10 +930,9 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             self.refresh_listview()
 
             if self.current_group and rt.isValidNode(self.current_group.controller):
-                elements_names = [o.name for o in self.manager.get_all() if rt.isValidNode(o)]
-                rt.setUserProp(self.current_group.controller, "ScatterElements", ",".join(elements_names))
+                self.current_group.save_params()
                 
-                print(f"DEBUG: Updated ScatterElements userProp: {picked_obj}")
+                log.debug("Updated ScatterElements userProp: %s", picked_obj)
         self.block_selection_callback = False
         
     def on_delete(self):
@@ -866,9 +946,8 @@ class ScatterToolApp(QtWidgets.QMainWindow):
                 self.manager.remove(obj_to_remove)
                 self.refresh_listview()
                 if self.current_group and rt.isValidNode(self.current_group.controller):
-                    elements_names = [o.name for o in self.manager.get_all() if rt.isValidNode(o)]
-                    rt.setUserProp(self.current_group.controller, "ScatterElements", ",".join(elements_names))
-                    print(f"DEBUG: Updated ScatterElements userProp: {obj_to_remove.name} was removed.")
+                    self.current_group.save_params()
+                    log.debug("Updated ScatterElements userProp: %s was removed.", obj_to_remove.name)
 
         self.block_selection_callback = False
 
@@ -888,9 +967,8 @@ class ScatterToolApp(QtWidgets.QMainWindow):
                 self.refresh_listview()
 
                 if self.current_group and rt.isValidNode(self.current_group.controller):
-                    elements_names = [o.name for o in self.manager.get_all() if rt.isValidNode(o)]
-                    rt.setUserProp(self.current_group.controller, "ScatterElements", ",".join(elements_names))
-                    print(f"DEBUG: Updated ScatterElements userProp: {old_obj.name} was replaced by {picked_obj.name}  .")
+                    self.current_group.save_params()
+                    log.debug("Updated ScatterElements userProp: %s was replaced by %s.", old_obj.name, picked_obj.name)
 
         self.block_selection_callback = False 
 
@@ -904,16 +982,15 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             self.refresh_listview()
 
             if self.current_group and rt.isValidNode(self.current_group.controller):
-                elements_names = [o.name for o in self.manager.get_all() if rt.isValidNode(o)]
-                rt.setUserProp(self.current_group.controller, "ScatterElements", ",".join(elements_names))
+                self.current_group.save_params()
                 added_names = [o.name for o in selected_objs]
-                print(f"DEBUG: Updated ScatterElements userProp: the {added_names} were added.")
+                log.debug("Updated ScatterElements userProp: the %s were added.", added_names)
         self.block_selection_callback = False 
     # --------------------------- Randomization ---------------------------
 
     def on_shuffle_clicked(self):
         if not self.current_group:
-            print("No current group to shuffle.")
+            log.warning("No current group to shuffle.")
             return
         self.current_group.shuffle_instances()
         
@@ -956,7 +1033,6 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         if not self.current_group or not rt.isValidNode(self.current_group.controller):
             return
         
-        ctrl = self.current_group.controller
         collision_enabled = self.ui.checkBox_collision.isChecked()
         collision_radius = self.ui.spinBox_colRadius.value()
         
@@ -965,10 +1041,9 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         self.current_group.params["collision_radius"] = collision_radius
 
         # save persistently in userProps
-        rt.setUserProp(ctrl, "ScatterCollisionEnabled", str(collision_enabled))
-        rt.setUserProp(ctrl, "ScatterCollisionRadius", str(collision_radius))
+        self.current_group.save_params()
         
-        print(f"DEBUG: Collision updated -> Enabled: {collision_enabled}, Radius: {collision_radius}")
+        log.debug("Collision updated -> Enabled: %s, Radius: %s", collision_enabled, collision_radius)
 
     
     # --------------------------- Direction slider ---------------------------
@@ -990,12 +1065,12 @@ class ScatterToolApp(QtWidgets.QMainWindow):
     # --------------------------- Launch scatter ---------------------------
 
     def on_update(self):
-        print("DEBUG: Starting scatter update...")#DEBUG
+        log.debug("Starting scatter update...")
             
         source_obj = self.manager.get_random()
         if not source_obj:
             rt.messageBox("No item has been selected for scatter.", title="Scatter Tool Warning")
-            print("No source object selected.")
+            log.warning("No source object selected.")
             return
         
         # determine mode: spline, painter or surface
@@ -1010,6 +1085,7 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         count = self.ui.spin_elementCount.value() if self.ui.button_elementCount.isChecked() else None
         distance = self.ui.spin_distance.value() if self.ui.button_distance.isChecked() else None
         brush_size = self.ui.spin_brush.value()
+        brush_density = self.ui.spin_brushDensity.value()
     
         #check if randomization is False
         if self.ui.checkBox_random.isChecked():
@@ -1042,6 +1118,7 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             "count": count,
             "distance": distance,
             "brush_size": brush_size,
+            "brush_density": brush_density,
             "pos_jitterX": pos_jitterX,
             "pos_jitterY": pos_jitterY,
             "pos_jitterZ": pos_jitterZ,
@@ -1055,6 +1132,7 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             "proportional_scale": proportional,
             "collision_enabled": self.ui.checkBox_collision.isChecked(),
             "collision_radius": self.ui.spinBox_colRadius.value(),
+            "poisson_per_source": self.ui.checkBox_poissonPerSource.isChecked(),
             "direction_value": self.ui.horizontalSlider_direction.value(),
         }
     
@@ -1062,14 +1140,14 @@ class ScatterToolApp(QtWidgets.QMainWindow):
         selected_group = self.scatter_tool.get_group_by_selection()
         if selected_group:
             self.current_group = selected_group
-            print(f"DEBUG: Using existing group: {self.current_group.name}")#DEBUG
+            log.debug("Using existing group: %s", self.current_group.name)
             if self.current_group.manager is None:
                 self.current_group.manager = ElementsManager()
             #load manager and UI for this group
             self.manager = self.current_group.manager
             self.refresh_listview()
 
-            target_name = rt.getUserProp(self.current_group.controller, "ScatterTarget")
+            target_name = self.current_group.params.get("target")
             self.pending_target = rt.getNodeByName(target_name) if target_name else None
             if self.pending_target and rt.isValidNode(self.pending_target):
                 self.pending_mode = "spline" if rt.superClassOf(self.pending_target) == rt.Shape else "surface"
@@ -1086,7 +1164,7 @@ class ScatterToolApp(QtWidgets.QMainWindow):
                         "You must pick a valid target (Spline or Surface) before updating scatter.",
                         title="Scatter Tool Warning"
                         )
-                    print("DEBUG: No valid target.")
+                    log.debug("No valid target.")
                     return  # Stop processing if no valid target
         # ------------- Create group dynamically -------------
                 self.current_group=self.scatter_tool.create_group(
@@ -1097,7 +1175,7 @@ class ScatterToolApp(QtWidgets.QMainWindow):
 
                 #update group name
                 self.show_group_name()
-                print(f"DEBUG: Created new group: {self.current_group.name}")#DEBUG
+                log.debug("Created new group: %s", self.current_group.name)
                     
                 if self.current_group.manager is None:
                     self.current_group.manager = self.manager  
@@ -1115,38 +1193,17 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             else:
                 self.current_group.surface = self.pending_target
                 self.current_group.spline = None
-        print(f"DEBUG: Updated group params: {self.current_group.params}")#DEBUG
+        log.debug("Updated group params: %s", self.current_group.params)
 
         # ------------------- SAVE TO CONTROLLER -------------------
-        ctrl = self.current_group.controller 
-        if ctrl and rt.isValidNode(ctrl):  
-            #save target in user prop
-            rt.setUserProp(ctrl, "ScatterTarget", self.pending_target.name if self.pending_target else "")  
-            #save elements names in user prop
-            elements_names = [o.name for o in self.manager.get_all() if rt.isValidNode(o)] 
-            rt.setUserProp(ctrl, "ScatterElements", ",".join(elements_names))            
-
-            #save other parameters in user props
-            rt.setUserProp(ctrl, "ScatterCount", str(count))                              
-            rt.setUserProp(ctrl, "ScatterDistance", str(distance) if distance else "")    
-            rt.setUserProp(ctrl, "ScatterPosJitterX", f"{pos_jitterX[0]},{pos_jitterX[1]}")
-            rt.setUserProp(ctrl, "ScatterPosJitterY", f"{pos_jitterY[0]},{pos_jitterY[1]}")
-            rt.setUserProp(ctrl, "ScatterPosJitterZ", f"{pos_jitterZ[0]},{pos_jitterZ[1]}") 
-            rt.setUserProp(ctrl, "ScatterScaleX", f"{scale_rangeX[0]},{scale_rangeX[1]}") 
-            rt.setUserProp(ctrl, "ScatterScaleY", f"{scale_rangeY[0]},{scale_rangeY[1]}") 
-            rt.setUserProp(ctrl, "ScatterScaleZ", f"{scale_rangeZ[0]},{scale_rangeZ[1]}") 
-            rt.setUserProp(ctrl, "ScatterRotX", f"{rot_x_range[0]},{rot_x_range[1]}")     
-            rt.setUserProp(ctrl, "ScatterRotY", f"{rot_y_range[0]},{rot_y_range[1]}")     
-            rt.setUserProp(ctrl, "ScatterRotZ", f"{rot_z_range[0]},{rot_z_range[1]}")   
-            rt.setUserProp(ctrl, "ScatterBrushSize", str(brush_size))
-            rt.setUserProp(ctrl, "ScatterCollisionRadius", str(self.ui.spinBox_colRadius.value()))
-            rt.setUserProp(ctrl, "direction_value", str(self.ui.horizontalSlider_direction.value()))  
-            #save button states / checkbox states
-            rt.setUserProp(ctrl, "ScatterRandom", "True" if self.ui.checkBox_random.isChecked() else "False")
-            rt.setUserProp(ctrl, "ScatterCollisionEnabled", str(self.ui.checkBox_collision.isChecked()))
-            rt.setUserProp(ctrl, "ScatterProportionalScale", "True" if self.ui.checkBox_proportionalScale.isChecked() else "False")
-            rt.setUserProp(ctrl, "ScatterDisplayAsBox", str(self.ui.button_box.isChecked()))
-            rt.setUserProp(ctrl, "ScatterMode", mode)
+        # one versioned document with every stored parameter, see scatter_params
+        self.current_group.params.update({
+            "mode": mode,
+            "target": self.pending_target.name if self.pending_target else "",
+            "random": self.ui.checkBox_random.isChecked(),
+            "display_as_box": self.ui.button_box.isChecked(),
+        })
+        self.current_group.save_params()
 
         # Set display mode
         if mode == "spline":
@@ -1162,13 +1219,11 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             if not group or not rt.isValidNode(group.controller):
                 return
             
-            ctrl = group.controller
-
-            target_name = rt.getUserProp(ctrl, "ScatterTarget")
+            target_name = group.params.get("target")
             self.pending_target = rt.getNodeByName(target_name) if target_name else None
 
             if not self.pending_target or not rt.isValidNode(self.pending_target):
-                print(f"DEBUG: Target node '{target_name}' not found in scene.")
+                log.debug("Target node '%s' not found in scene.", target_name)
                 self.ui.button_pickSpline.setText("Pick Spline")
                 self.ui.button_pickSurface.setText("Pick Surface")
             else:
@@ -1183,30 +1238,41 @@ class ScatterToolApp(QtWidgets.QMainWindow):
 
             p = group.params
             # Spinners
-            self.ui.spin_elementCount.setValue(p.get("count", 0))
-            self.ui.spin_PxMin.setValue(p["pos_jitter"].x if "pos_jitter" in p else 0)
-            self.ui.spin_PyMin.setValue(p["pos_jitter"].y if "pos_jitter" in p else 0)
-            self.ui.spin_PzMin.setValue(p["pos_jitter"].z if "pos_jitter" in p else 0)
+            self.ui.spin_elementCount.setValue(p.get("count") or 0)
+            self.ui.spin_PxMin.setValue(int(p["pos_jitterX"][0]))
+            self.ui.spin_PxMax.setValue(int(p["pos_jitterX"][1]))
+            self.ui.spin_PyMin.setValue(int(p["pos_jitterY"][0]))
+            self.ui.spin_PyMax.setValue(int(p["pos_jitterY"][1]))
+            self.ui.spin_PzMin.setValue(int(p["pos_jitterZ"][0]))
+            self.ui.spin_PzMax.setValue(int(p["pos_jitterZ"][1]))
             self.ui.spin_SxMin.setValue(int(p["scale_rangeX"][0]*100))
             self.ui.spin_SxMax.setValue(int(p["scale_rangeX"][1]*100))
             self.ui.spin_SyMin.setValue(int(p["scale_rangeY"][0]*100))
             self.ui.spin_SyMax.setValue(int(p["scale_rangeY"][1]*100))
             self.ui.spin_SzMin.setValue(int(p["scale_rangeZ"][0]*100))
             self.ui.spin_SzMax.setValue(int(p["scale_rangeZ"][1]*100))
-            self.ui.spin_RxMin.setValue(p["rot_x_range"][0])
-            self.ui.spin_RxMax.setValue(p["rot_x_range"][1])
-            self.ui.spin_RyMin.setValue(p["rot_y_range"][0])
-            self.ui.spin_RyMax.setValue(p["rot_y_range"][1])
-            self.ui.spin_RzMin.setValue(p["rot_z_range"][0])
-            self.ui.spin_RzMax.setValue(p["rot_z_range"][1])
-            self.ui.spin_distance.setValue(p.get("distance", 0))
-            self.ui.spin_brush.setValue(p.get("brush_size", 0))
-            self.ui.horizontalSlider_direction.setValue(p.get("orientation_value", 0))
-            self.ui.spinBox_direction.setValue(p.get("orientation_value", 0))
+            self.ui.spin_RxMin.setValue(round(p["rot_x_range"][0]))
+            self.ui.spin_RxMax.setValue(round(p["rot_x_range"][1]))
+            self.ui.spin_RyMin.setValue(round(p["rot_y_range"][0]))
+            self.ui.spin_RyMax.setValue(round(p["rot_y_range"][1]))
+            self.ui.spin_RzMin.setValue(round(p["rot_z_range"][0]))
+            self.ui.spin_RzMax.setValue(round(p["rot_z_range"][1]))
+            self.ui.spin_distance.setValue(round(p.get("distance") or 0))
+            self.ui.spin_brush.setValue(round(p.get("brush_size") or 0))
+            self.ui.spin_brushDensity.setValue(p.get("brush_density") or self.DEFAULT_BRUSH_DENSITY)
+            self.ui.horizontalSlider_direction.setValue(p.get("direction_value", 0))
+            self.ui.spinBox_direction.setValue(p.get("direction_value", 0))
             self.ui.spinBox_colRadius.setValue(p.get("collision_radius", 100))
+            self.ui.spin_poolSize.blockSignals(True)
+            self.ui.spin_poolSize.setValue(p.get("pool_size", 0))
+            self.ui.spin_poolSize.blockSignals(False)
+            self.ui.spin_thinPoolSize.blockSignals(True)
+            self.ui.spin_thinPoolSize.setValue(p.get("thin_pool_size", 10000))
+            self.ui.spin_thinPoolSize.blockSignals(False)
 
             # Checkboxes
             self.ui.checkBox_collision.setChecked(p.get("collision_enabled", False))
+            self.ui.checkBox_poissonPerSource.setChecked(p.get("poisson_per_source", False))
             self.ui.checkBox_random.setChecked(p.get("random", True))
             self.ui.checkBox_proportionalScale.setChecked(p.get("proportional_scale", True))
 
@@ -1225,13 +1291,13 @@ class ScatterToolApp(QtWidgets.QMainWindow):
             else:
                 self.ui.button_spline.setChecked(False)
                 self.ui.button_surface.setChecked(False)
-            self.ui.button_box.setChecked(rt.getUserProp(group.controller,"ScatterDisplayAsBox")=="True")
+            self.ui.button_box.setChecked(p.get("display_as_box", False))
 
         # ------------------- Apply color variation -------------------   
     def on_apply_color_variation (self):
         if not self.current_group or not rt.isValidNode(self.current_group.controller):
             rt.messageBox("No current scatter group selected.", title="Scatter Tool Warning")
-            print("No current scatter group selected.")
+            log.warning("No current scatter group selected.")
             return
 
         submat_id= self.ui.spinBox_elemtID.value()
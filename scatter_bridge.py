@@ -0,0 +1,923 @@
+"""Bulk MaxScript helpers used by the scatter engine.
+
+Each helper is defined once per session and handles a whole batch per call,
+so the Python side crosses the pymxs bridge once per operation instead of
+once per instance.
+
+The functions of this module are the scene adapter of the scatter core:
+sampling, collision, orientation and randomization only reach the scene
+through them. Their sole contract with the runtime is the set of
+``scatterTool_*`` entry points below, so any runtime providing them (see
+scatter_fake.FakeRuntime) runs the whole scatter without 3ds Max.
+"""
+import scatter_runtime
+from scatter_runtime import rt
+import hashlib
+import numpy as np
+
+_HELPERS = r'''
+global scatterTool_sampleSpline
+fn scatterTool_sampleSpline shp idx params =
+(
+    local out = #()
+    for p in params do
+    (
+        local pos = pathInterp shp idx p
+        local tan = normalize (pathTangent shp idx p)
+        append out pos.x; append out pos.y; append out pos.z
+        append out tan.x; append out tan.y; append out tan.z
+    )
+    out
+)
+
+global scatterTool_splineKnots
+fn scatterTool_splineKnots shp idx =
+(
+    local tm = shp.transform
+    local out = #(numSegments shp idx, if isClosed shp idx then 1 else 0)
+    for r in #(tm.row1, tm.row2, tm.row3, tm.row4) do (append out r.x; append out r.y; append out r.z)
+    for k = 1 to numKnots shp idx do
+    (
+        for v in #(getKnotPoint shp idx k, getInVec shp idx k, getOutVec shp idx k) do
+        (
+            append out v.x; append out v.y; append out v.z
+        )
+    )
+    out
+)
+
+-- handles of the nodes Python caches a footprint or a snapshot of; the geometry events
+-- below ignore every other node, so editing unrelated scene objects costs nothing
+global scatterTool_watched
+if scatterTool_watched == undefined do scatterTool_watched = Dictionary #integer
+
+global scatterTool_watch
+fn scatterTool_watch node = PutDictValue scatterTool_watched node.inode.handle true
+
+-- geometry revision per watched handle, raised by the geometry events below; edits that keep
+-- counts and bbox (an interior vertex, a modifier parameter) still change the signature
+global scatterTool_revisions
+if scatterTool_revisions == undefined do scatterTool_revisions = Dictionary #integer
+
+global scatterTool_geometryRevision
+fn scatterTool_geometryRevision handle =
+(
+    if HasDictValue scatterTool_revisions handle then GetDictValue scatterTool_revisions handle else 0
+)
+
+global scatterTool_bumpRevision
+fn scatterTool_bumpRevision handle =
+(
+    PutDictValue scatterTool_revisions handle ((scatterTool_geometryRevision handle) + 1)
+)
+
+global scatterTool_meshSignature
+fn scatterTool_meshSignature node =
+(
+    scatterTool_watch node
+    local tm = node.transform
+    local bb = nodeLocalBoundingBox node
+    local out = #(getNumVerts node, getNumFaces node, node.modifiers.count, scatterTool_geometryRevision node.inode.handle)
+    for r in #(tm.row1, tm.row2, tm.row3, tm.row4, bb[1], bb[2]) do (append out r.x; append out r.y; append out r.z)
+    out
+)
+
+global scatterTool_meshSnapshot
+fn scatterTool_meshSnapshot node =
+(
+    local m = snapshotAsMesh node
+    local out = #(m.numVerts, m.numFaces)
+    for i = 1 to m.numVerts do (local v = getVert m i; append out v.x; append out v.y; append out v.z)
+    for i = 1 to m.numFaces do (local f = getFace m i; append out f.x; append out f.y; append out f.z)
+    delete m
+    out
+)
+
+-- pooled instances are hidden children of the controller tagged with this appData id
+global scatterTool_poolTag = 0x5CA7001
+
+global scatterTool_isPooled
+fn scatterTool_isPooled n = (getAppData n scatterTool_poolTag) == "1"
+
+global scatterTool_liveChildren
+fn scatterTool_liveChildren parentNode =
+    for c in parentNode.children where isValidNode c and not (scatterTool_isPooled c) collect c
+
+global scatterTool_pooledChildren
+fn scatterTool_pooledChildren parentNode =
+    for c in parentNode.children where isValidNode c and (scatterTool_isPooled c) collect c
+
+global scatterTool_poolCount
+fn scatterTool_poolCount parentNode = (scatterTool_pooledChildren parentNode).count
+
+global scatterTool_parkNodes
+fn scatterTool_parkNodes nodes parentNode cap =
+(
+    -- hide and tag nodes until the pool is full, delete the rest; a negative cap never deletes
+    local pooled = (scatterTool_pooledChildren parentNode).count
+    local extra = #()
+    with redraw off undo "Scatter" on
+    (
+        for n in nodes where isValidNode n do
+        (
+            if cap < 0 or pooled < cap then (hide n; setAppData n scatterTool_poolTag "1"; pooled += 1)
+            else append extra n
+        )
+        if extra.count > 0 do delete extra
+    )
+    pooled
+)
+
+global scatterTool_park
+fn scatterTool_park parentNode cap = scatterTool_parkNodes (scatterTool_liveChildren parentNode) parentNode cap
+
+global scatterTool_purge
+fn scatterTool_purge parentNode =
+(
+    local pooled = scatterTool_pooledChildren parentNode
+    undo "Scatter" on delete pooled
+    pooled.count
+)
+
+global scatterTool_unpark
+fn scatterTool_unpark n = (deleteAppData n scatterTool_poolTag; unhide n; n)
+
+global scatterTool_take
+fn scatterTool_take b = (local n = b[b.count]; deleteItem b b.count; n)
+
+global scatterTool_bucket
+fn scatterTool_bucket nodes sources =
+(
+    -- split nodes by the source they instance, unknown sources go to spare
+    local buckets = for s in sources collect #()
+    local spare = #()
+    for c in nodes do
+    (
+        local k = 0
+        for s = 1 to sources.count while k == 0 do
+            if c.baseObject == sources[s].baseObject do k = s
+        if k > 0 then append buckets[k] c else append spare c
+    )
+    #(buckets, spare)
+)
+
+global scatterTool_place
+fn scatterTool_place sources srcIdx tms parentNode lyr live cap =
+(
+    -- srcIdx holds 1-based indices into sources, tms 12 floats (4 rows) per instance.
+    -- nodes are reused in this order: live node of the same source, pooled node of
+    -- the same source, live node with a swapped baseObject, pooled node with a
+    -- swapped baseObject; only then a new instance is created
+    local nodes = #()
+    local parentTm = parentNode.transform
+    -- one undo record per batch, Ctrl+Z takes the whole scatter back
+    with redraw off undo "Scatter" on
+    (
+        local liveB = scatterTool_bucket live sources
+        local poolB = scatterTool_bucket (scatterTool_pooledChildren parentNode) sources
+        local missing = #()
+        for i = 1 to srcIdx.count do
+        (
+            local s = srcIdx[i]
+            if liveB[1][s].count > 0 then nodes[i] = scatterTool_take liveB[1][s]
+            else if poolB[1][s].count > 0 then nodes[i] = scatterTool_unpark (scatterTool_take poolB[1][s])
+            else append missing i
+        )
+        local liveSpare = liveB[2]
+        for b in liveB[1] do join liveSpare b
+        local poolSpare = poolB[2]
+        for b in poolB[1] do join poolSpare b
+
+        for i in missing do
+        (
+            local src = sources[srcIdx[i]]
+            local n = undefined
+            if liveSpare.count > 0 then n = scatterTool_take liveSpare
+            else if poolSpare.count > 0 then n = scatterTool_unpark (scatterTool_take poolSpare)
+            if n != undefined then n.baseObject = src.baseObject
+            else
+            (
+                n = instance src
+                n.parent = parentNode
+                if lyr != undefined do lyr.addNode n
+            )
+            nodes[i] = n
+        )
+        for i = 1 to nodes.count do
+        (
+            local k = (i - 1) * 12
+            nodes[i].transform = matrix3 [tms[k+1], tms[k+2], tms[k+3]] [tms[k+4], tms[k+5], tms[k+6]] \
+                [tms[k+7], tms[k+8], tms[k+9]] [tms[k+10], tms[k+11], tms[k+12]]
+        )
+        if liveSpare.count > 0 do scatterTool_parkNodes liveSpare parentNode cap
+        -- parenting must never move the controller
+        parentNode.transform = parentTm
+    )
+    nodes
+)
+
+global scatterTool_commit
+fn scatterTool_commit sources srcIdx tms parentNode lyr cap =
+    scatterTool_place sources srcIdx tms parentNode lyr #() cap
+
+global scatterTool_sync
+fn scatterTool_sync sources srcIdx tms parentNode lyr cap =
+    scatterTool_place sources srcIdx tms parentNode lyr (scatterTool_liveChildren parentNode) cap
+
+global scatterTool_getTransforms
+fn scatterTool_getTransforms nodes =
+(
+    local out = #()
+    for n in nodes do
+    (
+        local tm = if isValidNode n then n.transform else (matrix3 1)
+        for r in #(tm.row1, tm.row2, tm.row3, tm.row4) do (append out r.x; append out r.y; append out r.z)
+    )
+    out
+)
+
+global scatterTool_setTransforms
+fn scatterTool_setTransforms nodes tms =
+(
+    with redraw off undo "Scatter" on
+    (
+        for i = 1 to nodes.count where isValidNode nodes[i] do
+        (
+            local k = (i - 1) * 12
+            nodes[i].transform = matrix3 [tms[k+1], tms[k+2], tms[k+3]] [tms[k+4], tms[k+5], tms[k+6]] \
+                [tms[k+7], tms[k+8], tms[k+9]] [tms[k+10], tms[k+11], tms[k+12]]
+        )
+    )
+    nodes.count
+)
+
+global scatterTool_footprint
+fn scatterTool_footprint node =
+(
+    -- bbox in the node's own space, instances get their own transform anyway
+    scatterTool_watch node
+    local bb = nodeGetBoundingBox node node.transform
+    #(bb[1].x, bb[1].y, bb[1].z, bb[2].x, bb[2].y, bb[2].z)
+)
+
+global scatterTool_localExtents
+fn scatterTool_localExtents nodes =
+(
+    -- largest bbox side of each node in its own space, before the node's scale; 0 for deleted nodes
+    for n in nodes collect
+    (
+        if isValidNode n then
+        (
+            local bb = nodeGetBoundingBox n n.transform
+            local s = bb[2] - bb[1]
+            amax #(s.x, s.y, s.z)
+        )
+        else 0.0
+    )
+)
+
+global scatterTool_dirtyFootprints
+if scatterTool_dirtyFootprints == undefined do scatterTool_dirtyFootprints = Dictionary #integer
+
+global scatterTool_onFootprintEvent
+fn scatterTool_onFootprintEvent ev nodes =
+(
+    for h in nodes do
+    (
+        local n = getAnimByHandle h
+        if isValidNode n and HasDictValue scatterTool_watched n.inode.handle do
+        (
+            PutDictValue scatterTool_dirtyFootprints n.inode.handle true
+            scatterTool_bumpRevision n.inode.handle
+        )
+    )
+)
+
+-- the dirty set empties once Python has read it, watched handles stay as the caches keep theirs
+global scatterTool_takeDirtyFootprints
+fn scatterTool_takeDirtyFootprints =
+(
+    local out = GetDictKeys scatterTool_dirtyFootprints
+    scatterTool_dirtyFootprints = Dictionary #integer
+    out
+)
+
+global scatterTool_footprintEvents
+if scatterTool_footprintEvents == undefined do
+    scatterTool_footprintEvents = NodeEventCallback geometryChanged:scatterTool_onFootprintEvent \
+        topologyChanged:scatterTool_onFootprintEvent modelStructured:scatterTool_onFootprintEvent
+
+-- group registry: handles of the scatter group controllers, saved with the scene in
+-- rootNode appData, so loading the groups never scans every node
+global scatterTool_registryTag = 0x5CA7002
+
+global scatterTool_readRegistry
+fn scatterTool_readRegistry =
+(
+    local s = getAppData rootNode scatterTool_registryTag
+    if s == undefined then undefined else for h in (filterString s ",") collect (h as integer)
+)
+
+global scatterTool_writeRegistry
+fn scatterTool_writeRegistry handles =
+(
+    local ss = stringStream ""
+    for i = 1 to handles.count do format (if i == 1 then "%" else ",%") handles[i] to:ss
+    setAppData rootNode scatterTool_registryTag (ss as string)
+)
+
+global scatterTool_registeredControllers
+fn scatterTool_registeredControllers =
+(
+    -- undefined when the scene has no registry yet, stale handles are dropped
+    local handles = scatterTool_readRegistry()
+    if handles == undefined then undefined else
+    (
+        local nodes = #()
+        local live = #()
+        for h in handles do
+        (
+            local n = maxOps.getNodeByHandle h
+            if isValidNode n and (getUserProp n "ScatterGroup") != undefined do (append nodes n; append live h)
+        )
+        if live.count != handles.count do scatterTool_writeRegistry live
+        nodes
+    )
+)
+
+global scatterTool_registerController
+fn scatterTool_registerController node =
+(
+    local handles = scatterTool_readRegistry()
+    if handles == undefined do handles = #()
+    appendIfUnique handles node.inode.handle
+    scatterTool_writeRegistry handles
+    handles.count
+)
+
+global scatterTool_unregisterHandle
+fn scatterTool_unregisterHandle h =
+(
+    local handles = scatterTool_readRegistry()
+    local i = if handles == undefined then 0 else findItem handles h
+    if i > 0 do (deleteItem handles i; scatterTool_writeRegistry handles)
+    i > 0
+)
+
+global scatterTool_scanControllers
+fn scatterTool_scanControllers =
+(
+    -- the repair path: one walk over the scene rebuilds the registry from the user props
+    local nodes = for o in objects where (getUserProp o "ScatterGroup") != undefined collect o
+    scatterTool_writeRegistry (for n in nodes collect n.inode.handle)
+    nodes
+)
+
+global scatterTool_onRegistryDelete
+fn scatterTool_onRegistryDelete =
+(
+    local n = callbacks.notificationParam()
+    if isValidNode n and (getUserProp n "ScatterGroup") != undefined do scatterTool_unregisterHandle n.inode.handle
+)
+
+global scatterTool_onRegistryClone
+fn scatterTool_onRegistryClone =
+(
+    -- a cloned controller keeps the ScatterGroup user prop and is a group of its own
+    local p = callbacks.notificationParam()
+    for n in p[2] where isValidNode n and (getUserProp n "ScatterGroup") != undefined do
+        scatterTool_registerController n
+)
+
+global scatterTool_onRegistryNodeAdded
+fn scatterTool_onRegistryNodeAdded =
+(
+    -- a tagged controller back from an undone delete, or brought in another way
+    local n = callbacks.notificationParam()
+    if isValidNode n and (getUserProp n "ScatterGroup") != undefined do scatterTool_registerController n
+)
+
+global scatterTool_onRegistryMerge
+fn scatterTool_onRegistryMerge =
+(
+    -- a merged file carries its own controllers, rebuild the registry from one scan
+    if scatterTool_readRegistry() != undefined do scatterTool_scanControllers()
+)
+
+callbacks.removeScripts id:#scatterToolRegistry
+callbacks.addScript #nodePreDelete "scatterTool_onRegistryDelete()" id:#scatterToolRegistry
+callbacks.addScript #postNodesCloned "scatterTool_onRegistryClone()" id:#scatterToolRegistry
+callbacks.addScript #sceneNodeAdded "scatterTool_onRegistryNodeAdded()" id:#scatterToolRegistry
+callbacks.addScript #filePostMerge "scatterTool_onRegistryMerge()" id:#scatterToolRegistry
+
+-- instance layout of a group: the text written by scatter_layout, kept in the controller's
+-- appData so a reloaded group gets its instance store back without querying the children
+global scatterTool_layoutTag = 0x5CA7003
+
+global scatterTool_layoutRows
+fn scatterTool_layoutRows nodes =
+(
+    -- handle then transform rows of each node, 13 values per node, handle 0 for deleted nodes
+    local out = #()
+    for n in nodes do
+    (
+        local valid = isValidNode n
+        local tm = if valid then n.transform else (matrix3 1)
+        append out (if valid then n.inode.handle else 0)
+        for r in #(tm.row1, tm.row2, tm.row3, tm.row4) do (append out r.x; append out r.y; append out r.z)
+    )
+    out
+)
+
+global scatterTool_readLayout
+fn scatterTool_readLayout parentNode =
+(
+    local live = scatterTool_liveChildren parentNode
+    #(getAppData parentNode scatterTool_layoutTag, live, for n in live collect n.inode.handle)
+)
+
+global scatterTool_writeLayout
+fn scatterTool_writeLayout parentNode text =
+(
+    if text == "" then deleteAppData parentNode scatterTool_layoutTag
+    else setAppData parentNode scatterTool_layoutTag text
+    text.count
+)
+
+-- Python registers scatterTool_sceneSave to write the changed layouts before the file is saved
+global scatterTool_sceneSave
+global scatterTool_onSceneSave
+fn scatterTool_onSceneSave = if scatterTool_sceneSave != undefined do scatterTool_sceneSave()
+
+callbacks.removeScripts id:#scatterToolLayout
+callbacks.addScript #filePreSave "scatterTool_onSceneSave()" id:#scatterToolLayout
+
+-- painter: Python registers scatterTool_painterEvent and gets plain numbers,
+-- event hitX hitY hitZ normalX normalY normalZ (events: 1 begin, 2 dab, 3 end)
+global scatterTool_painterEvent
+-- optional ray cast against the paint targets, the whole scene is hit when undefined
+global scatterTool_painterRaycast
+global scatterTool_painterSpacing
+global scatterTool_painterInterval
+if scatterTool_painterSpacing == undefined do scatterTool_painterSpacing = 8.0
+if scatterTool_painterInterval == undefined do scatterTool_painterInterval = 15
+
+-- brush cursor: drawn by a redraw views callback from these globals, no scene node
+global scatterTool_brushVisible
+global scatterTool_brushPos
+global scatterTool_brushNormal
+global scatterTool_brushRadius
+if scatterTool_brushVisible == undefined do scatterTool_brushVisible = false
+if scatterTool_brushPos == undefined do scatterTool_brushPos = [0, 0, 0]
+if scatterTool_brushNormal == undefined do scatterTool_brushNormal = [0, 0, 1]
+if scatterTool_brushRadius == undefined do scatterTool_brushRadius = 0.0
+
+global scatterTool_drawBrush
+fn scatterTool_drawBrush =
+(
+    if scatterTool_brushVisible and scatterTool_brushRadius > 0 do
+    (
+        -- circle in the plane of the hit normal
+        local z = normalize scatterTool_brushNormal
+        local ref = if abs z.z > 0.99 then [1, 0, 0] else [0, 0, 1]
+        local x = normalize (cross ref z)
+        local y = cross z x
+        local pts = for i = 0 to 31 collect
+        (
+            local a = i * 360.0 / 32
+            scatterTool_brushPos + (x * cos a + y * sin a) * scatterTool_brushRadius
+        )
+        gw.setTransform (matrix3 1)
+        gw.setColor #line yellow
+        gw.polyline pts true
+        gw.polyline #(scatterTool_brushPos, scatterTool_brushPos + z * (scatterTool_brushRadius * 0.25)) false
+        gw.enlargeUpdateRect #whole
+        gw.updateScreen()
+    )
+)
+
+global scatterTool_moveBrush
+fn scatterTool_moveBrush r =
+(
+    if r == undefined then scatterTool_brushVisible = false
+    else
+    (
+        scatterTool_brushPos = r.pos
+        scatterTool_brushNormal = r.dir
+        scatterTool_brushVisible = true
+    )
+    redrawViews()
+)
+
+global scatterTool_painter
+tool scatterTool_painter
+(
+    local lastDab = undefined
+    local lastTime = 0
+
+    fn hitRay =
+    (
+        local r = mapScreenToWorldRay mouse.pos
+        if scatterTool_painterRaycast != undefined then
+        (
+            -- Python casts against the paint targets only: #(px, py, pz, nx, ny, nz) or #()
+            local h = scatterTool_painterRaycast r.pos.x r.pos.y r.pos.z r.dir.x r.dir.y r.dir.z
+            if h == undefined or h.count < 6 then undefined else ray [h[1], h[2], h[3]] [h[4], h[5], h[6]]
+        )
+        else
+        (
+            local hits = intersectRayScene r
+            if hits == undefined or hits.count == 0 then undefined else hits[1][2]
+        )
+    )
+
+    fn send ev r = scatterTool_painterEvent ev r.pos.x r.pos.y r.pos.z r.dir.x r.dir.y r.dir.z
+
+    fn endStroke =
+    (
+        if lastDab != undefined do
+        (
+            lastDab = undefined
+            scatterTool_painterEvent 3 0.0 0.0 0.0 0.0 0.0 1.0
+        )
+    )
+
+    -- r is the hit the event already cast, one ray cast per event
+    fn dab r force =
+    (
+        if r != undefined do
+        (
+            local now = timeStamp()
+            if lastDab == undefined then
+            (
+                send 1 r
+                lastDab = mouse.pos; lastTime = now
+                send 2 r
+            )
+            -- only dab once the cursor moved far enough and the last dab had time to land
+            else if force or ((distance mouse.pos lastDab) >= scatterTool_painterSpacing and \
+                              (now - lastTime) >= scatterTool_painterInterval) do
+            (
+                lastDab = mouse.pos; lastTime = now
+                send 2 r
+            )
+        )
+    )
+
+    on mousePoint clickNo do dab (hitRay()) false
+
+    on mouseMove clickNo do
+    (
+        local r = hitRay()
+        scatterTool_moveBrush r
+        -- hovering only moves the brush cursor, Python hears about strokes alone
+        if mouse.buttonStates[1] then dab r false else endStroke()
+    )
+
+    on mouseAbort clickNo do endStroke()
+)
+
+-- painter target: Python is told once when the controller it paints into is deleted
+global scatterTool_painterController
+global scatterTool_painterInvalidate
+if scatterTool_painterController == undefined do scatterTool_painterController = 0
+
+global scatterTool_watchPainterController
+fn scatterTool_watchPainterController node =
+(
+    scatterTool_painterController = if isValidNode node then node.inode.handle else 0
+)
+
+global scatterTool_onPainterDelete
+fn scatterTool_onPainterDelete =
+(
+    local n = callbacks.notificationParam()
+    if scatterTool_painterController != 0 and isValidNode n and n.inode.handle == scatterTool_painterController do
+    (
+        scatterTool_painterController = 0
+        if scatterTool_painterInvalidate != undefined do scatterTool_painterInvalidate()
+    )
+)
+callbacks.removeScripts id:#scatterToolPainter
+callbacks.addScript #nodePreDelete "scatterTool_onPainterDelete()" id:#scatterToolPainter
+
+global scatterTool_startPainter
+fn scatterTool_startPainter spacing interval =
+(
+    scatterTool_painterSpacing = spacing
+    scatterTool_painterInterval = interval
+    unregisterRedrawViewsCallback scatterTool_drawBrush
+    registerRedrawViewsCallback scatterTool_drawBrush
+    startTool scatterTool_painter
+)
+
+global scatterTool_stopPainter
+fn scatterTool_stopPainter =
+(
+    try (stopTool scatterTool_painter) catch ()
+    scatterTool_brushVisible = false
+    unregisterRedrawViewsCallback scatterTool_drawBrush
+    redrawViews()
+)
+'''
+
+#runtime the helpers were last defined in, without the proxies around it
+_loaded_for = None
+
+#painter events sent by the scatterTool_painter tool, hovering sends none
+PAINT_BEGIN, PAINT_DAB, PAINT_END = 1, 2, 3
+
+#callables registered as scatterTool_painterEvent/Invalidate/Raycast/sceneSave, referenced here so they stay alive
+_painter_callback = None
+_painter_invalidate = None
+_painter_raycast = None
+_scene_save = None
+
+
+def ensure_helpers():
+    """define the MaxScript helpers the first time they are needed in a runtime."""
+    global _loaded_for
+    # turning the profiler on or off swaps a proxy in, the helpers are still defined
+    base = scatter_runtime.base_runtime(rt)
+    if _loaded_for is not base:
+        rt.execute(_HELPERS)
+        _loaded_for = base
+
+
+def to_array(mxs_values, columns):
+    """convert a flat MaxScript float array to an (N, columns) numpy array."""
+    return np.fromiter(mxs_values, dtype=float).reshape(-1, columns)
+
+
+def flat_transforms(transforms):
+    """(N, 4, 4) row-vector transforms as a flat list of 12 floats per transform."""
+    return np.asarray(transforms, dtype=float)[:, :, :3].reshape(-1).tolist()
+
+
+def commit_instances(sources, source_indices, transforms, parent, layer, pool_size=0):
+    """create, place, parent and layer one instance per transform in a single call.
+
+    Pooled nodes under parent are reused before new instances are created.
+    Returns the new nodes in the same order as the transforms.
+    """
+    ensure_helpers()
+    if not len(transforms):
+        return []
+    indices = (np.asarray(source_indices, dtype=np.int64) + 1).tolist()
+    return list(rt.scatterTool_commit(list(sources), indices, flat_transforms(transforms),
+                                      parent, layer, pool_size))
+
+
+def sync_instances(sources, source_indices, transforms, parent, layer, pool_size=0):
+    """make the children of parent match the transforms, reusing existing nodes.
+
+    Kept nodes are moved, their baseObject is swapped where the source
+    changed, and only the difference is created. Surplus nodes are parked in
+    the pool up to pool_size and deleted past it. Returns the nodes in the
+    same order as the transforms.
+    """
+    ensure_helpers()
+    indices = (np.asarray(source_indices, dtype=np.int64) + 1).tolist()
+    flat = flat_transforms(transforms) if len(transforms) else []
+    return list(rt.scatterTool_sync(list(sources), indices, flat, parent, layer, pool_size))
+
+
+def get_transforms(nodes):
+    """(N, 4, 4) transforms of nodes, read in one call."""
+    ensure_helpers()
+    if not nodes:
+        return np.zeros((0, 4, 4))
+    rows = to_array(rt.scatterTool_getTransforms(list(nodes)), 12).reshape(-1, 4, 3)
+    tms = np.zeros((len(rows), 4, 4))
+    tms[:, :, :3] = rows
+    tms[:, 3, 3] = 1.0
+    return tms
+
+
+def set_transforms(nodes, transforms):
+    """assign (N, 4, 4) transforms to nodes in one call."""
+    ensure_helpers()
+    if not nodes:
+        return 0
+    return int(rt.scatterTool_setTransforms(list(nodes), flat_transforms(transforms)))
+
+
+def live_children(parent):
+    """children of parent that are not parked in the pool."""
+    ensure_helpers()
+    return list(rt.scatterTool_liveChildren(parent))
+
+
+def park_instances(parent, pool_size):
+    """hide the live children of parent into its pool, deleting past pool_size."""
+    ensure_helpers()
+    return int(rt.scatterTool_park(parent, pool_size))
+
+
+def park_nodes(nodes, parent, cap):
+    """hide nodes into the pool of parent, deleting the ones past cap, in one call.
+
+    A negative cap hides them all. Returns the pool size afterwards.
+    """
+    ensure_helpers()
+    if not nodes:
+        return 0
+    return int(rt.scatterTool_parkNodes(list(nodes), parent, cap))
+
+
+def pool_count(parent):
+    """how many nodes are parked in the pool of parent."""
+    ensure_helpers()
+    return int(rt.scatterTool_poolCount(parent))
+
+
+def purge_pool(parent):
+    """delete every pooled node under parent; returns how many were deleted."""
+    ensure_helpers()
+    return int(rt.scatterTool_purge(parent))
+
+
+def sample_spline(shape, spline_index, params):
+    """positions and unit tangents at the given path params, in one call."""
+    ensure_helpers()
+    data = to_array(rt.scatterTool_sampleSpline(shape, spline_index, [float(p) for p in params]), 6)
+    return data[:, :3], data[:, 3:]
+
+
+def node_handle(node):
+    """returns the persistent handle of a scene node."""
+    return node.inode.handle
+
+
+def spline_signature(shape, spline_index):
+    """segment count, closed flag and a hash of the knots and transform of one spline."""
+    ensure_helpers()
+    data = np.fromiter(rt.scatterTool_splineKnots(shape, spline_index), dtype=float)
+    return int(data[0]), bool(data[1]), hashlib.sha1(data.tobytes()).hexdigest()
+
+
+def mesh_signature(node):
+    """cheap hash of topology counts, modifier count, geometry revision, transform and local bbox.
+
+    The revision is raised by the geometryChanged/topologyChanged events, so
+    edits that keep the counts and the bbox change the signature too.
+    """
+    ensure_helpers()
+    data = np.fromiter(rt.scatterTool_meshSignature(node), dtype=float)
+    return hashlib.sha1(data.tobytes()).hexdigest()
+
+
+def mesh_snapshot(node):
+    """world space triangle mesh of a node as (V, 3) vertices and (F, 3) 0-based faces."""
+    ensure_helpers()
+    data = np.fromiter(rt.scatterTool_meshSnapshot(node), dtype=float)
+    num_verts = int(data[0])
+    verts = data[2:2 + num_verts * 3].reshape(-1, 3)
+    faces = data[2 + num_verts * 3:].reshape(-1, 3).astype(np.int64) - 1
+    return verts, faces
+
+
+def footprint_bbox(node):
+    """local space bounding box of a node as two (3,) arrays."""
+    ensure_helpers()
+    data = np.fromiter(rt.scatterTool_footprint(node), dtype=float)
+    return data[:3], data[3:]
+
+
+def local_extents(nodes):
+    """largest bbox side of each node in its own space, read in one call."""
+    ensure_helpers()
+    if not nodes:
+        return np.zeros(0)
+    return np.fromiter(rt.scatterTool_localExtents(list(nodes)), dtype=float)
+
+
+def take_dirty_footprints():
+    """handles of cached nodes whose geometry or modifier stack changed since the last call.
+
+    Only nodes read by footprint_bbox or mesh_signature are watched by the node events.
+    """
+    ensure_helpers()
+    return [int(h) for h in rt.scatterTool_takeDirtyFootprints()]
+
+
+def registered_controllers():
+    """controllers of the scene's group registry, or None when the scene has no registry yet."""
+    ensure_helpers()
+    nodes = rt.scatterTool_registeredControllers()
+    return None if nodes is None else list(nodes)
+
+
+def register_controller(node):
+    """add a group controller to the scene's registry."""
+    ensure_helpers()
+    return int(rt.scatterTool_registerController(node))
+
+
+def scan_controllers():
+    """every node tagged as a group controller, found by a full scene walk that rewrites the registry."""
+    ensure_helpers()
+    return list(rt.scatterTool_scanControllers())
+
+
+def layout_rows(nodes):
+    """handles and (N, 4, 4) transforms of nodes, read in one call; deleted nodes get handle 0."""
+    ensure_helpers()
+    if not nodes:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 4, 4))
+    data = to_array(rt.scatterTool_layoutRows(list(nodes)), 13)
+    tms = np.zeros((len(data), 4, 4))
+    tms[:, :, :3] = data[:, 1:].reshape(-1, 4, 3)
+    tms[:, 3, 3] = 1.0
+    return data[:, 0].astype(np.int64), tms
+
+
+def read_layout(parent):
+    """stored layout text of parent (None without one), its live children and their handles, in one call."""
+    ensure_helpers()
+    text, nodes, handles = rt.scatterTool_readLayout(parent)
+    return (None if text is None else str(text)), list(nodes), [int(h) for h in handles]
+
+
+def write_layout(parent, text):
+    """store a layout text on parent; an empty text removes it."""
+    ensure_helpers()
+    return int(rt.scatterTool_writeLayout(parent, text or ""))
+
+
+def on_scene_save(callback):
+    """call callback() before the scene file is written; a new call replaces it, None clears it."""
+    global _scene_save
+    ensure_helpers()
+    _scene_save = callback
+    rt.scatterTool_sceneSave = callback
+
+
+def start_painter(callback, spacing_px=8.0, interval_ms=15):
+    """start the painter tool, calling callback(event, position, normal) with floats.
+
+    The tool is throttled on the MaxScript side: a dab is only sent once the
+    cursor moved spacing_px pixels and interval_ms passed since the last one.
+    Hover events are sent on every move outside a stroke. The brush cursor
+    follows the hit point and normal inside MaxScript, see set_brush_radius.
+    """
+    global _painter_callback
+    ensure_helpers()
+
+    def dispatch(event, x, y, z, nx, ny, nz):
+        callback(int(event), (x, y, z), (nx, ny, nz))
+
+    _painter_callback = dispatch
+    rt.scatterTool_painterEvent = dispatch
+    rt.scatterTool_startPainter(float(spacing_px), int(interval_ms))
+
+
+def stop_painter():
+    """stop the painter tool if it is running and hide the brush cursor."""
+    ensure_helpers()
+    rt.scatterTool_stopPainter()
+
+
+def set_painter_throttle(spacing_px, interval_ms):
+    """change the dab spacing (pixels) and minimum interval (ms) of a running painter."""
+    ensure_helpers()
+    rt.scatterTool_painterSpacing = float(spacing_px)
+    rt.scatterTool_painterInterval = int(interval_ms)
+
+
+def watch_painter_controller(controller, on_deleted):
+    """call on_deleted() once when controller is deleted; a new call replaces the watch."""
+    global _painter_invalidate
+    ensure_helpers()
+    _painter_invalidate = on_deleted
+    rt.scatterTool_painterInvalidate = on_deleted
+    rt.scatterTool_watchPainterController(controller)
+
+
+def set_brush_radius(radius):
+    """radius of the painter's brush cursor, 0 hides it."""
+    ensure_helpers()
+    rt.scatterTool_brushRadius = float(radius)
+
+
+def set_painter_raycast(raycast):
+    """make the painter hit through raycast(origin, direction) -> (position, normal) or None.
+
+    None goes back to intersectRayScene, which hits every node in the scene.
+    """
+    global _painter_raycast
+    ensure_helpers()
+    if raycast is None:
+        _painter_raycast = None
+        rt.scatterTool_painterRaycast = None
+        return
+
+    def cast(x, y, z, dx, dy, dz):
+        hit = raycast((x, y, z), (dx, dy, dz))
+        if hit is None:
+            return []
+        position, normal = hit
+        return [float(v) for v in position] + [float(v) for v in normal]
+
+    _painter_raycast = cast
+    rt.scatterTool_painterRaycast = cast
@@ -0,0 +1,198 @@
+"""NumPy placement engine for scatter groups.
+
+Every placement is computed in one batch as arrays; nothing here talks to
+3ds Max. Transforms follow the Max row-vector convention: a point is
+transformed as ``p * TM``, rows 0..2 hold the local X/Y/Z axes and row 3
+holds the translation. Transforms are returned as (N, 4, 4) arrays whose
+last column is (0, 0, 0, 1).
+"""
+import numpy as np
+
+Z_UP = np.array([0.0, 0.0, 1.0])
+Y_UP = np.array([0.0, 1.0, 0.0])
+
+
+def make_rng(seed=None):
+    """returns a numpy Generator, seeded when a seed is given."""
+    return np.random.default_rng(seed)
+
+
+def new_seed():
+    """a fresh 32 bit seed from the OS entropy source, stored with the instances it placed."""
+    return int(np.random.SeedSequence().entropy & 0xFFFFFFFF)
+
+
+def normalize_rows(vectors):
+    """normalize an (N, 3) array row by row, leaving zero rows untouched."""
+    vectors = np.asarray(vectors, dtype=float)
+    lengths = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, lengths, out=np.zeros_like(vectors), where=lengths > 0)
+
+
+def uniform_ranges(rng, n, ranges):
+    """draw n samples for each (min, max) pair in ranges -> (n, len(ranges))."""
+    ranges = np.asarray(ranges, dtype=float).reshape(-1, 2)
+    return rng.uniform(ranges[:, 0], ranges[:, 1], size=(n, len(ranges)))
+
+
+def random_jitter(rng, n, params):
+    """(n, 3) world space position jitter from the pos_jitter ranges."""
+    return uniform_ranges(rng, n, [
+        params.get("pos_jitterX", (0.0, 0.0)),
+        params.get("pos_jitterY", (0.0, 0.0)),
+        params.get("pos_jitterZ", (0.0, 0.0)),
+    ])
+
+
+def random_scales(rng, n, params):
+    """(n, 3) scale factors; proportional scale uses the X range for all axes."""
+    if params.get("proportional_scale", True):
+        s = uniform_ranges(rng, n, [params.get("scale_rangeX", (1.0, 1.0))])
+        return np.repeat(s, 3, axis=1)
+    return uniform_ranges(rng, n, [
+        params.get("scale_rangeX", (1.0, 1.0)),
+        params.get("scale_rangeY", (1.0, 1.0)),
+        params.get("scale_rangeZ", (1.0, 1.0)),
+    ])
+
+
+def random_eulers(rng, n, params):
+    """(n, 3) euler angles in degrees from the rotation ranges."""
+    return uniform_ranges(rng, n, [
+        params.get("rot_x_range", (0, 0)),
+        params.get("rot_y_range", (0, 0)),
+        params.get("rot_z_range", (0, 0)),
+    ])
+
+
+def euler_matrices(eulers):
+    """(n, 3, 3) rotation matrices for XYZ euler angles in degrees.
+
+    Same result as ``eulerAngles x y z as matrix3`` in MaxScript.
+    """
+    a = np.radians(np.asarray(eulers, dtype=float).reshape(-1, 3))
+    cx, cy, cz = np.cos(a).T
+    sx, sy, sz = np.sin(a).T
+    n = len(a)
+    rx = np.zeros((n, 3, 3))
+    rx[:, 0, 0] = 1.0
+    rx[:, 1, 1], rx[:, 1, 2] = cx, sx
+    rx[:, 2, 1], rx[:, 2, 2] = -sx, cx
+    ry = np.zeros((n, 3, 3))
+    ry[:, 1, 1] = 1.0
+    ry[:, 0, 0], ry[:, 0, 2] = cy, -sy
+    ry[:, 2, 0], ry[:, 2, 2] = sy, cy
+    rz = np.zeros((n, 3, 3))
+    rz[:, 2, 2] = 1.0
+    rz[:, 0, 0], rz[:, 0, 1] = cz, sz
+    rz[:, 1, 0], rz[:, 1, 1] = -sz, cz
+    return rx @ ry @ rz
+
+
+def frames_from_tangents(tangents, up=Z_UP):
+    """(n, 3, 3) frames with X along the tangent and Z as close to up as possible."""
+    x_axis = normalize_rows(tangents)
+    ref = np.broadcast_to(np.asarray(up, dtype=float), x_axis.shape)
+    y_axis = np.cross(ref, x_axis)
+    # tangents parallel to up have no defined side vector, fall back to Y
+    degenerate = np.linalg.norm(y_axis, axis=1) < 1e-6
+    if degenerate.any():
+        y_axis[degenerate] = np.cross(Y_UP, x_axis[degenerate])
+    y_axis = normalize_rows(y_axis)
+    z_axis = normalize_rows(np.cross(x_axis, y_axis))
+    return np.stack([x_axis, y_axis, z_axis], axis=1)
+
+
+def frames_from_normals(normals, up_ref=Y_UP):
+    """(n, 3, 3) frames with Z along the normal."""
+    z_axis = normalize_rows(normals)
+    ref = np.broadcast_to(np.asarray(up_ref, dtype=float), z_axis.shape).copy()
+    # swap the reference axis where it is almost parallel to the normal
+    parallel = np.abs(z_axis @ np.asarray(up_ref, dtype=float)) > 0.99
+    ref[parallel] = (1.0, 0.0, 0.0)
+    x_axis = normalize_rows(np.cross(z_axis, ref))
+    y_axis = normalize_rows(np.cross(x_axis, z_axis))
+    return np.stack([x_axis, y_axis, z_axis], axis=1)
+
+
+def compose_transforms(positions, rotations=None, scales=None):
+    """(n, 4, 4) transforms = scale * rotation * translation (row vectors)."""
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    n = len(positions)
+    tms = np.zeros((n, 4, 4))
+    tms[:, :3, :3] = np.eye(3) if rotations is None else rotations
+    if scales is not None:
+        tms[:, :3, :3] *= np.asarray(scales, dtype=float)[:, :, None]
+    tms[:, 3, :3] = positions
+    tms[:, 3, 3] = 1.0
+    return tms
+
+
+class PlacementBatch:
+    """Result of a placement pass: one row per instance to create."""
+
+    def __init__(self, transforms, source_indices, normals=None):
+        self.transforms = transforms
+        self.source_indices = source_indices
+        self.normals = normals
+
+    @property
+    def positions(self):
+        return self.transforms[:, 3, :3]
+
+    def __len__(self):
+        return len(self.transforms)
+
+    def __repr__(self):
+        return f"PlacementBatch({len(self)} instances)"
+
+
+def randomize(rng, base_rotations, positions, params, source_count, normals=None, source_indices=None, jitter=True):
+    """apply jitter, random scale/rotation and source choice to base frames."""
+    n = len(positions)
+    positions = np.asarray(positions, dtype=float)
+    if jitter:
+        positions = positions + random_jitter(rng, n, params)
+    # rotations are applied in world space on top of the base frame, as rt.rotate does
+    rotations = base_rotations @ euler_matrices(random_eulers(rng, n, params))
+    transforms = compose_transforms(positions, rotations, random_scales(rng, n, params))
+    if source_indices is None:
+        source_indices = rng.integers(0, max(1, source_count), size=n)
+    return PlacementBatch(transforms, source_indices, normals)
+
+
+def place_along_spline(positions, tangents, params, source_count, rng=None):
+    """placements aligned to the spline tangent, Z kept close to world up."""
+    rng = rng if rng is not None else make_rng(params.get("seed"))
+    base = frames_from_tangents(tangents)
+    return randomize(rng, base, positions, params, source_count)
+
+
+def place_at_points(positions, params, source_count, rng=None, normals=None, source_indices=None):
+    """placements at fixed points with a world aligned base frame, no position jitter."""
+    rng = rng if rng is not None else make_rng(params.get("seed"))
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    base = np.broadcast_to(np.eye(3), (len(positions), 3, 3))
+    return randomize(rng, base, positions, params, source_count, normals, source_indices, jitter=False)
+
+
+def blend_normals(normals, slider_value):
+    """Z axes between the surface normal and world up for a -100..100 slider.
+
+    0 keeps the normal, 100 points straight up and negative values flip the
+    result. Normals facing down are flipped up before blending.
+    """
+    s = max(-1.0, min(1.0, slider_value / 100.0))
+    n = np.asarray(normals, dtype=float).reshape(-1, 3)
+    # missing normals count as world up
+    n = np.where(np.linalg.norm(n, axis=1, keepdims=True) > 0, normalize_rows(n), Z_UP)
+    n = np.where((n @ Z_UP)[:, None] < 0, -n, n)
+    alpha = abs(s)
+    z_axis = normalize_rows(n * (1.0 - alpha) + Z_UP * alpha)
+    return -z_axis if s < 0 else z_axis
+
+
+def orient_transforms(transforms, normals, slider_value):
+    """rebuild the rotation of transforms from blended normals, keeping positions."""
+    frames = frames_from_normals(blend_normals(normals, slider_value))
+    return compose_transforms(np.asarray(transforms)[:, 3, :3], frames)
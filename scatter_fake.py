@@ -0,0 +1,573 @@
+"""In-memory stand-in for pymxs.runtime.
+
+Implements the ``scatterTool_*`` entry points of scatter_bridge plus the few
+runtime builtins ScatterTool uses outside them (nodes, layers, splines,
+meshes, user props), so scatter groups can be built, profiled and
+benchmarked without 3ds Max::
+
+    import scatter_runtime, scatter_fake
+    fake = scatter_fake.FakeRuntime()
+    scatter_runtime.install(fake)
+
+    import ScatterTool
+    fake.add_controller("Fence")
+    path = fake.add_spline("Path", [(0, 0, 0), (1000, 0, 0), (1000, 500, 0)])
+    post = fake.add_mesh("Post", *scatter_fake.box_mesh(10, 10, 100))
+
+    group = ScatterTool.ScatterGroup("Fence")
+    group.manager = ScatterTool.ElementsManager()
+    group.manager.add(post)
+    group.set_spline(path)
+    group.params["count"] = 500
+    group.scatter_spline(post)
+"""
+import collections
+
+import numpy as np
+
+POOL_TAG = 0x5CA7001
+REGISTRY_TAG = 0x5CA7002
+LAYOUT_TAG = 0x5CA7003
+
+FakePoint3 = collections.namedtuple("FakePoint3", "x y z")
+
+
+def box_mesh(width, depth, height):
+    """vertices and 0-based faces of a box standing on the origin."""
+    w, d = width / 2.0, depth / 2.0
+    verts = np.array([
+        (-w, -d, 0), (w, -d, 0), (w, d, 0), (-w, d, 0),
+        (-w, -d, height), (w, -d, height), (w, d, height), (-w, d, height),
+    ], dtype=float)
+    faces = np.array([
+        (0, 2, 1), (0, 3, 2), (4, 5, 6), (4, 6, 7),
+        (0, 1, 5), (0, 5, 4), (1, 2, 6), (1, 6, 5),
+        (2, 3, 7), (2, 7, 6), (3, 0, 4), (3, 4, 7),
+    ], dtype=np.int64)
+    return verts, faces
+
+
+def plane_mesh(size, segments, height_fn=None):
+    """vertices and 0-based faces of a square grid centred on the origin.
+
+    height_fn(x, y) optionally displaces the grid into a terrain.
+    """
+    coords = np.linspace(-size / 2.0, size / 2.0, segments + 1)
+    x, y = np.meshgrid(coords, coords)
+    z = height_fn(x, y) if height_fn else np.zeros_like(x)
+    verts = np.column_stack([x.ravel(), y.ravel(), z.ravel()])
+    row = segments + 1
+    i, j = np.meshgrid(np.arange(segments), np.arange(segments))
+    a = (j * row + i).ravel()
+    faces = np.concatenate([
+        np.column_stack([a, a + 1, a + row + 1]),
+        np.column_stack([a, a + row + 1, a + row]),
+    ])
+    return verts, faces
+
+
+class FakeGeometry:
+    """Base object of a mesh node, shared by its instances."""
+
+    def __init__(self, vertices, faces):
+        self.vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+        self.faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+
+
+class FakeShape:
+    """Base object of a spline node: one polyline."""
+
+    def __init__(self, points, closed=False):
+        self.vertices = np.asarray(points, dtype=float).reshape(-1, 3)
+        self.closed = closed
+
+
+class FakeLayer:
+
+    def __init__(self, name):
+        self.name = name
+        self.nodes = []
+
+    def addNode(self, node):
+        if node.layer is not None and node in node.layer.nodes:
+            node.layer.nodes.remove(node)
+        node.layer = self
+        self.nodes.append(node)
+
+
+class FakeLayerManager:
+
+    def __init__(self):
+        self.layers = {}
+
+    def getLayerFromName(self, name):
+        return self.layers.get(name)
+
+    def newLayerFromName(self, name):
+        return self.layers.setdefault(name, FakeLayer(name))
+
+
+class FakeNode:
+
+    def __init__(self, name, base_object, handle):
+        self.name = name
+        self.baseObject = base_object
+        self.handle = handle
+        self.transform = np.eye(4)
+        self.children = []
+        self.layer = None
+        self.hidden = False
+        self.isFrozen = False
+        self.boxMode = False
+        self.user_props = {}
+        self.app_data = {}
+        self.deleted = False
+        self._parent = None
+
+    @property
+    def inode(self):
+        return self
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, node):
+        if self._parent is not None and self in self._parent.children:
+            self._parent.children.remove(self)
+        self._parent = node
+        if node is not None:
+            node.children.append(self)
+
+    @property
+    def position(self):
+        return FakePoint3(*self.transform[3, :3])
+
+    @position.setter
+    def position(self, value):
+        self.transform = self.transform.copy()
+        self.transform[3, :3] = tuple(value)
+
+    @property
+    def rotation(self):
+        return self.transform[:3, :3].copy()
+
+    @rotation.setter
+    def rotation(self, value):
+        pass
+
+    def __repr__(self):
+        return f"FakeNode({self.name!r}, handle={self.handle})"
+
+
+class FakeRuntime:
+    """Scene in memory with the runtime API used by the scatter tool."""
+
+    #scene values whose property access RecordingRuntime counts, MXSWrapperBase in pymxs
+    value_types = (FakeNode, FakeGeometry, FakeShape, FakeLayer)
+
+    class Shape:
+        pass
+
+    class GeometryClass:
+        pass
+
+    def __init__(self):
+        self.nodes = {}
+        self.next_handle = 1
+        self.root_app_data = {}
+        self.LayerManager = FakeLayerManager()
+        self.lastDummy = None
+        self.lastDummyLayer = None
+        self.watched = set() #handles read by scatterTool_footprint/meshSignature, touch() ignores others
+        self.dirty_footprints = set()
+        self.revisions = {} #handle -> geometry revision, raised by touch()
+        self.scatterTool_painterEvent = None
+        self.scatterTool_painterRaycast = None
+        self.scatterTool_painterSpacing = 8.0
+        self.scatterTool_painterInterval = 15
+        self.painter_active = False
+        self.scatterTool_brushVisible = False
+        self.scatterTool_brushPos = (0.0, 0.0, 0.0)
+        self.scatterTool_brushNormal = (0.0, 0.0, 1.0)
+        self.scatterTool_brushRadius = 0.0
+        self.scatterTool_painterController = 0
+        self.scatterTool_painterInvalidate = None
+        self.scatterTool_sceneSave = None
+
+    # --------------------------- scene building ---------------------------
+
+    def _new_node(self, name, base_object):
+        node = FakeNode(name, base_object, self.next_handle)
+        self.next_handle += 1
+        self.nodes[node.handle] = node
+        return node
+
+    def add_controller(self, name, position=(0.0, 0.0, 0.0)):
+        """point helper plus layer, as the naming rollout in main.py creates them."""
+        node = self._new_node(name, None)
+        node.position = position
+        layer = self.LayerManager.newLayerFromName(name)
+        layer.addNode(node)
+        self.lastDummy = node
+        self.lastDummyLayer = layer
+        return node
+
+    def add_spline(self, name, points, closed=False):
+        return self._new_node(name, FakeShape(points, closed))
+
+    def add_mesh(self, name, vertices, faces):
+        return self._new_node(name, FakeGeometry(vertices, faces))
+
+    def touch(self, node):
+        """report a geometry change, as the NodeEventCallback would."""
+        if node.handle not in self.watched:
+            return
+        self.dirty_footprints.add(node.handle)
+        self.revisions[node.handle] = self.revisions.get(node.handle, 0) + 1
+
+    def paint(self, event, position, normal=(0.0, 0.0, 1.0)):
+        """send a painter event, as the scatterTool_painter tool does on a mouse event."""
+        if not self.painter_active:
+            return
+        if event in (0, 2):
+            # the tool moves the brush cursor itself on every hit
+            self.scatterTool_brushPos = tuple(position)
+            self.scatterTool_brushNormal = tuple(normal)
+            self.scatterTool_brushVisible = True
+        if self.scatterTool_painterEvent is not None:
+            self.scatterTool_painterEvent(event, *position, *normal)
+
+    def paint_ray(self, event, origin, direction):
+        """send a painter event for a mouse ray, hit through scatterTool_painterRaycast.
+
+        Without a registered raycast there is no scene to hit and nothing is sent.
+        Returns the hit (position, normal) or None.
+        """
+        if self.scatterTool_painterRaycast is None:
+            return None
+        h = self.scatterTool_painterRaycast(*origin, *direction)
+        if len(h) < 6:
+            return None
+        hit = tuple(h[:3]), tuple(h[3:6])
+        self.paint(event, *hit)
+        return hit
+
+    def save_scene(self):
+        """run the #filePreSave callback, as saving the scene file does."""
+        if self.scatterTool_sceneSave is not None:
+            self.scatterTool_sceneSave()
+
+    @property
+    def objects(self):
+        return [n for n in self.nodes.values() if not n.deleted]
+
+    # --------------------------- runtime builtins ---------------------------
+
+    def execute(self, code):
+        # the scatterTool_* helpers are implemented natively below
+        return None
+
+    def isValidNode(self, node):
+        return isinstance(node, FakeNode) and not node.deleted
+
+    def getUserProp(self, node, key):
+        return node.user_props.get(key)
+
+    def setUserProp(self, node, key, value):
+        node.user_props[key] = value
+
+    def getNodeByName(self, name):
+        return next((n for n in self.objects if n.name == name), None)
+
+    def point3(self, x, y, z):
+        return FakePoint3(x, y, z)
+
+    def superClassOf(self, node):
+        return self.Shape if isinstance(node.baseObject, FakeShape) else self.GeometryClass
+
+    def isKindOf(self, node, cls):
+        return self.superClassOf(node) is cls
+
+    def instance(self, source):
+        node = self._new_node(f"{source.name}_{self.next_handle:03d}", source.baseObject)
+        node.transform = source.transform.copy()
+        return node
+
+    def delete(self, nodes):
+        if isinstance(nodes, FakeNode):
+            nodes = [nodes]
+        for node in list(nodes):
+            if node.user_props.get("ScatterGroup") is not None:
+                # the #nodePreDelete callback of the group registry
+                self._unregister(node.handle)
+            if node.handle == self.scatterTool_painterController:
+                # the #nodePreDelete callback of the painter
+                self.scatterTool_painterController = 0
+                if self.scatterTool_painterInvalidate is not None:
+                    self.scatterTool_painterInvalidate()
+            node.parent = None
+            for child in list(node.children):
+                child.parent = None
+            if node.layer is not None:
+                node.layer.nodes.remove(node)
+            node.deleted = True
+            self.nodes.pop(node.handle, None)
+
+    def undelete(self, node):
+        """bring a deleted node back, as undoing its delete does."""
+        node.deleted = False
+        self.nodes[node.handle] = node
+        if node.user_props.get("ScatterGroup") is not None:
+            # the #sceneNodeAdded callback of the group registry
+            self.scatterTool_registerController(node)
+        return node
+
+    def hide(self, node):
+        node.hidden = True
+
+    def unhide(self, node):
+        node.hidden = False
+
+    # --------------------------- scatterTool helpers ---------------------------
+
+    def _world(self, node):
+        verts = node.baseObject.vertices
+        return verts @ node.transform[:3, :3] + node.transform[3, :3]
+
+    def scatterTool_sampleSpline(self, shape, idx, params):
+        points = self._world(shape)
+        if shape.baseObject.closed:
+            points = np.vstack([points, points[:1]])
+        segments = len(points) - 1
+        # like pathInterp, the param is spread evenly over segments, not length
+        t = np.clip(np.asarray(params, dtype=float), 0.0, 1.0) * segments
+        seg = np.minimum(t.astype(np.int64), segments - 1)
+        frac = (t - seg)[:, None]
+        pos = points[seg] * (1.0 - frac) + points[seg + 1] * frac
+        tan = points[seg + 1] - points[seg]
+        tan = tan / np.maximum(np.linalg.norm(tan, axis=1, keepdims=True), 1e-12)
+        return np.hstack([pos, tan]).ravel().tolist()
+
+    def scatterTool_splineKnots(self, shape, idx):
+        base = shape.baseObject
+        segments = len(base.vertices) - (0 if base.closed else 1)
+        out = [segments, 1 if base.closed else 0]
+        out += shape.transform[:, :3].ravel().tolist()
+        out += base.vertices.ravel().tolist()
+        return out
+
+    def scatterTool_meshSignature(self, node):
+        self.watched.add(node.handle)
+        base = node.baseObject
+        out = [len(base.vertices), len(base.faces), 0, self.revisions.get(node.handle, 0)]
+        out += node.transform[:, :3].ravel().tolist()
+        out += base.vertices.min(axis=0).tolist() + base.vertices.max(axis=0).tolist()
+        return out
+
+    def scatterTool_meshSnapshot(self, node):
+        base = node.baseObject
+        out = [len(base.vertices), len(base.faces)]
+        out += self._world(node).ravel().tolist()
+        out += (base.faces + 1).ravel().tolist()
+        return out
+
+    def scatterTool_footprint(self, node):
+        self.watched.add(node.handle)
+        verts = node.baseObject.vertices
+        return verts.min(axis=0).tolist() + verts.max(axis=0).tolist()
+
+    def scatterTool_localExtents(self, nodes):
+        out = []
+        for node in nodes:
+            if not self.isValidNode(node):
+                out.append(0.0)
+                continue
+            verts = node.baseObject.vertices
+            out.append(float((verts.max(axis=0) - verts.min(axis=0)).max()))
+        return out
+
+    def scatterTool_takeDirtyFootprints(self):
+        out, self.dirty_footprints = self.dirty_footprints, set()
+        return list(out)
+
+    def scatterTool_getTransforms(self, nodes):
+        out = []
+        for node in nodes:
+            tm = node.transform if self.isValidNode(node) else np.eye(4)
+            out += tm[:, :3].ravel().tolist()
+        return out
+
+    def scatterTool_setTransforms(self, nodes, tms):
+        rows = np.asarray(tms, dtype=float).reshape(-1, 4, 3)
+        for node, tm in zip(nodes, rows):
+            if self.isValidNode(node):
+                node.transform = _to_matrix(tm)
+        return len(nodes)
+
+    def _is_pooled(self, node):
+        return node.app_data.get(POOL_TAG) == "1"
+
+    def scatterTool_liveChildren(self, parent):
+        return [c for c in parent.children if self.isValidNode(c) and not self._is_pooled(c)]
+
+    def scatterTool_pooledChildren(self, parent):
+        return [c for c in parent.children if self.isValidNode(c) and self._is_pooled(c)]
+
+    def scatterTool_poolCount(self, parent):
+        return len(self.scatterTool_pooledChildren(parent))
+
+    def scatterTool_parkNodes(self, nodes, parent, cap):
+        pooled = len(self.scatterTool_pooledChildren(parent))
+        extra = []
+        for node in nodes:
+            if not self.isValidNode(node):
+                continue
+            if cap < 0 or pooled < cap:
+                node.hidden = True
+                node.app_data[POOL_TAG] = "1"
+                pooled += 1
+            else:
+                extra.append(node)
+        self.delete(extra)
+        return pooled
+
+    def scatterTool_park(self, parent, cap):
+        return self.scatterTool_parkNodes(self.scatterTool_liveChildren(parent), parent, cap)
+
+    def scatterTool_purge(self, parent):
+        pooled = self.scatterTool_pooledChildren(parent)
+        self.delete(pooled)
+        return len(pooled)
+
+    def _unpark(self, node):
+        node.app_data.pop(POOL_TAG, None)
+        node.hidden = False
+        return node
+
+    def _bucket(self, nodes, sources):
+        buckets = [[] for _ in sources]
+        spare = []
+        for node in nodes:
+            k = next((s for s, src in enumerate(sources) if node.baseObject is src.baseObject), None)
+            (spare if k is None else buckets[k]).append(node)
+        return buckets, spare
+
+    def _place(self, sources, src_idx, tms, parent, layer, live, cap):
+        # same reuse order as scatterTool_place in scatter_bridge
+        live_buckets, live_spare = self._bucket(live, sources)
+        pool_buckets, pool_spare = self._bucket(self.scatterTool_pooledChildren(parent), sources)
+        nodes = [None] * len(src_idx)
+        missing = []
+        for i, s in enumerate(src_idx):
+            if live_buckets[s - 1]:
+                nodes[i] = live_buckets[s - 1].pop()
+            elif pool_buckets[s - 1]:
+                nodes[i] = self._unpark(pool_buckets[s - 1].pop())
+            else:
+                missing.append(i)
+        for b in live_buckets:
+            live_spare += b
+        for b in pool_buckets:
+            pool_spare += b
+
+        for i in missing:
+            src = sources[src_idx[i] - 1]
+            if live_spare:
+                node = live_spare.pop()
+            elif pool_spare:
+                node = self._unpark(pool_spare.pop())
+            else:
+                node = self.instance(src)
+                node.parent = parent
+                if layer is not None:
+                    layer.addNode(node)
+            node.baseObject = src.baseObject
+            nodes[i] = node
+
+        rows = np.asarray(tms, dtype=float).reshape(-1, 4, 3)
+        for node, tm in zip(nodes, rows):
+            node.transform = _to_matrix(tm)
+        if live_spare:
+            self.scatterTool_parkNodes(live_spare, parent, cap)
+        return nodes
+
+    def scatterTool_commit(self, sources, src_idx, tms, parent, layer, cap):
+        return self._place(sources, src_idx, tms, parent, layer, [], cap)
+
+    def scatterTool_sync(self, sources, src_idx, tms, parent, layer, cap):
+        return self._place(sources, src_idx, tms, parent, layer, self.scatterTool_liveChildren(parent), cap)
+
+    def _registry(self):
+        s = self.root_app_data.get(REGISTRY_TAG)
+        return None if s is None else [int(h) for h in s.split(",") if h]
+
+    def _write_registry(self, handles):
+        self.root_app_data[REGISTRY_TAG] = ",".join(str(h) for h in handles)
+
+    def _unregister(self, handle):
+        handles = self._registry()
+        if handles is not None and handle in handles:
+            handles.remove(handle)
+            self._write_registry(handles)
+
+    def scatterTool_registeredControllers(self):
+        handles = self._registry()
+        if handles is None:
+            return None
+        nodes = [self.nodes.get(h) for h in handles]
+        nodes = [n for n in nodes if self.isValidNode(n) and n.user_props.get("ScatterGroup") is not None]
+        if len(nodes) != len(handles):
+            self._write_registry([n.handle for n in nodes])
+        return nodes
+
+    def scatterTool_registerController(self, node):
+        handles = self._registry() or []
+        if node.handle not in handles:
+            handles.append(node.handle)
+        self._write_registry(handles)
+        return len(handles)
+
+    def scatterTool_scanControllers(self):
+        nodes = [n for n in self.objects if n.user_props.get("ScatterGroup") is not None]
+        self._write_registry([n.handle for n in nodes])
+        return nodes
+
+    def scatterTool_layoutRows(self, nodes):
+        out = []
+        for node in nodes:
+            valid = self.isValidNode(node)
+            tm = node.transform if valid else np.eye(4)
+            out.append(node.handle if valid else 0)
+            out += tm[:, :3].ravel().tolist()
+        return out
+
+    def scatterTool_readLayout(self, parent):
+        live = self.scatterTool_liveChildren(parent)
+        return [parent.app_data.get(LAYOUT_TAG), live, [n.handle for n in live]]
+
+    def scatterTool_writeLayout(self, parent, text):
+        if text == "":
+            parent.app_data.pop(LAYOUT_TAG, None)
+        else:
+            parent.app_data[LAYOUT_TAG] = text
+        return len(text)
+
+    def scatterTool_startPainter(self, spacing, interval):
+        self.scatterTool_painterSpacing = spacing
+        self.scatterTool_painterInterval = interval
+        self.painter_active = True
+
+    def scatterTool_watchPainterController(self, node):
+        self.scatterTool_painterController = node.handle if self.isValidNode(node) else 0
+
+    def scatterTool_stopPainter(self):
+        self.painter_active = False
+        self.scatterTool_brushVisible = False
+
+
+def _to_matrix(rows):
+    tm = np.eye(4)
+    tm[:, :3] = rows
+    return tm
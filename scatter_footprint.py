@@ -0,0 +1,55 @@
+"""Footprint cache for scatter source objects.
+
+Collision and spacing only need a few floats per source. They are read once
+per source handle and kept until a node event reports that the source's
+geometry or modifier stack changed.
+"""
+import math
+
+import scatter_bridge
+
+
+class Footprint:
+    """Cached size of one source object in its own space."""
+
+    def __init__(self, bb_min, bb_max):
+        self.bb_min = tuple(float(v) for v in bb_min)
+        self.bb_max = tuple(float(v) for v in bb_max)
+        size = [hi - lo for lo, hi in zip(self.bb_min, self.bb_max)]
+        self.extent = max(size)
+        self.xy_radius = 0.5 * math.hypot(size[0], size[1])
+
+    def __repr__(self):
+        return f"Footprint(extent={self.extent:.3f}, xy_radius={self.xy_radius:.3f})"
+
+
+class FootprintCache:
+    """Footprints keyed by source node handle."""
+
+    def __init__(self):
+        self.footprints = {}
+
+    def sync(self):
+        """drop footprints of sources changed in the scene since the last sync."""
+        for handle in scatter_bridge.take_dirty_footprints():
+            self.footprints.pop(handle, None)
+
+    def get(self, node):
+        """returns the Footprint of a source node, reading it on a miss."""
+        handle = scatter_bridge.node_handle(node)
+        footprint = self.footprints.get(handle)
+        if footprint is None:
+            footprint = Footprint(*scatter_bridge.footprint_bbox(node))
+            self.footprints[handle] = footprint
+        return footprint
+
+    def invalidate(self, handle=None):
+        """forget one source, or every source when no handle is given."""
+        if handle is None:
+            self.footprints.clear()
+        else:
+            self.footprints.pop(handle, None)
+
+
+#shared by every scatter group, sources are often reused across groups
+footprints = FootprintCache()
@@ -0,0 +1,57 @@
+"""Per-instance layout of a scatter group, stored on its controller.
+
+The layout is what the tool knows about each instance: node handle,
+transform (position, rotation and scale), surface normal, collision radius,
+source index and the seed of the batch that placed it. It is packed into
+one numpy record array, compressed and base64 encoded into a single
+appData string, so a group reloaded with the scene gets its instance store
+back from one read instead of querying every child.
+"""
+import base64
+import binascii
+import zlib
+
+import numpy as np
+
+VERSION = 1
+
+#one record per instance; the normal is nan when unknown, source and seed are -1
+DTYPE = np.dtype([
+    ("handle", "<i8"),
+    ("transform", "<f4", (4, 3)),
+    ("normal", "<f4", (3,)),
+    ("radius", "<f4"),
+    ("source", "<i4"),
+    ("seed", "<i8"),
+])
+
+
+def pack(handles, transforms, normals, radii, sources, seeds):
+    """layout text of N instances.
+
+    transforms are (N, 4, 4); normals, sources and seeds may hold None for
+    instances that do not know them.
+    """
+    rows = np.zeros(len(handles), dtype=DTYPE)
+    rows["handle"] = handles
+    rows["transform"] = np.asarray(transforms, dtype=float).reshape(-1, 4, 4)[:, :, :3]
+    rows["normal"] = [(np.nan, np.nan, np.nan) if n is None else n for n in normals]
+    rows["radius"] = radii
+    rows["source"] = [-1 if s is None else s for s in sources]
+    rows["seed"] = [-1 if s is None else s for s in seeds]
+    body = base64.b64encode(zlib.compress(rows.tobytes())).decode("ascii")
+    return f"{VERSION}:{body}"
+
+
+def unpack(text):
+    """record array of a layout text; None when it is unreadable or from another version."""
+    version, _, body = text.partition(":")
+    if version != str(VERSION):
+        return None
+    try:
+        data = zlib.decompress(base64.b64decode(body))
+    except (binascii.Error, zlib.error):
+        return None
+    if len(data) % DTYPE.itemsize:
+        return None
+    return np.frombuffer(data, dtype=DTYPE)
@@ -0,0 +1,74 @@
+"""Logging for the scatter tool.
+
+Every subsystem logs through its own child of the ``scatter`` logger
+(``scatter.tool``, ``scatter.painter``, ``scatter.ui``...), so diagnostics
+can be switched on for one part of the tool only. Nothing below WARNING is
+formatted or written unless enabled. From the MAXScript listener::
+
+    python.execute "import scatter_log; scatter_log.set_level('debug', 'painter')"
+
+or before launching Max, ``SCATTER_LOG=info,painter=debug``.
+"""
+import logging
+import os
+import sys
+
+ROOT = "scatter"
+DEFAULT_LEVEL = logging.WARNING
+FORMAT = "[%(name)s] %(levelname)s: %(message)s"
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at emit time (the Max listener inside Max)."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def _level(value):
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).upper())
+    if not isinstance(level, int):
+        raise ValueError(f"unknown log level {value!r}")
+    return level
+
+
+def get_logger(subsystem):
+    """logger for one subsystem, e.g. get_logger("painter") -> scatter.painter."""
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+def set_level(level, subsystem=None):
+    """set the level of one subsystem, or of the whole tool when subsystem is None."""
+    logger = logging.getLogger(ROOT) if subsystem is None else get_logger(subsystem)
+    logger.setLevel(_level(level))
+
+
+def configure(spec=None):
+    """apply a level spec like "info" or "warning,painter=debug" (default: $SCATTER_LOG)."""
+    if spec is None:
+        spec = os.environ.get("SCATTER_LOG", "")
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        subsystem, _, level = part.rpartition("=")
+        set_level(level, subsystem or None)
+
+
+def _setup():
+    root = logging.getLogger(ROOT)
+    if not any(isinstance(h, _StdoutHandler) for h in root.handlers):
+        handler = _StdoutHandler()
+        handler.setFormatter(logging.Formatter(FORMAT))
+        root.addHandler(handler)
+    root.setLevel(DEFAULT_LEVEL)
+    # the listener is the only output, don't double up through the root logger
+    root.propagate = False
+    configure()
+
+
+_setup()
@@ -0,0 +1,102 @@
+"""Brush engine for painter mode.
+
+A BrushStroke turns the dabs of one mouse stroke into candidate positions
+on the brush plane, which projector() then drops onto the painted surface.
+Density is in instances per square scene unit. Each dab only adds the area
+the brush swept since the previous dab, and the fractional part of the
+expected count is carried to the next dab, so a slow and a fast stroke over
+the same ground end up with the same coverage.
+"""
+import math
+
+import numpy as np
+
+import scatter_engine
+
+#distance between dabs as a fraction of the brush radius
+DEFAULT_SPACING = 0.25
+#upper bound of instances per dab, a huge brush would otherwise stall the viewport
+MAX_PER_DAB = 5000
+#candidates drawn per wanted instance, spacing rejects part of them
+OVERSAMPLE = 4
+#what a dab does: add instances, remove every instance under the brush, or hide
+#instances under the brush down to the brush density
+PAINT, ERASE, THIN = "paint", "erase", "thin"
+BRUSH_MODES = (PAINT, ERASE, THIN)
+
+
+def disk_points(rng, center, normal, radius, count):
+    """(count, 3) uniform points on a disk around center, in the plane of normal."""
+    frame = scatter_engine.frames_from_normals(np.asarray(normal, dtype=float).reshape(1, 3))[0]
+    r = radius * np.sqrt(rng.random(count))
+    a = rng.uniform(0.0, 2.0 * math.pi, count)
+    offsets = (r * np.cos(a))[:, None] * frame[0] + (r * np.sin(a))[:, None] * frame[1]
+    return np.asarray(center, dtype=float) + offsets
+
+
+def projector(raycast, normal, lift):
+    """project(point) -> (position, normal) on the surface under a brush plane point, or None.
+
+    The ray starts lift above the plane and goes down the brush normal, so
+    the parts of the surface that curve away from the plane are hit too.
+    raycast(origin, direction) is e.g. PaintTargets.raycast.
+    """
+    n = scatter_engine.normalize_rows(np.asarray(normal, dtype=float).reshape(1, 3))[0]
+    down = -n
+
+    def project(point):
+        return raycast(np.asarray(point, dtype=float) + n * lift, down)
+    return project
+
+
+def min_spacing(density):
+    """distance kept between painted instances so a stroke reaches density without clumps."""
+    return 0.5 / math.sqrt(density) if density > 0 else 0.0
+
+
+class BrushStroke:
+    """Coverage of one painter stroke, fed one dab at a time."""
+
+    def __init__(self, radius, density, spacing=None, rng=None):
+        self.radius = float(radius)
+        self.density = float(density)
+        self.spacing = self.radius * DEFAULT_SPACING if spacing is None else float(spacing)
+        self.rng = rng if rng is not None else scatter_engine.make_rng()
+        self.carry = 0.0
+        self.last = None
+        self.placed = 0
+        self.removed = 0
+
+    @property
+    def min_spacing(self):
+        return min_spacing(self.density)
+
+    def coverage(self, position):
+        """area newly covered by a dab at position."""
+        disk = math.pi * self.radius ** 2
+        if self.last is None:
+            return disk
+        travelled = math.dist(self.last, position)
+        # the brush sweeps a band of its diameter, never more than a fresh disk
+        return min(disk, 2.0 * self.radius * travelled)
+
+    def dab(self, position, normal=(0.0, 0.0, 1.0)):
+        """(candidates, count) for a dab: place at most count of the candidate positions.
+
+        Nothing is returned until the brush moved spacing away from the last dab.
+        """
+        position = tuple(float(v) for v in position)
+        if self.radius <= 0 or self.density <= 0:
+            return np.zeros((0, 3)), 0
+        if self.last is not None and math.dist(self.last, position) < self.spacing:
+            return np.zeros((0, 3)), 0
+
+        expected = self.density * self.coverage(position) + self.carry
+        count = min(int(expected), MAX_PER_DAB)
+        self.carry = expected - int(expected)
+        self.last = position
+        return disk_points(self.rng, position, normal, self.radius, count * OVERSAMPLE), count
+
+    def __repr__(self):
+        return (f"BrushStroke(radius={self.radius}, density={self.density}, "
+                f"placed={self.placed}, removed={self.removed})")
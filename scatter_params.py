@@ -0,0 +1,127 @@
+"""Scatter group parameters stored on the group controller.
+
+All parameters of a group live in one user property, ``ScatterParams``,
+holding a small versioned JSON document. It is read with one getUserProp
+and written with one setUserProp, then kept in ``group.params`` with every
+value coerced to its type, so the UI never parses user props itself.
+
+Controllers saved before the document existed carry one user prop per
+parameter; read() converts them once and writes the document.
+"""
+import json
+
+from scatter_runtime import rt
+
+PROP = "ScatterParams"
+VERSION = 1
+
+
+def _flag(value):
+    return value if isinstance(value, bool) else str(value).strip().lower() == "true"
+
+
+def _optional(cast):
+    def coerce(value):
+        return None if value in (None, "") else cast(value)
+    return coerce
+
+
+def _pair(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    lo, hi = value
+    return (float(lo), float(hi))
+
+
+def _names(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(v) for v in value if v]
+
+
+#stored parameter -> (coerce, default, legacy user prop or None when it never had one)
+SCHEMA = {
+    "mode": (str, "", "ScatterMode"),
+    "target": (str, "", "ScatterTarget"),
+    "elements": (_names, [], "ScatterElements"),
+    "count": (_optional(int), None, "ScatterCount"),
+    "distance": (_optional(float), None, "ScatterDistance"),
+    "pos_jitterX": (_pair, (0.0, 0.0), "ScatterPosJitterX"),
+    "pos_jitterY": (_pair, (0.0, 0.0), "ScatterPosJitterY"),
+    "pos_jitterZ": (_pair, (0.0, 0.0), "ScatterPosJitterZ"),
+    "scale_rangeX": (_pair, (1.0, 1.0), "ScatterScaleX"),
+    "scale_rangeY": (_pair, (1.0, 1.0), "ScatterScaleY"),
+    "scale_rangeZ": (_pair, (1.0, 1.0), "ScatterScaleZ"),
+    "rot_x_range": (_pair, (0.0, 0.0), "ScatterRotX"),
+    "rot_y_range": (_pair, (0.0, 0.0), "ScatterRotY"),
+    "rot_z_range": (_pair, (0.0, 0.0), "ScatterRotZ"),
+    "brush_size": (_optional(float), None, "ScatterBrushSize"),
+    "brush_density": (_optional(float), None, "ScatterBrushDensity"),
+    "collision_enabled": (_flag, False, "ScatterCollisionEnabled"),
+    "collision_radius": (int, 100, "ScatterCollisionRadius"),
+    "direction_value": (int, 0, "direction_value"),
+    "random": (_flag, False, "ScatterRandom"),
+    "proportional_scale": (_flag, True, "ScatterProportionalScale"),
+    "display_as_box": (_flag, False, "ScatterDisplayAsBox"),
+    "viewport_percentage": (int, 100, "ScatterViewportDisplay"),
+    "check_collisions": (_flag, False, None),
+    "collision_radius_factor": (float, 0.1, None),
+    "poisson_per_source": (_flag, False, None),
+    "pool_size": (int, 0, None),
+    "thin_pool_size": (int, 10000, None),
+}
+
+
+def coerce(values):
+    """typed copy of the stored parameters in values, defaults for missing or broken ones."""
+    out = {}
+    for name, (cast, default, _) in SCHEMA.items():
+        value = values.get(name)
+        try:
+            out[name] = default if value is None else cast(value)
+        except (TypeError, ValueError):
+            out[name] = default
+    return out
+
+
+def dumps(params):
+    doc = {name: params[name] for name in SCHEMA if name in params}
+    doc["version"] = VERSION
+    return json.dumps(doc, separators=(",", ":"))
+
+
+def loads(text):
+    """typed parameters of a document; an unreadable or newer document gives the defaults."""
+    try:
+        doc = json.loads(text)
+    except ValueError:
+        return coerce({})
+    if not isinstance(doc, dict) or doc.get("version", 0) > VERSION:
+        return coerce({})
+    return coerce(doc)
+
+
+def read(controller):
+    """typed parameters of a controller, migrating the legacy user props on first read."""
+    text = rt.getUserProp(controller, PROP)
+    if text:
+        return loads(str(text))
+    params = _read_legacy(controller)
+    write(controller, params)
+    return params
+
+
+def _read_legacy(controller):
+    values = {name: rt.getUserProp(controller, legacy) for name, (_, _, legacy) in SCHEMA.items() if legacy}
+    if values.get("direction_value") is None:
+        # older controllers kept the slider under another name
+        values["direction_value"] = rt.getUserProp(controller, "ScatterDirection")
+    if values.get("proportional_scale") is None:
+        # the legacy loader read a missing prop as unchecked, keep those groups as they were
+        values["proportional_scale"] = False
+    return coerce(values)
+
+
+def write(controller, params):
+    """store the parameters of params in one user prop."""
+    rt.setUserProp(controller, PROP, dumps(params))
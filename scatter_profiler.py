@@ -0,0 +1,151 @@
+"""Opt-in profiler for runtime calls made during a live Max session.
+
+Every runtime call, attribute read and node property access is timed and
+attributed to the Python function that made it and to the UI action it ran
+under (Update, Shuffle, color variation, a painter dab). Nothing is wrapped until enable() is
+called, so a session that never profiles pays nothing. From the MAXScript
+listener::
+
+    python.execute "import scatter_profiler; scatter_profiler.enable()"
+    -- press Update, Shuffle, paint a stroke...
+    python.execute "import scatter_profiler; scatter_profiler.disable(); scatter_profiler.dump()"
+"""
+import sys
+import time
+
+import scatter_runtime
+from scatter_runtime import RecordingRuntime
+
+#top level entry points of main.ScatterToolApp that runtime calls are grouped under
+ACTIONS = (
+    "on_update",
+    "on_shuffle_clicked",
+    "on_apply_color_variation",
+    "scatter_place_at_point",
+)
+NO_ACTION = "<none>"
+SORT_KEYS = ("time", "count", "mean", "name", "caller", "action")
+
+
+def _caller_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _action_of(frame):
+    while frame is not None:
+        if frame.f_code.co_name in ACTIONS:
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return NO_ACTION
+
+
+class ProfilingRuntime(RecordingRuntime):
+    """RecordingRuntime that times each access by name, caller and UI action.
+
+    Property reads and writes on returned nodes (.baseObject, .wirecolor...)
+    are timed too, under ".name", like the calls.
+    """
+
+    def __init__(self, runtime):
+        super().__init__(runtime)
+        #(action, caller, name) -> [count, seconds]
+        object.__setattr__(self, "stats", {})
+
+    def _count(self, table, name, start):
+        super()._count(table, name, start)
+        # frame 1 is the wrapper that made the access, frame 2 the code that asked for it
+        self.record(name, time.perf_counter() - start, sys._getframe(2))
+
+    def record(self, name, seconds, frame):
+        key = (_action_of(frame), _caller_name(frame), name)
+        entry = self.stats.get(key)
+        if entry is None:
+            self.stats[key] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def reset(self):
+        super().reset()
+        self.stats.clear()
+
+    def rows(self, sort="time"):
+        """one dict per (action, caller, name), sorted by a SORT_KEYS key."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {SORT_KEYS}, got {sort!r}")
+        rows = [
+            {"action": action, "caller": caller, "name": name,
+             "count": count, "time": seconds, "mean": seconds / count}
+            for (action, caller, name), (count, seconds) in self.stats.items()
+        ]
+        descending = sort in ("time", "count", "mean")
+        rows.sort(key=lambda r: r[sort], reverse=descending)
+        return rows
+
+    def actions(self):
+        """runtime call count and time summed per UI action."""
+        totals = {}
+        for (action, _, _), (count, seconds) in self.stats.items():
+            entry = totals.setdefault(action, [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+        return totals
+
+    def report(self, sort="time", limit=40):
+        """formatted report: per action totals, then the top rows."""
+        lines = [f"{'action':<28} {'calls':>8} {'ms':>10}"]
+        for action, (count, seconds) in sorted(self.actions().items(), key=lambda a: -a[1][1]):
+            lines.append(f"{action:<28} {count:>8} {seconds * 1000:10.2f}")
+        lines.append("")
+        lines.append(f"{'action':<28} {'caller':<44} {'runtime name':<32} {'calls':>8} {'ms':>10} {'us/call':>9}")
+        rows = self.rows(sort)
+        for r in rows[:limit] if limit else rows:
+            lines.append(f"{r['action']:<28} {r['caller']:<44} {r['name']:<32} {r['count']:>8} "
+                         f"{r['time'] * 1000:10.2f} {r['mean'] * 1e6:9.1f}")
+        return "\n".join(lines)
+
+
+_active = None
+_last = None
+
+
+def enable():
+    """install a ProfilingRuntime around the current runtime; returns it."""
+    global _active
+    if _active is None:
+        if scatter_runtime.rt is None:
+            raise RuntimeError("no runtime installed to profile")
+        _active = ProfilingRuntime(scatter_runtime.rt)
+        scatter_runtime.install(_active)
+    return _active
+
+
+def disable():
+    """put the wrapped runtime back; the collected stats stay readable."""
+    global _active, _last
+    profiler = _active
+    if profiler is not None:
+        scatter_runtime.install(profiler._runtime)
+        _active = None
+        _last = profiler
+    return profiler
+
+
+def active():
+    return _active
+
+
+def dump(sort="time", limit=40, path=None, profiler=None):
+    """print the report of the given, active or last profiler, or write it to path."""
+    profiler = profiler or _active or _last
+    if profiler is None:
+        print("scatter_profiler: nothing recorded, call enable() first")
+        return
+    text = profiler.report(sort, limit)
+    if path:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,180 @@
+"""Ray casting against the painter's paint targets.
+
+The painter only hits the surfaces it was told to paint on. Their mesh
+snapshots are merged into one bounding volume hierarchy, built when a
+stroke starts and kept while the snapshots are unchanged, so a ray costs a
+walk down the tree instead of a test against every node in the scene.
+"""
+import numpy as np
+
+import scatter_sampling
+
+#triangles per leaf of the hierarchy
+LEAF_SIZE = 8
+EPSILON = 1e-9
+
+
+class TriangleBVH:
+    """Median split bounding volume hierarchy over a triangle mesh."""
+
+    def __init__(self, vertices, faces, normals=None, leaf_size=LEAF_SIZE):
+        vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+        faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+        tri = vertices[faces]
+        self.v0 = tri[:, 0]
+        self.e1 = tri[:, 1] - tri[:, 0]
+        self.e2 = tri[:, 2] - tri[:, 0]
+        self.normals = normals if normals is not None else np.cross(self.e1, self.e2)
+        self._build(tri, leaf_size)
+
+    def _build(self, tri, leaf_size):
+        lo_tri, hi_tri = tri.min(axis=1), tri.max(axis=1)
+        centroids = tri.mean(axis=1)
+        order = np.arange(len(tri))
+        bmin, bmax, left, start, count = [], [], [], [], []
+
+        def add_node(lo, hi):
+            bmin.append(lo_tri[order[lo:hi]].min(axis=0) if hi > lo else np.zeros(3))
+            bmax.append(hi_tri[order[lo:hi]].max(axis=0) if hi > lo else np.zeros(3))
+            left.append(-1)
+            start.append(lo)
+            count.append(hi - lo)
+            return len(bmin) - 1
+
+        stack = [(add_node(0, len(tri)), 0, len(tri))]
+        while stack:
+            node, lo, hi = stack.pop()
+            if hi - lo <= leaf_size:
+                continue
+            # split at the median centroid along the widest axis
+            c = centroids[order[lo:hi]]
+            axis = int(np.argmax(c.max(axis=0) - c.min(axis=0)))
+            order[lo:hi] = order[lo:hi][np.argsort(c[:, axis], kind="stable")]
+            mid = (lo + hi) // 2
+            left[node] = add_node(lo, mid)
+            add_node(mid, hi)
+            count[node] = 0
+            stack.append((left[node], lo, mid))
+            stack.append((left[node] + 1, mid, hi))
+
+        self.order = order
+        self.bmin = np.array(bmin)
+        self.bmax = np.array(bmax)
+        self._boxes_min = self.bmin.tolist()
+        self._boxes_max = self.bmax.tolist()
+        self.left = left
+        self.start = start
+        self.count = count
+
+    def __len__(self):
+        return len(self.v0)
+
+    def intersect(self, origin, direction):
+        """closest hit of a ray as (distance, face index), or None."""
+        if not len(self.v0):
+            return None
+        o = np.asarray(origin, dtype=float)
+        d = np.asarray(direction, dtype=float)
+        ox, oy, oz = o.tolist()
+        # a huge finite inverse keeps axis parallel rays free of nan
+        ix, iy, iz = (1.0 / c if abs(c) > EPSILON else 1e30 for c in d.tolist())
+        bmin, bmax, left, start, count = self._boxes_min, self._boxes_max, self.left, self.start, self.count
+        best_t, best_face = np.inf, -1
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            # slab test against the node box, plain floats are faster than tiny arrays here
+            x0, y0, z0 = bmin[node]
+            x1, y1, z1 = bmax[node]
+            tx0, tx1 = (x0 - ox) * ix, (x1 - ox) * ix
+            ty0, ty1 = (y0 - oy) * iy, (y1 - oy) * iy
+            tz0, tz1 = (z0 - oz) * iz, (z1 - oz) * iz
+            t_near = max(min(tx0, tx1), min(ty0, ty1), min(tz0, tz1))
+            t_far = min(max(tx0, tx1), max(ty0, ty1), max(tz0, tz1))
+            if t_far < max(t_near, 0.0) or t_near > best_t:
+                continue
+            if count[node]:
+                faces = self.order[start[node]:start[node] + count[node]]
+                t, face = self._hit_faces(faces, o, d)
+                if face >= 0 and t < best_t:
+                    best_t, best_face = t, face
+            else:
+                stack.append(left[node])
+                stack.append(left[node] + 1)
+        return None if best_face < 0 else (best_t, best_face)
+
+    def _hit_faces(self, faces, o, d):
+        # Moller-Trumbore on a handful of triangles at once
+        e1, e2 = self.e1[faces], self.e2[faces]
+        p = np.cross(d, e2)
+        det = np.einsum("ij,ij->i", e1, p)
+        ok = np.abs(det) > EPSILON
+        inv_det = np.divide(1.0, det, out=np.zeros_like(det), where=ok)
+        s = o - self.v0[faces]
+        u = np.einsum("ij,ij->i", s, p) * inv_det
+        q = np.cross(s, e1)
+        v = (q @ d) * inv_det
+        t = np.einsum("ij,ij->i", e2, q) * inv_det
+        ok &= (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t > EPSILON)
+        if not ok.any():
+            return np.inf, -1
+        t = np.where(ok, t, np.inf)
+        i = int(np.argmin(t))
+        return float(t[i]), int(faces[i])
+
+    def raycast(self, origin, direction):
+        """(position, normal) of the closest hit, normal facing the ray origin; or None."""
+        hit = self.intersect(origin, direction)
+        if hit is None:
+            return None
+        t, face = hit
+        d = np.asarray(direction, dtype=float)
+        position = np.asarray(origin, dtype=float) + d * t
+        normal = self.normals[face]
+        if normal @ d > 0:
+            normal = -normal
+        return position, normal
+
+
+class PaintTargets:
+    """Nodes the painter may hit, with the BVH over their merged snapshots."""
+
+    def __init__(self, nodes=()):
+        self.nodes = list(nodes)
+        self.bvh = None
+        self._snapshots = ()
+
+    def set(self, nodes):
+        self.nodes = list(nodes)
+
+    def __bool__(self):
+        return bool(self.nodes)
+
+    def refresh(self, valid=None, fallback=()):
+        """rebuild the BVH if a target changed; call once per stroke.
+
+        valid filters the nodes, e.g. rt.isValidNode. fallback is hit when no
+        target is set. Snapshots are cached per node by scatter_sampling, so an
+        unchanged target set keeps its tree.
+        """
+        if valid is not None:
+            self.nodes = [n for n in self.nodes if valid(n)]
+        nodes = self.nodes or [n for n in fallback if valid is None or valid(n)]
+        snapshots = tuple(scatter_sampling.get_mesh_snapshot(n) for n in nodes)
+        if self.bvh is not None and len(snapshots) == len(self._snapshots) and \
+                all(a is b for a, b in zip(snapshots, self._snapshots)):
+            return self.bvh
+        self._snapshots = snapshots
+        if not snapshots:
+            self.bvh = None
+            return None
+        offsets = np.cumsum([0] + [len(s.vertices) for s in snapshots[:-1]])
+        vertices = np.concatenate([s.vertices for s in snapshots])
+        faces = np.concatenate([s.faces + off for s, off in zip(snapshots, offsets)])
+        normals = np.concatenate([s.normals for s in snapshots])
+        self.bvh = TriangleBVH(vertices, faces, normals)
+        return self.bvh
+
+    def raycast(self, origin, direction):
+        """(position, normal) of the closest hit on any target, or None."""
+        return self.bvh.raycast(origin, direction) if self.bvh is not None else None
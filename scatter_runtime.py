@@ -0,0 +1,215 @@
+"""Runtime used by the scatter tool to talk to the scene.
+
+Inside 3ds Max this is ``pymxs.runtime``. Outside Max (build boxes,
+benchmarks) pymxs is missing and a stand-in such as
+``scatter_fake.FakeRuntime`` is installed instead::
+
+    import scatter_runtime, scatter_fake
+    scatter_runtime.install(scatter_fake.FakeRuntime())
+
+Modules that use the runtime import it as ``from scatter_runtime import rt``.
+install() rebinds that global in every loaded client module, so nothing
+pays for an extra indirection on each call.
+"""
+import sys
+import time
+import weakref
+
+try:
+    import pymxs
+    from pymxs import runtime as max_runtime
+except ImportError:
+    pymxs = None
+    max_runtime = None
+
+#scene values of pymxs (nodes, base objects, layers...), all one wrapper type
+MAX_VALUE_TYPES = (pymxs.MXSWrapperBase,) if hasattr(pymxs, "MXSWrapperBase") else ()
+
+rt = max_runtime
+
+#modules holding a module level `rt` that install() keeps in sync
+CLIENT_MODULES = ("scatter_bridge", "scatter_params", "scattertool", "ScatterTool", "main")
+
+#objects keeping scene values across installs, see hold()
+_holders = weakref.WeakSet()
+
+
+def install(runtime):
+    """use runtime for every scatter module; returns the previous runtime."""
+    global rt
+    previous = rt
+    rt = runtime
+    for name in CLIENT_MODULES:
+        module = sys.modules.get(name)
+        if module is not None and hasattr(module, "rt"):
+            module.rt = runtime
+    for holder in list(_holders):
+        holder.adopt_values(adopt)
+    return previous
+
+
+def hold(holder):
+    """keep the scene values holder stores in step with the installed runtime.
+
+    Nodes kept from before a profiler was switched on would bypass it. On
+    every install() holder.adopt_values(adopt) is called, and the holder
+    passes each value it keeps through adopt.
+    """
+    _holders.add(holder)
+
+
+def adopt(value):
+    """value as the installed runtime returns it: wrapped by a recording proxy, or bare."""
+    while isinstance(value, _Recorded):
+        value = value.value
+    if isinstance(rt, RecordingRuntime):
+        return rt._wrap_value(value, "<held>")
+    return value
+
+
+def restore():
+    """go back to pymxs.runtime (or None outside 3ds Max)."""
+    return install(max_runtime)
+
+
+def base_runtime(runtime):
+    """the runtime under any recording or profiling proxies around it."""
+    while isinstance(runtime, RecordingRuntime):
+        runtime = runtime._runtime
+    return runtime
+
+
+class _Recorded:
+    """Runtime value that counts every access to it.
+
+    Calls count under the name the value was read as; reading or setting a
+    property counts as ".property", since inside Max that is a crossing of
+    the pymxs bridge too. Scene values read from it are wrapped in turn.
+    Runtime classes (rt.Shape, rt.Editable_Poly...) and nodes are passed back
+    into the runtime, so the wrapper compares and hashes like the wrapped
+    value and is unwrapped again on the way in.
+    """
+    __slots__ = ("value", "name", "recorder")
+
+    def __init__(self, value, name, recorder):
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "recorder", recorder)
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = self.value(*_unwrap(args), **{k: _unwrap_one(v) for k, v in kwargs.items()})
+        finally:
+            self.recorder._count(self.recorder.calls, self.name, start)
+        return self.recorder._wrap_value(result, self.name)
+
+    def __getattr__(self, name):
+        start = time.perf_counter()
+        value = getattr(self.value, name)
+        self.recorder._count(self.recorder.reads, "." + name, start)
+        return self.recorder._wrap_value(value, "." + name)
+
+    def __setattr__(self, name, value):
+        start = time.perf_counter()
+        setattr(self.value, name, _unwrap_one(value))
+        self.recorder._count(self.recorder.writes, "." + name, start)
+
+    def __iter__(self):
+        return (self.recorder._wrap_value(item, self.name) for item in self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, key):
+        return self.recorder._wrap_value(self.value[key], self.name)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __eq__(self, other):
+        return self.value == _unwrap_one(other)
+
+    def __ne__(self, other):
+        return self.value != _unwrap_one(other)
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+def _unwrap_one(value):
+    if isinstance(value, _Recorded):
+        return value.value
+    if isinstance(value, list):
+        return [_unwrap_one(v) for v in value]
+    return value
+
+
+def _unwrap(args):
+    return [_unwrap_one(a) for a in args]
+
+
+class RecordingRuntime:
+    """Proxy around a runtime that counts every call and attribute read by name.
+
+    Each access to the runtime is a crossing of the pymxs bridge inside Max,
+    so these counts predict in-Max cost better than wall time on a fake.
+    Property access on the scene values it returns is counted too, under
+    ".name". A runtime that is not pymxs names the types of its scene values
+    in a value_types class attribute.
+    """
+
+    def __init__(self, runtime):
+        object.__setattr__(self, "_runtime", runtime)
+        object.__setattr__(self, "calls", {})
+        object.__setattr__(self, "reads", {})
+        object.__setattr__(self, "writes", {})
+        value_types = getattr(type(base_runtime(runtime)), "value_types", MAX_VALUE_TYPES)
+        object.__setattr__(self, "_value_types", value_types)
+
+    def __getattr__(self, name):
+        start = time.perf_counter()
+        value = getattr(self._runtime, name)
+        # looking a function up is free, calling it is counted
+        if not callable(value):
+            self._count(self.reads, name, start)
+        return self._wrap_value(value, name)
+
+    def _wrap_value(self, value, name):
+        """value with its callables and scene values wrapped, so their use is counted."""
+        if callable(value) or isinstance(value, self._value_types):
+            return _Recorded(value, name, self)
+        if isinstance(value, list) and any(isinstance(v, self._value_types) for v in value):
+            return [self._wrap_value(v, name) for v in value]
+        return value
+
+    def _count(self, table, name, start):
+        """one access by name; start is when it began, for subclasses that time it."""
+        table[name] = table.get(name, 0) + 1
+
+    def __setattr__(self, name, value):
+        start = time.perf_counter()
+        setattr(self._runtime, name, _unwrap_one(value))
+        self._count(self.writes, name, start)
+
+    @property
+    def total(self):
+        """every recorded crossing: calls, reads and writes."""
+        return sum(self.calls.values()) + sum(self.reads.values()) + sum(self.writes.values())
+
+    def reset(self):
+        self.calls.clear()
+        self.reads.clear()
+        self.writes.clear()
+
+    def snapshot(self):
+        """counts as plain dicts, for reports."""
+        return {
+            "total": self.total,
+            "calls": dict(self.calls),
+            "reads": dict(self.reads),
+            "writes": dict(self.writes),
+        }
@@ -0,0 +1,334 @@
+"""Sampling of scatter targets into numpy arrays.
+
+Targets are read from the scene once into dense tables, then every query is
+answered with array math. Tables are cached per node handle and rebuilt only
+when the node's signature changes.
+"""
+import numpy as np
+
+import scatter_bridge
+import scatter_engine
+import scatter_log
+
+log = scatter_log.get_logger("sampling")
+
+#dense samples per spline segment when building an arc-length table
+SAMPLES_PER_SEGMENT = 64
+MAX_SAMPLES = 20000
+
+#poisson disk: stop once a round of candidates accepts less than this fraction
+POISSON_MIN_ACCEPT = 0.003
+POISSON_MAX_ROUNDS = 32
+#poisson disk: free candidates whose pairs are compared at once, and the most
+#candidates tested against the accepted disks in one go
+POISSON_CHUNK = 256
+POISSON_MAX_WINDOW = 65536
+
+
+class ArcLengthTable:
+    """Dense position/tangent table of one spline, indexed by arc length."""
+
+    def __init__(self, positions, tangents, closed=False):
+        self.positions = np.asarray(positions, dtype=float)
+        self.tangents = np.asarray(tangents, dtype=float)
+        self.closed = closed
+        steps = np.linalg.norm(np.diff(self.positions, axis=0), axis=1)
+        self.lengths = np.concatenate([[0.0], np.cumsum(steps)])
+
+    @property
+    def length(self):
+        return float(self.lengths[-1])
+
+    def at_lengths(self, s):
+        """positions and unit tangents at the given arc lengths."""
+        s = np.clip(np.asarray(s, dtype=float), 0.0, self.length)
+        positions = np.column_stack([np.interp(s, self.lengths, self.positions[:, k]) for k in range(3)])
+        tangents = np.column_stack([np.interp(s, self.lengths, self.tangents[:, k]) for k in range(3)])
+        return positions, scatter_engine.normalize_rows(tangents)
+
+    def at_count(self, count):
+        """count points at equal arc length; closed splines do not repeat the start."""
+        if count <= 0:
+            return np.zeros((0, 3)), np.zeros((0, 3))
+        steps = count if self.closed else max(1, count - 1)
+        return self.at_lengths(np.arange(count) * (self.length / steps))
+
+    def at_spacing(self, distance):
+        """one point every distance units, starting at the first knot."""
+        if distance is None or distance <= 0:
+            return np.zeros((0, 3)), np.zeros((0, 3))
+        count = int(self.length // distance) + 1
+        return self.at_lengths(np.arange(count) * distance)
+
+
+class MeshSnapshot:
+    """Triangle mesh of a surface with a cumulative face-area table."""
+
+    def __init__(self, vertices, faces):
+        self.vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+        self.faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+        v0, v1, v2 = (self.vertices[self.faces[:, k]] for k in range(3))
+        cross = np.cross(v1 - v0, v2 - v0)
+        self.areas = 0.5 * np.linalg.norm(cross, axis=1)
+        self.normals = scatter_engine.normalize_rows(cross)
+        self.cdf = np.cumsum(self.areas)
+
+    @property
+    def area(self):
+        return float(self.cdf[-1]) if len(self.cdf) else 0.0
+
+    def sample(self, count, rng):
+        """count uniformly distributed points -> (positions, normals, face indices)."""
+        if count <= 0 or self.area <= 0:
+            return np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0, dtype=np.int64)
+        face_ids = np.searchsorted(self.cdf, rng.uniform(0.0, self.area, count), side="right")
+        face_ids = np.minimum(face_ids, len(self.faces) - 1)
+        # uniform barycentric coordinates (square root warp)
+        r1 = np.sqrt(rng.random(count))[:, None]
+        r2 = rng.random(count)[:, None]
+        tri = self.faces[face_ids]
+        v0, v1, v2 = (self.vertices[tri[:, k]] for k in range(3))
+        positions = (1.0 - r1) * v0 + r1 * (1.0 - r2) * v1 + r1 * r2 * v2
+        return positions, self.normals[face_ids], face_ids
+
+
+class _Bins:
+    """Point indices sorted by the cubic cell they fall in, for neighbour lookups.
+
+    Cells are twice the reach of a lookup, so the disks a query can reach lie
+    in its own cell and the neighbours on the sides it is closest to: eight
+    cells. Keys number the cells of the box origin..origin+extent with a one
+    cell margin, so those eight always have valid keys.
+    """
+
+    def __init__(self, origin, extent, reach):
+        self.origin = origin
+        self.cell = 2.0 * reach
+        self.dims = np.floor(extent / self.cell).astype(np.int64) + 3
+        self.steps = np.array([self.dims[1] * self.dims[2], self.dims[2], 1], dtype=np.int64)
+        self.corners = np.array([(x, y, z) for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.int64)
+        self.keys = np.zeros(0, dtype=np.int64) #one per point, sorted
+        self.points = np.zeros(0, dtype=np.int64) #point index of each key
+        self.cells = np.zeros(0, dtype=np.int64) #distinct keys
+        self.starts = np.zeros(1, dtype=np.int64) #first slot of each distinct key, then len(keys)
+
+    def key(self, positions):
+        return (np.floor((positions - self.origin) / self.cell).astype(np.int64) + 1) @ self.steps
+
+    def add(self, positions, indices):
+        keys = self.key(positions)
+        order = np.argsort(keys, kind="stable")
+        at = np.searchsorted(self.keys, keys[order], side="right")
+        self.keys = np.insert(self.keys, at, keys[order])
+        self.points = np.insert(self.points, at, indices[order])
+        first = np.flatnonzero(np.diff(self.keys, prepend=-1))
+        self.cells = self.keys[first]
+        self.starts = np.append(first, len(self.keys))
+
+    def pairs(self, positions, own=False):
+        """(query, point) index pairs of the points in the eight cells around each query.
+
+        own limits them to the query's own cell, a cheap first pass.
+        """
+        if not len(self.cells):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        scaled = (positions - self.origin) / self.cell
+        cell = np.floor(scaled).astype(np.int64) + 1
+        # the neighbour towards the nearer face on every axis
+        corners = self.corners[:1] if own else self.corners
+        side = np.where(scaled - np.floor(scaled) < 0.5, -1, 1)
+        around = ((cell[:, None, :] + corners[None] * side[:, None, :]) @ self.steps).ravel()
+        at = np.minimum(np.searchsorted(self.cells, around), len(self.cells) - 1)
+        found = self.cells[at] == around
+        counts = np.where(found, self.starts[at + 1] - self.starts[at], 0)
+        queries = np.repeat(np.arange(len(around)) // len(corners), counts)
+        # slot of every pair: the cell's first slot plus the offset in the cell
+        ends = np.cumsum(counts)
+        slots = np.arange(ends[-1]) + np.repeat(self.starts[at] - ends + counts, counts)
+        return queries, self.points[slots]
+
+
+class _DiskIndex:
+    """Accepted disks binned per radius level, tested against many candidates at once.
+
+    Levels double in size like SpatialHashGrid's cells, a level holds the
+    disks of up to half its size. A level is binned for the reach of
+    candidates no larger than it, and once per larger level for the
+    candidates of that level.
+    """
+
+    def __init__(self, origin, extent, base, levels):
+        self.levels = sorted(set(int(l) for l in levels))
+        self.bins = {(l, k): _Bins(origin, extent, base * 2.0 ** k)
+                     for l in self.levels for k in self.levels if k >= l}
+        self.positions = np.zeros((0, 3))
+        self.radii = np.zeros(0)
+
+    def add(self, positions, radii, levels):
+        first = len(self.radii)
+        self.positions = np.concatenate([self.positions, positions])
+        self.radii = np.concatenate([self.radii, radii])
+        indices = np.arange(first, first + len(radii))
+        for (l, k), bins in self.bins.items():
+            mine = levels == l
+            if mine.any():
+                bins.add(positions[mine], indices[mine])
+
+    def _hits(self, bins, positions, radii, select, hit, own=False):
+        rows = np.flatnonzero(select)
+        if not len(rows) or not len(bins.keys):
+            return
+        queries, points = bins.pairs(positions[rows], own)
+        d = positions[rows[queries]] - self.positions[points]
+        limit = radii[rows[queries]] + self.radii[points]
+        hit[rows[queries[np.einsum("ij,ij->i", d, d) < limit * limit]]] = True
+
+    def overlaps(self, positions, radii, levels):
+        """True for every candidate disk overlapping an accepted one."""
+        hit = np.zeros(len(radii), dtype=bool)
+        # every level's own bins first, they find most overlaps of larger candidates too;
+        # on a filled surface most candidates already overlap a disk in their own cell
+        for own in (True, False):
+            for l in self.levels:
+                self._hits(self.bins[(l, l)], positions, radii, ~hit, hit, own)
+        for (l, k), bins in self.bins.items():
+            if k > l:
+                self._hits(bins, positions, radii, ~hit & (levels == k), hit)
+        return hit
+
+
+def _greedy(positions, radii):
+    """candidates kept by accepting them one by one in order, each unless it overlaps a kept one.
+
+    Resolved on the full pair matrix: a candidate whose earlier overlapping
+    candidates are all rejected is kept, one with a kept earlier overlap is
+    rejected, until every candidate is decided.
+    """
+    d = positions[:, None, :] - positions[None, :, :]
+    limit = radii[:, None] + radii[None, :]
+    earlier = np.tril(np.einsum("ijk,ijk->ij", d, d) < limit * limit, -1)
+    kept = np.zeros(len(radii), dtype=bool)
+    open_ = np.ones(len(radii), dtype=bool)
+    while open_.any():
+        blocked = (earlier & (kept | open_)[None, :]).any(1)
+        accept = open_ & ~blocked
+        kept |= accept
+        open_ &= ~accept & ~(earlier & kept[None, :]).any(1)
+    return kept
+
+
+def poisson_disk(snapshot, spacing, rng, source_radii=None, max_count=None):
+    """blue noise points on a surface with at least spacing between them.
+
+    Candidates are drawn by face area in rounds and taken in order, each
+    unless its disk overlaps an accepted one. Windows of candidates are
+    tested against the accepted disks at once; the free ones, a chunk at a
+    time, are then tested against each other. Windows grow as the surface
+    fills up. Filling stops when a round barely adds any point.
+    source_radii optionally gives one disk radius per source; each point
+    then keeps max(spacing / 2, radius of its source) free around it.
+    Returns (positions, normals, source_indices, complete); complete is False
+    when the round limit stopped the fill while rounds still added points.
+    """
+    empty = (np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0, dtype=np.int64), True)
+    if spacing <= 0 or snapshot.area <= 0:
+        return empty
+
+    if source_radii is None:
+        radii = np.array([0.5 * spacing])
+    else:
+        radii = np.maximum(0.5 * spacing, np.asarray(source_radii, dtype=float))
+    # level cells double from the smallest disk, a level's cells are as wide as its disks
+    base = 2.0 * float(radii.min())
+    source_levels = np.ceil(np.log2(np.maximum(2.0 * radii / base, 1.0)) - 1e-9).astype(np.int64)
+    low, high = snapshot.vertices.min(0), snapshot.vertices.max(0)
+    index = _DiskIndex(low, high - low, base, source_levels)
+
+    # a round holds a few times the number of disks that fit on the surface
+    estimate = snapshot.area / (np.pi * float(radii.min()) ** 2)
+    round_size = int(min(200000, max(1000, 4 * estimate)))
+
+    positions, normals, sources = [], [], []
+    total = 0
+    complete = False
+    for _ in range(POISSON_MAX_ROUNDS):
+        candidates, candidate_normals, _ = snapshot.sample(round_size, rng)
+        candidate_sources = rng.integers(0, len(radii), size=round_size)
+        candidate_radii = radii[candidate_sources]
+        candidate_levels = source_levels[candidate_sources]
+        accepted = 0
+        start, window = 0, POISSON_CHUNK
+        while start < round_size:
+            rows = np.arange(start, min(start + window, round_size))
+            free = rows[~index.overlaps(candidates[rows], candidate_radii[rows], candidate_levels[rows])]
+            if len(free) > POISSON_CHUNK:
+                # candidates after the chunk are tested again against what the chunk adds
+                free = free[:POISSON_CHUNK]
+                rows = rows[:free[-1] - start + 1]
+            # the next window holds about one chunk of free candidates at this rate
+            window = int(min(POISSON_MAX_WINDOW, POISSON_CHUNK * len(rows) / max(1, len(free))))
+            start += len(rows)
+
+            free = free[_greedy(candidates[free], candidate_radii[free])]
+            if max_count is not None:
+                free = free[:max_count - total]
+            index.add(candidates[free], candidate_radii[free], candidate_levels[free])
+            positions.append(candidates[free])
+            normals.append(candidate_normals[free])
+            sources.append(candidate_sources[free])
+            accepted += len(free)
+            total += len(free)
+            if max_count is not None and total >= max_count:
+                break
+        if (max_count is not None and total >= max_count) or accepted < POISSON_MIN_ACCEPT * round_size:
+            complete = True
+            break
+
+    if not complete:
+        log.warning("Poisson fill stopped after %d rounds with room left, %d points placed.",
+                    POISSON_MAX_ROUNDS, total)
+    if not total:
+        return empty[:3] + (complete,)
+    return np.concatenate(positions), np.concatenate(normals), np.concatenate(sources), complete
+
+
+#handle -> (signature, table)
+_spline_tables = {}
+#handle -> (signature, snapshot)
+_mesh_snapshots = {}
+
+
+def get_spline_table(shape, spline_index=1):
+    """returns the cached ArcLengthTable of a spline, rebuilding it if the spline changed."""
+    handle = scatter_bridge.node_handle(shape)
+    segments, closed, signature = scatter_bridge.spline_signature(shape, spline_index)
+    key = (spline_index, signature)
+    cached = _spline_tables.get(handle)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    samples = int(min(MAX_SAMPLES, max(2, segments * SAMPLES_PER_SEGMENT + 1)))
+    params = np.linspace(0.0, 1.0, samples)
+    positions, tangents = scatter_bridge.sample_spline(shape, spline_index, params)
+    table = ArcLengthTable(positions, tangents, closed=closed)
+    _spline_tables[handle] = (key, table)
+    return table
+
+
+def get_mesh_snapshot(node):
+    """returns the cached MeshSnapshot of a surface, rebuilding it if the node changed."""
+    handle = scatter_bridge.node_handle(node)
+    signature = scatter_bridge.mesh_signature(node)
+    cached = _mesh_snapshots.get(handle)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    snapshot = MeshSnapshot(*scatter_bridge.mesh_snapshot(node))
+    _mesh_snapshots[handle] = (signature, snapshot)
+    return snapshot
+
+
+def clear_cache():
+    """drop every cached table and snapshot."""
+    _spline_tables.clear()
+    _mesh_snapshots.clear()
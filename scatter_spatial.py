@@ -0,0 +1,148 @@
+"""Spatial index for placed scatter instances.
+
+A uniform hash grid over world space. Positions and radii live in plain
+Python lists, so a neighbour query only touches the cells around the query
+point and never goes through pymxs.
+"""
+import math
+
+
+class SpatialHashGrid:
+    """Uniform grid answering "anything within r of p?" queries.
+
+    Points wider than a cell go to coarser levels, each with
+    cells twice as large as the one below, so a few large footprints never
+    widen the queries around the small ones.
+    """
+
+    def __init__(self, cell_size=None):
+        self.fixed_cell_size = cell_size
+        self.cell_size = cell_size
+        self.cells = {} #level -> {cell key -> point indices}
+        self.level_radius = {} #level -> largest radius stored in it
+        self.positions = []
+        self.radii = []
+        self.items = []
+        self.alive = []
+        self.levels = []
+        self.max_radius = 0.0
+        self.count = 0
+
+    def _level(self, radius):
+        # a level's cells are at least as wide as the footprints it holds
+        level, size = 0, self.cell_size
+        while size < 2.0 * radius:
+            level += 1
+            size *= 2.0
+        return level
+
+    def _key(self, position, level=0):
+        cs = self.cell_size * (1 << level)
+        return (math.floor(position[0] / cs), math.floor(position[1] / cs), math.floor(position[2] / cs))
+
+    def insert(self, position, radius=0.0, item=None):
+        """add a point with its own radius; returns its index."""
+        radius = float(radius)
+        if self.cell_size is None:
+            # first insert decides the cell size, a cell should hold about one footprint
+            self.cell_size = max(2.0 * radius, 1.0)
+        position = (float(position[0]), float(position[1]), float(position[2]))
+        level = self._level(radius)
+        index = len(self.positions)
+        self.positions.append(position)
+        self.radii.append(radius)
+        self.items.append(item)
+        self.alive.append(True)
+        self.levels.append(level)
+        self.cells.setdefault(level, {}).setdefault(self._key(position, level), []).append(index)
+        self.level_radius[level] = max(self.level_radius.get(level, 0.0), radius)
+        self.max_radius = max(self.max_radius, radius)
+        self.count += 1
+        return index
+
+    def remove(self, index):
+        """remove a point by index; indices of other points stay valid."""
+        if not self.alive[index]:
+            return
+        self.alive[index] = False
+        level = self.levels[index]
+        bucket = self.cells[level].get(self._key(self.positions[index], level))
+        if bucket:
+            bucket.remove(index)
+        self.count -= 1
+
+    def _neighbours(self, position, reach, add_radius=False):
+        # per level: the cells within reach, plus the level's largest radius when add_radius
+        if self.cell_size is None or not self.count:
+            return
+        for level, cells in self.cells.items():
+            extent = reach + self.level_radius[level] if add_radius else reach
+            cs = self.cell_size * (1 << level)
+            cx, cy, cz = self._key(position, level)
+            r = max(1, int(math.ceil(extent / cs)))
+            if (2 * r + 1) ** 3 > len(cells):
+                # wide reach over a sparse level, walk the occupied cells instead of the cube
+                for (x, y, z), bucket in cells.items():
+                    if bucket and abs(x - cx) <= r and abs(y - cy) <= r and abs(z - cz) <= r:
+                        yield from bucket
+                continue
+            for x in range(cx - r, cx + r + 1):
+                for y in range(cy - r, cy + r + 1):
+                    for z in range(cz - r, cz + r + 1):
+                        bucket = cells.get((x, y, z))
+                        if bucket:
+                            yield from bucket
+
+    def query(self, position, radius):
+        """indices of all points closer than radius to position."""
+        px, py, pz = position[0], position[1], position[2]
+        radius_sq = radius * radius
+        found = []
+        for i in self._neighbours(position, radius):
+            x, y, z = self.positions[i]
+            if (x - px) ** 2 + (y - py) ** 2 + (z - pz) ** 2 < radius_sq:
+                found.append(i)
+        return found
+
+    def collides(self, position, separation):
+        """True if a point is closer than max(separation, its own radius)."""
+        px, py, pz = position[0], position[1], position[2]
+        for i in self._neighbours(position, separation, add_radius=True):
+            x, y, z = self.positions[i]
+            limit = max(separation, self.radii[i])
+            if (x - px) ** 2 + (y - py) ** 2 + (z - pz) ** 2 < limit * limit:
+                return True
+        return False
+
+    def overlaps(self, position, radius):
+        """True if a disk of radius at position overlaps any point's own disk."""
+        px, py, pz = position[0], position[1], position[2]
+        for i in self._neighbours(position, radius, add_radius=True):
+            x, y, z = self.positions[i]
+            limit = radius + self.radii[i]
+            if (x - px) ** 2 + (y - py) ** 2 + (z - pz) ** 2 < limit * limit:
+                return True
+        return False
+
+    def compact(self):
+        """drop removed points from the lists; indices of the kept points change."""
+        kept = [i for i, alive in enumerate(self.alive) if alive]
+        positions, radii, items, cell_size = self.positions, self.radii, self.items, self.cell_size
+        self.__init__(self.fixed_cell_size)
+        self.cell_size = cell_size
+        for i in kept:
+            self.insert(positions[i], radii[i], items[i])
+
+    @property
+    def removed(self):
+        """slots of removed points still held in the lists."""
+        return len(self.positions) - self.count
+
+    def clear(self):
+        self.__init__(self.fixed_cell_size)
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f"SpatialHashGrid({self.count} points, cell={self.cell_size})"
@@ -0,0 +1,47 @@
+"""Every test runs on a fresh in-memory scene, see scatter_fake."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scatter_fake
+import scatter_footprint
+import scatter_runtime
+import scatter_sampling
+
+
+@pytest.fixture
+def fake():
+    runtime = scatter_fake.FakeRuntime()
+    scatter_runtime.install(runtime)
+    # handles restart at 1 in every fake scene, nothing cached for an earlier one may match
+    scatter_sampling.clear_cache()
+    scatter_footprint.footprints.invalidate()
+    yield runtime
+    scatter_runtime.restore()
+
+
+@pytest.fixture
+def sources(fake):
+    return [
+        fake.add_mesh("Post", *scatter_fake.box_mesh(10, 10, 100)),
+        fake.add_mesh("Rock", *scatter_fake.box_mesh(300, 300, 20)),
+    ]
+
+
+@pytest.fixture
+def make_group(fake, sources):
+    """make_group(name, **params): a group with its controller and both sources."""
+    import ScatterTool
+
+    def make(name, **params):
+        fake.add_controller(name)
+        group = ScatterTool.ScatterGroup(name)
+        group.manager = ScatterTool.ElementsManager()
+        group.manager.add_many(sources)
+        group.params.update(params)
+        group.save_params()
+        return group
+    return make
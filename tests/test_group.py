@@ -0,0 +1,112 @@
+import numpy as np
+
+import scatter_fake
+
+
+def surface_group(fake, make_group, count=50):
+    # tilted plane, every instance has a normal away from world up
+    ground = fake.add_mesh("Ground", *scatter_fake.plane_mesh(1000, 20, lambda x, y: x * 0.3))
+    group = make_group("Ground", count=count)
+    group.set_surface(ground)
+    group.scatter_surface(group.manager.get_all()[0])
+    return group
+
+
+def z_axes(fake, group):
+    rows = np.asarray(fake.scatterTool_getTransforms([i.node for i in group.instances])).reshape(-1, 4, 3)
+    return rows[:, 2]
+
+
+def test_shuffle_keeps_normals_for_the_direction_slider(fake, make_group):
+    group = surface_group(fake, make_group)
+    normals = [inst.normal for inst in group.instances]
+
+    group.shuffle_instances()
+    assert [inst.normal for inst in group.instances] == normals
+    assert all(inst.source_index is not None for inst in group.instances)
+
+    group.normal_direction(0)
+    assert np.allclose(z_axes(fake, group), normals, atol=1e-6)
+
+
+def test_shuffle_refreshes_radii(fake, make_group):
+    group = surface_group(fake, make_group)
+    group.shuffle_instances()
+    index = group.collision_index
+    extents = {0: 100.0, 1: 300.0}
+    for i in range(len(index.positions)):
+        assert np.isclose(index.radii[i], extents[index.items[i].source_index])
+
+
+def test_aborted_scatter_keeps_the_store(fake, make_group):
+    path = fake.add_spline("Path", [(0, 0, 0), (1000, 0, 0)])
+    group = make_group("Fence", count=30)
+    group.set_spline(path)
+    post = group.manager.get_all()[0]
+    group.scatter_spline(post)
+
+    fake.delete([path])
+    group.scatter_spline(post)
+    group.set_surface(None)
+    group.scatter_surface(post)
+
+    assert len(group.controller.children) == 30
+    assert len(group.instances) == 30
+    assert len(group.collision_index) == 30
+
+
+def test_layout_round_trip_after_shuffle(fake, make_group, monkeypatch):
+    import ScatterTool
+    surface_group(fake, make_group).save_layout()
+    group = ScatterTool.ScatterTool().groups[0]
+    group.shuffle_instances()
+    fake.save_scene()
+
+    loaded = ScatterTool.ScatterTool().groups[0]
+    # the layout is the whole store, the children are not queried
+    monkeypatch.setattr(fake, "scatterTool_getTransforms", None)
+    loaded._ensure_instance_store()
+    before = sorted((i.node.handle, i.source_index, i.seed, i.normal) for i in group.instances)
+    after = sorted((i.node.handle, i.source_index, i.seed, i.normal) for i in loaded.instances)
+    assert [b[:3] for b in before] == [a[:3] for a in after]
+    assert np.allclose([b[3] for b in before], [a[3] for a in after], atol=1e-5)
+    assert np.allclose(loaded.collision_index.radii, group.collision_index.radii)
+
+
+def test_thin_hides_up_to_its_cap_and_never_deletes(fake, make_group):
+    group = surface_group(fake, make_group, count=200)
+    group.params["thin_pool_size"] = 10
+    removed = group.thin_at((0, 0, 0), 400, 0.0, np.random.default_rng(0))
+    assert removed == 10
+    pooled = [n for n in fake.objects if n.app_data.get(scatter_fake.POOL_TAG) == "1"]
+    assert len(pooled) == 10 and len(group.controller.children) == 200
+    # a full pool stops thinning until it is purged
+    assert group.thin_at((0, 0, 0), 400, 0.0, np.random.default_rng(0)) == 0
+    group.purge_pool()
+    assert group.thin_at((0, 0, 0), 400, 0.0, np.random.default_rng(0)) == 10
+
+
+def test_thin_pools_without_a_pool_size(fake, make_group):
+    group = surface_group(fake, make_group, count=200)
+    assert group.params["pool_size"] == 0
+    removed = group.thin_at((0, 0, 0), 400, 0.0, np.random.default_rng(0))
+    assert removed > 0 and len(group.controller.children) == 200
+
+
+def test_rescatter_reuses_nodes_by_handle(fake, make_group):
+    path = fake.add_spline("Path", [(0, 0, 0), (1000, 0, 0)])
+    group = make_group("Fence", count=30)
+    group.set_spline(path)
+    post = group.manager.get_all()[0]
+    group.scatter_spline(post)
+    handles = {inst.node.handle for inst in group.instances}
+    next_handle = fake.next_handle
+
+    group.shuffle_instances()
+    group.scatter_spline(post)
+    assert {inst.node.handle for inst in group.instances} == handles
+    group.params["count"] = 20
+    group.scatter_spline(post)
+    assert {inst.node.handle for inst in group.instances} < handles
+    # no node was created for either rebuild
+    assert fake.next_handle == next_handle
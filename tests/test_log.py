@@ -0,0 +1,45 @@
+import logging
+
+import pytest
+
+import scatter_log
+
+
+@pytest.fixture
+def levels():
+    loggers = [logging.getLogger(name) for name in ("scatter", "scatter.painter", "scatter.tool")]
+    saved = [logger.level for logger in loggers]
+    yield
+    # setLevel, not the attribute, so the loggers' enabled caches are cleared too
+    for logger, level in zip(loggers, saved):
+        logger.setLevel(level)
+
+
+def test_levels_are_set_per_subsystem(levels, capsys):
+    painter, tool = scatter_log.get_logger("painter"), scatter_log.get_logger("tool")
+    scatter_log.configure("warning,painter=debug")
+    painter.debug("dab")
+    tool.info("hidden")
+    tool.warning("shown")
+    out = capsys.readouterr().out
+    assert "[scatter.painter] DEBUG: dab" in out
+    assert "hidden" not in out and "[scatter.tool] WARNING: shown" in out
+
+    scatter_log.set_level("error", "painter")
+    painter.warning("quiet")
+    assert capsys.readouterr().out == ""
+    with pytest.raises(ValueError):
+        scatter_log.set_level("loud")
+
+
+def test_debug_messages_are_not_formatted_when_disabled(levels):
+    scatter_log.set_level("warning")
+    formatted = []
+
+    class Arg:
+        def __str__(self):
+            formatted.append(1)
+            return "arg"
+
+    scatter_log.get_logger("tool").debug("value %s", Arg())
+    assert not formatted
@@ -0,0 +1,109 @@
+import math
+
+import numpy as np
+
+import scatter_fake
+import scatter_painter
+import scatter_raycast
+
+
+def stroke_count(stroke, step, length=400.0):
+    total = 0
+    for x in np.arange(0.0, length + 1e-9, step):
+        _, count = stroke.dab((x, 0.0, 0.0))
+        total += count
+    return total
+
+
+def brute_force_t(origin, direction, tri):
+    # distance to the closest triangle hit, testing every triangle
+    v0, e1, e2 = tri[:, 0], tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]
+    p = np.cross(direction, e2)
+    det = np.einsum("ij,ij->i", e1, p)
+    s = origin - v0
+    u = np.einsum("ij,ij->i", s, p) / det
+    q = np.cross(s, e1)
+    v = q @ direction / det
+    t = np.einsum("ij,ij->i", e2, q) / det
+    return t[(u >= 0) & (v >= 0) & (u + v <= 1) & (t > 0)].min()
+
+
+def test_slow_and_fast_strokes_reach_the_same_density():
+    radius, density, length = 20.0, 0.01, 400.0
+    swept = math.pi * radius ** 2 + 2 * radius * length
+    slow = stroke_count(scatter_painter.BrushStroke(radius, density, rng=np.random.default_rng(0)), 5.0)
+    fast = stroke_count(scatter_painter.BrushStroke(radius, density, rng=np.random.default_rng(0)), 20.0)
+    # the fraction carried between dabs keeps the total to within one instance
+    assert abs(slow - density * swept) < 1 and abs(fast - density * swept) < 1
+
+
+def test_carry_adds_up_small_dabs():
+    stroke = scatter_painter.BrushStroke(10.0, 0.0005, spacing=1.0)
+    # 0.16 expected for the first dab, 0.01 for each following one
+    counts = [stroke.dab((x, 0.0, 0.0))[1] for x in range(100)]
+    assert sum(counts) == 1 and 0.0 < stroke.carry < 1.0
+
+
+def test_dabs_closer_than_the_spacing_add_nothing():
+    stroke = scatter_painter.BrushStroke(10.0, 0.1)
+    candidates, count = stroke.dab((0.0, 0.0, 0.0))
+    assert count > 0 and len(candidates) == count * scatter_painter.OVERSAMPLE
+    assert np.all(np.linalg.norm(candidates, axis=1) <= 10.0 + 1e-9)
+    assert stroke.dab((1.0, 0.0, 0.0))[1] == 0
+
+
+def test_bvh_matches_a_test_against_every_triangle():
+    vertices, faces = scatter_fake.plane_mesh(1000, 30, lambda x, y: 40 * np.sin(x / 90) * np.cos(y / 70))
+    bvh = scatter_raycast.TriangleBVH(vertices, faces)
+    tri = np.asarray(vertices)[np.asarray(faces)]
+    rng = np.random.default_rng(3)
+    for origin in np.column_stack([rng.uniform(-600, 600, (50, 2)), np.full(50, 500.0)]):
+        direction = np.array([0.0, 0.0, -1.0])
+        hit = bvh.raycast(origin, direction)
+        inside = abs(origin[0]) < 500 and abs(origin[1]) < 500
+        assert (hit is not None) == inside
+        if hit is None:
+            continue
+        position, normal = hit
+        # the closest of the triangles the ray crosses, with the normal facing the ray
+        assert np.isclose(position[2], 500.0 - brute_force_t(origin, direction, tri))
+        assert normal @ direction < 0
+
+
+def test_paint_targets_only_hit_their_own_nodes(fake):
+    low = fake.add_mesh("Low", *scatter_fake.plane_mesh(100, 2))
+    high = fake.add_mesh("High", *scatter_fake.plane_mesh(100, 2, lambda x, y: np.full_like(x, 50.0)))
+    targets = scatter_raycast.PaintTargets([low])
+    bvh = targets.refresh()
+    position, _ = targets.raycast((0, 0, 100), (0, 0, -1))
+    assert np.isclose(position[2], 0.0)
+    # unchanged targets keep their tree
+    assert targets.refresh() is bvh
+    targets.set([low, high])
+    targets.refresh()
+    position, _ = targets.raycast((0, 0, 100), (0, 0, -1))
+    assert np.isclose(position[2], 50.0)
+
+
+def test_dab_candidates_land_on_the_targets(fake, make_group):
+    height = lambda x, y: 30 * np.sin(x / 40)
+    ground = fake.add_mesh("Ground", *scatter_fake.plane_mesh(200, 20, height))
+    targets = scatter_raycast.PaintTargets([ground])
+    targets.refresh()
+    group = make_group("Grass")
+    # a brush on the edge of the ground, candidates past it hit nothing
+    stroke = scatter_painter.BrushStroke(50.0, 0.02, rng=np.random.default_rng(0))
+    candidates, count = stroke.dab((100.0, 0.0, 0.0))
+    project = scatter_painter.projector(targets.raycast, (0.0, 0.0, 1.0), stroke.radius)
+    placed = group.scatter_painter_batch(candidates, (0.0, 0.0, 1.0), 0.0, count, project)
+
+    assert placed == count
+    rows = np.asarray(fake.scatterTool_getTransforms([i.node for i in group.instances])).reshape(-1, 4, 3)
+    positions = rows[:, 3]
+    assert (positions[:, 0] <= 100.0 + 1e-9).all()
+    for p in positions:
+        # straight down from high above, the first hit is where the instance stands
+        assert np.allclose(targets.raycast((p[0], p[1], 500.0), (0, 0, -1))[0], p)
+    # instances keep the normal of the slope under them, not the brush normal
+    normals = np.array([inst.normal for inst in group.instances])
+    assert np.allclose(normals[:, 2], 1 / np.sqrt(1 + (0.75 * np.cos(positions[:, 0] / 40)) ** 2), atol=0.05)
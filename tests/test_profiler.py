@@ -0,0 +1,35 @@
+import scatter_fake
+import scatter_profiler
+import scatter_runtime
+
+
+def test_profiler_times_writes_on_nodes_held_before_enable(fake, make_group):
+    import ScatterTool
+    fake.add_spline("Path", [(0, 0, 0), (1000, 0, 0)])
+    make_group("Fence", count=20)
+    group = ScatterTool.ScatterTool().groups[0]
+    group.set_spline(fake.getNodeByName("Path"))
+    group.scatter_spline(group.manager.get_all()[0])
+
+    profiler = scatter_profiler.enable()
+    try:
+        group.shuffle_instances()
+    finally:
+        scatter_profiler.disable()
+
+    assert profiler.writes[".baseObject"] == len(group.instances)
+    callers = {r["caller"] for r in profiler.rows() if r["name"] == ".baseObject"}
+    assert any(c.endswith("shuffle_instances") for c in callers)
+    # switched off, the held nodes are bare again
+    assert all(type(inst.node) is scatter_fake.FakeNode for inst in group.instances)
+    assert type(group.controller) is scatter_fake.FakeNode
+
+
+def test_toggling_the_profiler_restores_the_runtime(fake):
+    profiler = scatter_profiler.enable()
+    assert scatter_profiler.enable() is profiler
+    assert scatter_runtime.rt is profiler
+    assert scatter_profiler.disable() is profiler
+    assert scatter_runtime.rt is fake
+    assert scatter_profiler.active() is None
+    assert scatter_profiler.disable() is None
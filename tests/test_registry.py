@@ -0,0 +1,88 @@
+import scatter_fake
+import scatter_params
+
+
+def test_groups_load_from_the_registry(fake, make_group):
+    import ScatterTool
+    group = make_group("Fence")
+    tool = ScatterTool.ScatterTool()
+    assert [g.name for g in tool.groups] == ["Fence"]
+    assert tool.get_group_by_controller(group.controller).name == "Fence"
+
+
+def test_lookup_registers_a_tagged_controller_it_missed(fake):
+    import ScatterTool
+    tool = ScatterTool.ScatterTool()
+    controller = fake.add_controller("Merged")
+    fake.setUserProp(controller, "ScatterGroup", "Merged")
+    child = fake.add_mesh("Merged_001", *scatter_fake.box_mesh(1, 1, 1))
+    child.parent = controller
+
+    assert tool.get_group_by_controller(child).name == "Merged"
+    assert fake._registry() == [controller.handle]
+    # a new tool finds it through the registry alone
+    assert [g.name for g in ScatterTool.ScatterTool().groups] == ["Merged"]
+
+
+def test_untagged_objects_stay_unknown(fake, make_group):
+    import ScatterTool
+    make_group("Fence")
+    tool = ScatterTool.ScatterTool()
+    plain = fake.add_mesh("Plain", *scatter_fake.box_mesh(1, 1, 1))
+    assert tool.get_group_by_controller(plain) is None
+    assert len(fake._registry()) == 1
+
+
+def test_undone_delete_registers_again(fake, make_group):
+    import ScatterTool
+    group = make_group("Fence")
+    fake.delete([group.controller])
+    assert ScatterTool.ScatterTool().groups == []
+    fake.undelete(group.controller)
+    assert [g.name for g in ScatterTool.ScatterTool().groups] == ["Fence"]
+
+
+def test_reload_keeps_pool_and_collision_settings(fake, make_group):
+    import ScatterTool
+    make_group("Fence", pool_size=50, check_collisions=True, poisson_per_source=True)
+    params = ScatterTool.ScatterTool().groups[0].params
+    assert params["pool_size"] == 50
+    assert params["check_collisions"] and params["poisson_per_source"]
+
+
+def test_proportional_scale_is_on_by_default():
+    assert scatter_params.coerce({})["proportional_scale"] is True
+    assert scatter_params.loads('{"version":1}')["proportional_scale"] is True
+
+
+def test_legacy_user_props_are_migrated_once(fake):
+    controller = fake.add_controller("Old")
+    for key, value in {"ScatterMode": "surface", "ScatterCount": "40", "ScatterPosJitterX": "-5,5",
+                       "ScatterRandom": "True", "ScatterDirection": "30"}.items():
+        fake.setUserProp(controller, key, value)
+    params = scatter_params.read(controller)
+    assert (params["mode"], params["count"], params["pos_jitterX"]) == ("surface", 40, (-5.0, 5.0))
+    assert params["random"] and params["direction_value"] == 30
+    assert params["proportional_scale"] is False
+    assert fake.getUserProp(controller, scatter_params.PROP)
+    assert scatter_params.read(controller) == params
+
+
+def test_painter_free_group_layout_is_saved(fake, sources, monkeypatch):
+    import ScatterTool
+    tool = ScatterTool.ScatterTool()
+    # as main.ScatterToolApp builds it when painting with no group selected
+    fake.add_controller("Free")
+    group = ScatterTool.ScatterGroup("PainterFree")
+    group.manager = ScatterTool.ElementsManager()
+    group.manager.add_many(sources)
+    tool.add_group(group)
+    tool.add_group(group)
+    placed = group.scatter_painter_batch([(x * 50.0, 0, 0) for x in range(8)])
+    assert placed == 8 and tool.groups == [group]
+
+    fake.save_scene()
+    loaded = ScatterTool.ScatterTool().groups[0]
+    monkeypatch.setattr(fake, "scatterTool_getTransforms", None)
+    loaded._ensure_instance_store()
+    assert loaded.name == "PainterFree" and len(loaded.instances) == 8
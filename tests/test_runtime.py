@@ -0,0 +1,30 @@
+import scatter_fake
+import scatter_runtime
+
+
+def test_node_property_access_is_counted(fake):
+    fake.add_mesh("Post", *scatter_fake.box_mesh(10, 10, 100))
+    controller = fake.add_controller("Fence")
+    recording = scatter_runtime.RecordingRuntime(fake)
+
+    post = recording.getNodeByName("Post")
+    post.parent = recording.getNodeByName("Fence")
+    assert post.parent.handle == controller.handle
+    post.boxMode = True
+    assert recording.calls == {"getNodeByName": 2}
+    assert recording.reads == {".parent": 1, ".handle": 1}
+    assert recording.writes == {".parent": 1, ".boxMode": 1}
+    assert recording.total == 6
+
+
+def test_returned_nodes_go_back_into_the_runtime_unwrapped(fake):
+    fake.add_mesh("Post", *scatter_fake.box_mesh(10, 10, 100))
+    recording = scatter_runtime.RecordingRuntime(fake)
+
+    post = recording.getNodeByName("Post")
+    raw = fake.getNodeByName("Post")
+    assert post == raw and hash(post) == hash(raw)
+    assert recording.isValidNode(post)
+    transforms = recording.scatterTool_getTransforms([post])
+    assert len(transforms) == 12
+    assert [n for n in recording.objects if n == post] == [raw]
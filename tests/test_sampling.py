@@ -0,0 +1,113 @@
+import numpy as np
+
+import scatter_fake
+import scatter_sampling
+import scatter_spatial
+
+
+def terrain(size=600, segments=12):
+    return scatter_sampling.MeshSnapshot(*scatter_fake.plane_mesh(size, segments, lambda x, y: 20 * np.sin(x / 50)))
+
+
+def one_by_one(snapshot, spacing, rng, source_radii=None, max_count=None):
+    # the candidate loop poisson_disk replaces, on the same random draws
+    radii = np.array([0.5 * spacing]) if source_radii is None else np.maximum(0.5 * spacing, source_radii)
+    grid = scatter_spatial.SpatialHashGrid(cell_size=2.0 * radii.min())
+    round_size = int(min(200000, max(1000, 4 * snapshot.area / (np.pi * radii.min() ** 2))))
+    positions, sources = [], []
+    for _ in range(scatter_sampling.POISSON_MAX_ROUNDS):
+        candidates, _, _ = snapshot.sample(round_size, rng)
+        candidate_sources = rng.integers(0, len(radii), size=round_size)
+        accepted = 0
+        for point, source in zip(candidates, candidate_sources):
+            if max_count is not None and len(positions) >= max_count:
+                break
+            if not grid.overlaps(point, radii[source]):
+                grid.insert(point, radii[source])
+                positions.append(point)
+                sources.append(source)
+                accepted += 1
+        if (max_count is not None and len(positions) >= max_count) or \
+                accepted < scatter_sampling.POISSON_MIN_ACCEPT * round_size:
+            break
+    return np.array(positions), np.array(sources)
+
+
+def test_poisson_matches_the_candidate_loop():
+    snapshot = terrain()
+    for source_radii, max_count in ((None, None), ([5.0, 40.0], None), ([5.0, 40.0, 12.0], 500)):
+        positions, _, sources, complete = scatter_sampling.poisson_disk(
+            snapshot, 10.0, np.random.default_rng(3), source_radii=source_radii, max_count=max_count)
+        expected, expected_sources = one_by_one(
+            snapshot, 10.0, np.random.default_rng(3), source_radii=source_radii, max_count=max_count)
+        assert complete
+        assert np.array_equal(positions, expected)
+        assert np.array_equal(sources, expected_sources)
+
+
+def test_poisson_reports_a_fill_stopped_by_the_round_limit(monkeypatch, capsys):
+    monkeypatch.setattr(scatter_sampling, "POISSON_MAX_ROUNDS", 1)
+    positions, _, _, complete = scatter_sampling.poisson_disk(terrain(), 10.0, np.random.default_rng(0))
+    assert len(positions) and not complete
+    assert "room left" in capsys.readouterr().out
+
+
+def test_only_cached_nodes_are_watched_for_edits(fake, sources):
+    import scatter_footprint
+    post, rock = sources
+    scatter_footprint.footprints.get(post)
+    fake.touch(rock)
+    fake.touch(post)
+    fake.touch(post)
+    assert fake.scatterTool_takeDirtyFootprints() == [post.handle]
+    # read once, the dirty set is empty again
+    assert fake.scatterTool_takeDirtyFootprints() == []
+    assert fake.revisions == {post.handle: 2}
+
+
+def test_snapshot_is_rebuilt_after_an_edit_keeping_the_bbox(fake):
+    ground = fake.add_mesh("Ground", *scatter_fake.plane_mesh(100, 4))
+    first = scatter_sampling.get_mesh_snapshot(ground)
+    assert scatter_sampling.get_mesh_snapshot(ground) is first
+    fake.touch(ground)
+    assert scatter_sampling.get_mesh_snapshot(ground) is not first
+
+
+def test_arc_length_points_are_evenly_spaced_on_uneven_knots():
+    # knots bunched at the start, spacing must follow the length, not the knot parameter
+    knots = np.array([(0, 0, 0), (1, 0, 0), (2, 0, 0), (100, 0, 0), (100, 100, 0)], dtype=float)
+    table = scatter_sampling.ArcLengthTable(knots, np.tile((1.0, 0, 0), (5, 1)))
+    assert table.length == 200
+    positions, tangents = table.at_count(5)
+    steps = np.linalg.norm(np.diff(positions, axis=0), axis=1)
+    assert np.allclose(steps[:2], 50) and np.allclose(positions[-1], (100, 100, 0))
+    assert np.allclose(np.linalg.norm(tangents, axis=1), 1)
+    positions, _ = table.at_spacing(30)
+    assert len(positions) == 7 and np.allclose(positions[3], (90, 0, 0))
+
+
+def test_closed_spline_does_not_repeat_its_start():
+    square = np.array([(0, 0, 0), (10, 0, 0), (10, 10, 0), (0, 10, 0), (0, 0, 0)], dtype=float)
+    table = scatter_sampling.ArcLengthTable(square, np.tile((1.0, 0, 0), (5, 1)), closed=True)
+    positions, _ = table.at_count(4)
+    assert np.allclose(positions, square[:4])
+
+
+def test_spline_table_is_cached_until_the_spline_changes(fake):
+    path = fake.add_spline("Path", [(0, 0, 0), (100, 0, 0)])
+    table = scatter_sampling.get_spline_table(path)
+    assert scatter_sampling.get_spline_table(path) is table
+    path.baseObject.vertices[1] = (200, 0, 0)
+    assert scatter_sampling.get_spline_table(path).length == 200
+
+
+def test_surface_samples_follow_face_area():
+    # two triangles, the second has three times the area of the first
+    vertices = [(0, 0, 0), (1, 0, 0), (0, 1, 0), (10, 0, 0), (13, 0, 0), (10, 2, 0)]
+    snapshot = scatter_sampling.MeshSnapshot(vertices, [(0, 1, 2), (3, 4, 5)])
+    assert snapshot.area == 3.5
+    positions, normals, faces = snapshot.sample(40000, np.random.default_rng(0))
+    assert abs(np.mean(faces == 1) - 3.0 / 3.5) < 0.01
+    assert np.allclose(normals, (0, 0, 1))
+    small = positions[faces == 0]
+    assert (small[:, 0] >= 0).all() and (small[:, 1] >= 0).all() and (small.sum(axis=1) <= 1 + 1e-9).all()
@@ -0,0 +1,92 @@
+import numpy as np
+
+import scatter_fake
+import scatter_sampling
+import scatter_spatial
+
+
+class CountedCells(dict):
+    """cells of one grid level, counting the cells a query looks at."""
+    visits = 0
+
+    def get(self, key, default=None):
+        CountedCells.visits += 1
+        return super().get(key, default)
+
+    def items(self):
+        for item in super().items():
+            CountedCells.visits += 1
+            yield item
+
+
+def brute_force(positions, radii, alive, query, separation, radius):
+    d = np.linalg.norm(positions - query, axis=1)
+    collides = bool(((d < np.maximum(separation, radii)) & alive).any())
+    overlaps = bool(((d < radius + radii) & alive).any())
+    within = sorted(np.nonzero((d < radius) & alive)[0].tolist())
+    return collides, overlaps, within
+
+
+def test_mixed_radii_match_brute_force():
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(0, 1000, (2000, 3))
+    radii = rng.choice([2.0, 5.0, 50.0, 300.0], 2000)
+    grid = scatter_spatial.SpatialHashGrid()
+    for p, r in zip(positions, radii):
+        grid.insert(p, r)
+    for i in range(0, 2000, 3):
+        grid.remove(i)
+    alive = np.array(grid.alive)
+
+    for q in rng.uniform(0, 1000, (300, 3)):
+        separation, radius = rng.uniform(0, 80, 2)
+        collides, overlaps, within = brute_force(positions, radii, alive, q, separation, radius)
+        assert grid.collides(q, separation) == collides
+        assert grid.overlaps(q, radius) == overlaps
+        assert sorted(grid.query(q, radius)) == within
+
+
+def test_large_footprint_keeps_queries_local():
+    grid = scatter_spatial.SpatialHashGrid()
+    grid.insert((0, 0, 0), 5)
+    grid.insert((1000, 0, 0), 400)
+    grid.cells = {level: CountedCells(cells) for level, cells in grid.cells.items()}
+    CountedCells.visits = 0
+    for x in range(1000):
+        grid.collides((x, 50, 0), 3)
+    # one cell per level; a cube walk at the large radius looked at 83**3
+    assert CountedCells.visits <= 2 * 1000
+    assert grid.collides((700, 0, 0), 1)
+    assert not grid.collides((500, 0, 0), 1)
+
+
+def test_compact_keeps_points_and_cell_size():
+    grid = scatter_spatial.SpatialHashGrid()
+    for x in range(10):
+        grid.insert((x * 10.0, 0, 0), 2.0 if x % 2 else 80.0, item=x)
+    for i in range(0, 10, 2):
+        grid.remove(i)
+    cell_size = grid.cell_size
+    grid.compact()
+    assert grid.cell_size == cell_size
+    assert grid.removed == 0
+    assert sorted(grid.items) == [1, 3, 5, 7, 9]
+    assert sorted(grid.items[i] for i in grid.query((30, 0, 0), 11)) == [3]
+
+
+def test_poisson_mixed_radii_keep_their_disks(monkeypatch):
+    snapshot = scatter_sampling.MeshSnapshot(*scatter_fake.plane_mesh(1000, 20))
+    tested = []
+    overlaps = scatter_sampling._DiskIndex.overlaps
+    monkeypatch.setattr(scatter_sampling._DiskIndex, "overlaps",
+                        lambda index, positions, *args: tested.append(len(positions)) or
+                        overlaps(index, positions, *args))
+    positions, _, sources, complete = scatter_sampling.poisson_disk(
+        snapshot, 10.0, np.random.default_rng(0), source_radii=[5.0, 120.0], max_count=300)
+    assert len(positions) == 300 and complete
+    # a capped fill stops testing candidates once it has enough, out of a round of ~50000
+    assert sum(tested) < 2000
+    radii = np.maximum(5.0, np.array([5.0, 120.0]))[sources]
+    d = np.linalg.norm(positions[:, None] - positions[None], axis=2)
+    np.fill_diagonal(d, np.inf)
+    assert (d >= radii[:, None] + radii[None] - 1e-6).all()